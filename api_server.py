@@ -0,0 +1,437 @@
+# api_server.py
+import argparse
+import asyncio
+import json
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from core.bulk_io import item_from_import, user_from_import
+from core.catalog import ItemQuery
+from core.journal import Journal
+from core.library_manager import LibraryManager
+from core.records import USER_FIELDS, checked_changes, item_fields, item_to_record, loan_to_record, user_to_record
+from core.storage import SQLiteStorage
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+MAX_PAGE_SIZE = 1000
+DEFAULT_PAGE_SIZE = 100
+IDLE_TIMEOUT = 30.0
+
+
+class ApiError(Exception):
+    """An error that maps directly onto an HTTP response."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "body", "keep_alive")
+
+    def __init__(self, method, path, query, body, keep_alive):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.body = body
+        self.keep_alive = keep_alive
+
+    def int_param(self, name, default=None):
+        value = self.query.get(name)
+        if value is None:
+            return default
+        if not value.isdigit():
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"❌ Error: {name} must be a whole number.")
+        return int(value)
+
+    def json(self):
+        try:
+            body = json.loads(self.body or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"❌ Error: Invalid JSON body ({e}).")
+        if not isinstance(body, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "❌ Error: The JSON body must be an object.")
+        return body
+
+
+class LibraryApiServer:
+    """Serves a LibraryManager as a JSON API over HTTP/1.1 on an asyncio event loop.
+
+    Connections are kept alive and may pipeline requests. Requests on a connection are handled in order,
+    and responses that are ready together are written with a single socket write. Handlers run on a thread
+    pool, so a slow one never holds up the event loop and the other connections; a manager that is not
+    thread-safe gets a single worker thread. Listings are paged, at most MAX_PAGE_SIZE records per response.
+    """
+
+    def __init__(self, manager, host="127.0.0.1", port=8080, workers=8):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self._server = None
+        self._executor = ThreadPoolExecutor(workers if manager.thread_safe else 1, thread_name_prefix="api")
+        self._routes = {
+            ("GET", "health"): self.health,
+            ("GET", "items"): self.list_items,
+            ("POST", "items"): self.create_item,
+            ("POST", "items/lookup"): self.lookup_items,
+            ("GET", "items/{id}"): self.get_item,
+            ("PUT", "items/{id}"): self.update_item,
+            ("DELETE", "items/{id}"): self.delete_item,
+            ("GET", "users"): self.list_users,
+            ("POST", "users"): self.create_user,
+            ("POST", "users/lookup"): self.lookup_users,
+            ("GET", "users/{id}"): self.get_user,
+            ("PUT", "users/{id}"): self.update_user,
+            ("DELETE", "users/{id}"): self.delete_user,
+            ("POST", "loans/borrow"): self.borrow,
+            ("POST", "loans/return"): self.return_item,
+            ("GET", "loans"): self.list_loans,
+            ("GET", "loans/active"): self.active_loans,
+        }
+
+    # --- Server lifecycle ---
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port, backlog=1024,
+                                                  limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+
+    # --- Connection handling ---
+    async def _serve_connection(self, reader, writer):
+        responses = asyncio.Queue()
+        sender = asyncio.create_task(self._send_responses(writer, responses))
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), IDLE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ApiError as e:
+                    responses.put_nowait(self._response(e.status, {"error": str(e)}, keep_alive=False))
+                    break
+                except Exception:
+                    traceback.print_exc()
+                    responses.put_nowait(self._internal_error(keep_alive=False))
+                    break
+                if request is None:
+                    break
+                response = await asyncio.get_running_loop().run_in_executor(self._executor, self._dispatch, request)
+                responses.put_nowait(response)
+                if not request.keep_alive:
+                    break
+            responses.put_nowait(None)
+            await sender
+        except asyncio.CancelledError:
+            # The server is shutting down; drop the connection without reporting an error.
+            sender.cancel()
+            writer.close()
+            raise
+
+    async def _send_responses(self, writer, responses):
+        """Writes responses in request order, coalescing every response that is already waiting."""
+        try:
+            while True:
+                response = await responses.get()
+                chunks = []
+                while response is not None:
+                    chunks.append(response)
+                    if responses.empty():
+                        break
+                    response = responses.get_nowait()
+                if chunks:
+                    writer.write(b"".join(chunks))
+                    await writer.drain()
+                if response is None:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None  # The client closed the connection between requests.
+            raise
+        except asyncio.LimitOverrunError:
+            raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "❌ Error: Request headers too large.")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "❌ Error: Malformed request line.")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "❌ Error: Invalid Content-Length header.")
+        if length > MAX_BODY_BYTES:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "❌ Error: Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return Request(method.upper(), url.path.strip("/"), query, body, keep_alive)
+
+    # --- Dispatching ---
+    def _dispatch(self, request):
+        try:
+            handler, record_id = self._route(request)
+            args = (request,) if record_id is None else (request, record_id)
+            status, payload = handler(*args)
+        except ApiError as e:
+            status, payload = e.status, {"error": str(e)}
+        except ValueError as e:
+            status = HTTPStatus.NOT_FOUND if "not found" in str(e) else HTTPStatus.BAD_REQUEST
+            payload = {"error": str(e)}
+        except Exception:
+            # A bug in a handler must still answer this request, or the responses queued after it go out of order.
+            traceback.print_exc()
+            return self._internal_error(request.keep_alive)
+        return self._response(status, payload, request.keep_alive)
+
+    def _route(self, request):
+        handler = self._routes.get((request.method, request.path))
+        if handler is not None:
+            return handler, None
+        collection, _, record_id = request.path.rpartition("/")
+        if record_id.isdigit():
+            handler = self._routes.get((request.method, f"{collection}/{{id}}"))
+            if handler is not None:
+                return handler, int(record_id)
+        raise ApiError(HTTPStatus.NOT_FOUND, f"❌ Error: No route for {request.method} /{request.path}.")
+
+    def _internal_error(self, keep_alive):
+        return self._response(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "❌ Error: Internal server error."},
+                              keep_alive)
+
+    @staticmethod
+    def _response(status, payload, keep_alive=True):
+        body = json.dumps(payload).encode("utf-8")
+        status = HTTPStatus(status)
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode("latin-1") + body
+
+    # --- Handlers ---
+    def health(self, request):
+        return HTTPStatus.OK, {"status": "ok"}
+
+    def list_items(self, request):
+        """Filters with any of ?title=&status=&genre=&year_from=&year_to=&author=&type= combined.
+
+        Returns one page in ID order (?limit=, default DEFAULT_PAGE_SIZE) plus the next_cursor to pass as
+        ?cursor= for the following page; it is null after the last one.
+        """
+        params = request.query
+        query = ItemQuery(title=params.get("title"), genre=params.get("genre"), year_from=params.get("year_from"),
+                          year_to=params.get("year_to"), author_prefix=params.get("author"),
+                          item_type=params.get("type"), status=params.get("status"))
+        items, next_cursor = self.manager.item_page(request.int_param("cursor"), self._page_size(request), query)
+        return HTTPStatus.OK, {"items": [item_to_record(item) for item in items], "next_cursor": next_cursor}
+
+    @staticmethod
+    def _page_size(request):
+        return max(1, min(request.int_param("limit", DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+
+    def get_item(self, request, item_id):
+        item = self.manager.find_item(item_id)
+        if item is None:
+            raise ValueError("❌ Error: Item not found.")
+        return HTTPStatus.OK, item_to_record(item)
+
+    def lookup_items(self, request):
+        """Answers many item lookups in one round trip: {"ids": [...]} -> {"items": {id: record or null}}."""
+        found = {}
+        for item_id in request.json().get("ids", []):
+            item = self.manager.find_item(item_id)
+            found[str(item_id)] = item_to_record(item) if item else None
+        return HTTPStatus.OK, {"items": found}
+
+    def create_item(self, request):
+        record = request.json()
+        record.pop("item_id", None)
+        item = item_from_import(record)
+        self.manager.add_item(item)
+        return HTTPStatus.CREATED, item_to_record(item)
+
+    def update_item(self, request, item_id):
+        """Changes an item's own fields; status only changes through borrowing and returning."""
+        item = self.manager.find_item(item_id)
+        if item is None:
+            raise ValueError("❌ Error: Item not found.")
+        editable = tuple(field for field in item_fields(item) if field != "status")
+        self.manager.update_item(item_id, **self._editable_changes(request, item_to_record(item), editable))
+        return HTTPStatus.OK, item_to_record(self.manager.find_item(item_id))
+
+    @staticmethod
+    def _editable_changes(request, record, editable):
+        """The body's changes to the editable fields, type-checked.
+
+        Other fields of the record, such as its ID, may be sent back unchanged, so a fetched record can be PUT
+        back as a whole; changing them, or sending unknown fields, is a 400.
+        """
+        changes = request.json()
+        for field in list(changes):
+            if field not in editable and field in record and changes.pop(field) != record[field]:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"❌ Error: '{field}' cannot be changed here.")
+        try:
+            return checked_changes(editable, changes)
+        except ValueError as e:
+            raise ApiError(HTTPStatus.BAD_REQUEST, str(e))
+
+    def delete_item(self, request, item_id):
+        self.manager.delete_item(item_id)
+        return HTTPStatus.OK, {"deleted": item_id}
+
+    def list_users(self, request):
+        """One page of users in ID order, paged as list_items is; ?q= matches names or IDs."""
+        users, next_cursor = self.manager.user_page(request.int_param("cursor"), self._page_size(request),
+                                                    request.query.get("q") or None)
+        return HTTPStatus.OK, {"users": [user_to_record(user) for user in users], "next_cursor": next_cursor}
+
+    def get_user(self, request, user_id):
+        user = self.manager.find_user(user_id)
+        if user is None:
+            raise ValueError("❌ Error: User not found.")
+        return HTTPStatus.OK, user_to_record(user)
+
+    def lookup_users(self, request):
+        """Answers many user lookups in one round trip: {"ids": [...]} -> {"users": {id: record or null}}."""
+        found = {}
+        for user_id in request.json().get("ids", []):
+            user = self.manager.find_user(user_id)
+            found[str(user_id)] = user_to_record(user) if user else None
+        return HTTPStatus.OK, {"users": found}
+
+    def create_user(self, request):
+        record = request.json()
+        record.pop("user_id", None)
+        user = user_from_import(record)
+        self.manager.add_user(user)
+        return HTTPStatus.CREATED, user_to_record(user)
+
+    def update_user(self, request, user_id):
+        """Changes a user's name, contact info or borrowing limit; borrowed items follow the loans."""
+        user = self.manager.find_user(user_id)
+        if user is None:
+            raise ValueError("❌ Error: User not found.")
+        self.manager.update_user(user_id, **self._editable_changes(request, user_to_record(user), USER_FIELDS))
+        return HTTPStatus.OK, user_to_record(self.manager.find_user(user_id))
+
+    def delete_user(self, request, user_id):
+        self.manager.delete_user(user_id)
+        return HTTPStatus.OK, {"deleted": user_id}
+
+    def _loan_ids(self, request):
+        body = request.json()
+        try:
+            return int(body["user_id"]), int(body["item_id"])
+        except (KeyError, TypeError, ValueError):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "❌ Error: Both user_id and item_id are required.")
+
+    def _batch_ids(self, request):
+        """(user_id, item_ids) if the body asks for a whole stack with "item_ids", otherwise None."""
+        body = request.json()
+        if "item_ids" not in body:
+            return None
+        try:
+            return int(body["user_id"]), [int(item_id) for item_id in body["item_ids"]]
+        except (KeyError, TypeError, ValueError):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "❌ Error: user_id and a list of item_ids are required.")
+
+    @staticmethod
+    def _batch_response(result):
+        outcomes = [{"item_id": outcome.item_id, "ok": outcome.ok, "error": outcome.error,
+                     "loan": loan_to_record(outcome.loan) if outcome.loan else None} for outcome in result.outcomes]
+        status = HTTPStatus.OK if result else HTTPStatus.CONFLICT
+        return status, {"applied": result.applied, "message": result.message(), "results": outcomes}
+
+    def borrow(self, request):
+        """Borrows {"user_id", "item_id"}, or a whole stack atomically with {"user_id", "item_ids": [...]}."""
+        batch = self._batch_ids(request)
+        if batch is not None:
+            return self._batch_response(self.manager.borrow_items(*batch))
+        user_id, item_id = self._loan_ids(request)
+        self.manager.borrow_item(user_id, item_id)
+        return HTTPStatus.OK, loan_to_record(self.manager.find_active_loan(item_id))
+
+    def return_item(self, request):
+        batch = self._batch_ids(request)
+        if batch is not None:
+            return self._batch_response(self.manager.return_items(*batch))
+        user_id, item_id = self._loan_ids(request)
+        open_loan = self.manager.find_active_loan(item_id)
+        self.manager.return_item(user_id, item_id)
+        return HTTPStatus.OK, loan_to_record(self.manager.loans[open_loan.loan_id])
+
+    def list_loans(self, request):
+        """One page of the loan ledger, newest first, paged by cursor.
+
+        Filters: status=open|overdue, user_id and item_id (together, one patron's history with one item).
+        """
+        limit = self._page_size(request)
+        entries, next_cursor = self.manager.loan_page(request.int_param("cursor"), limit,
+                                                      request.query.get("status") or None,
+                                                      request.int_param("user_id"), request.int_param("item_id"))
+        loans = [dict(loan_to_record(entry.loan), item_title=entry.item_title, user_name=entry.user_name)
+                 for entry in entries]
+        return HTTPStatus.OK, {"loans": loans, "next_cursor": next_cursor}
+
+    def active_loans(self, request):
+        user_id = request.query.get("user_id")
+        if user_id is None or not user_id.isdigit():
+            raise ApiError(HTTPStatus.BAD_REQUEST, "❌ Error: user_id is required.")
+        loans = self.manager.active_loans_for_user(int(user_id))
+        return HTTPStatus.OK, {"loans": [loan_to_record(loan) for loan in loans]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Library Management System (JSON API server)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", help="SQLite database file to keep the library in (default: in memory)")
+    parser.add_argument("--journal", help="Directory for an operation journal that restores the library on restart")
+    args = parser.parse_args()
+    manager = LibraryManager(storage=SQLiteStorage(args.db) if args.db else None, thread_safe=True)
+    if args.journal:
+        Journal(args.journal).attach(manager)
+    server = LibraryApiServer(manager, args.host, args.port)
+    print(f"📡 Serving the library API on http://{args.host}:{args.port}/")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/compare.py
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline, candidate, metric="p50_us", threshold=0.20):
+    """Returns [(scale, benchmark, old, new, ratio, regressed), ...] for every benchmark both runs measured."""
+    rows = []
+    for scale, old_results in baseline["scales"].items():
+        new_results = candidate["scales"].get(scale, {})
+        flat_old, flat_new = _flatten(old_results), _flatten(new_results)
+        for name, old_stats in flat_old.items():
+            new_stats = flat_new.get(name)
+            if new_stats is None or metric not in old_stats or metric not in new_stats:
+                continue
+            old, new = old_stats[metric], new_stats[metric]
+            ratio = new / old if old else 1.0
+            rows.append((scale, name, old, new, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def _flatten(results, prefix=""):
+    """Turns the nested {"gui": {"refresh_items_list": stats}} layout into {"gui.refresh_items_list": stats}."""
+    flat = {}
+    for name, value in results.items():
+        if isinstance(value, dict) and value and all(isinstance(inner, dict) for inner in value.values()):
+            flat.update(_flatten(value, f"{prefix}{name}."))
+        elif isinstance(value, dict):
+            flat[prefix + name] = value
+    return flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files and flag regressions")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", default="p50_us", help="Statistic to compare (default: p50_us)")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="Slowdown ratio counted as a regression (default: 0.20 = 20%%)")
+    args = parser.parse_args()
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"Baseline {baseline['meta'].get('commit')} vs candidate {candidate['meta'].get('commit')} ({args.metric})")
+    rows = compare(baseline, candidate, args.metric, args.threshold)
+    for scale, name, old, new, ratio, regressed in rows:
+        flag = "❌ REGRESSION" if regressed else ("✅ faster" if ratio < 1 - args.threshold else "")
+        print(f"{int(scale):>9,}  {name:<34} {old:>12.2f} {new:>12.2f}  x{ratio:5.2f}  {flag}")
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"{regressions} regression(s) out of {len(rows)} benchmarks.")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# benchmarks/run.py
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+
+from benchmarks.synthetic import WORDS, make_item, populate
+from core.catalog import ItemQuery
+from core.library_manager import LibraryManager
+
+DEFAULT_SCALES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def timed(operation, arguments):
+    """Calls operation(argument) for each argument and returns latency statistics in microseconds."""
+    latencies = []
+    clock = time.perf_counter_ns
+    for argument in arguments:
+        start = clock()
+        operation(argument)
+        latencies.append(clock() - start)
+    if not latencies:
+        return {"ops": 0}
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "total_s": round(sum(latencies) / 1e9, 6),
+        "mean_us": round(sum(latencies) / len(latencies) / 1e3, 3),
+        "p50_us": round(percentile(latencies, 0.50) / 1e3, 3),
+        "p95_us": round(percentile(latencies, 0.95) / 1e3, 3),
+        "p99_us": round(percentile(latencies, 0.99) / 1e3, 3),
+        "max_us": round(latencies[-1] / 1e3, 3),
+    }
+
+
+def circulation_pairs(manager, rng, count):
+    """(user_id, item_id) pairs that can all be borrowed right now, each user within their limit."""
+    available = [item.item_id for item in manager.filter_items_by_status("Available")]
+    rng.shuffle(available)
+    spare = {user.user_id: user.max_borrow_limit - len(user.borrowed_items) for user in manager.users.values()}
+    users = [user_id for user_id, free in spare.items() for _ in range(free)]
+    rng.shuffle(users)
+    return list(zip(users, available))[:count]
+
+
+def bench_manager(manager, ops, seed):
+    rng = random.Random(seed + 1)
+    results = {}
+    queries = [rng.choice(WORDS) for _ in range(ops)]
+    # The first title search builds the n-gram index; time it on its own.
+    results["search_items_by_title (first)"] = timed(manager.search_items_by_title, queries[:1])
+    results["search_items_by_title"] = timed(manager.search_items_by_title, queries)
+    results["filter_items_by_status"] = timed(manager.filter_items_by_status,
+                                              ["Available", "Borrowed"] * max(1, min(ops, 100) // 2))
+    pairs = circulation_pairs(manager, rng, ops)
+    results["borrow_item"] = timed(lambda pair: manager.borrow_item(*pair), pairs)
+    results["return_item"] = timed(lambda pair: manager.return_item(*pair), pairs)
+    results["add_item"] = timed(manager.add_item, [make_item(rng) for _ in range(ops)])
+    return results
+
+
+class _StubTree:
+    """Keeps a Treeview's rows in a dict, so the list code can run and be timed without a display."""
+
+    def __init__(self):
+        self.rows = {}  # {iid: values}, in display order
+        self._selection = ()
+
+    def get_children(self):
+        return tuple(self.rows)
+
+    def exists(self, iid):
+        return iid in self.rows
+
+    def insert(self, parent, index, iid, values, tags=()):
+        rows = list(self.rows.items())
+        rows.insert(index, (iid, values))
+        self.rows = dict(rows)
+
+    def move(self, iid, parent, index):
+        rows = [(key, values) for key, values in self.rows.items() if key != iid]
+        rows.insert(index, (iid, self.rows[iid]))
+        self.rows = dict(rows)
+
+    def item(self, iid, values, tags=()):
+        self.rows[iid] = values
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.rows[iid]
+
+    def selection(self):
+        return self._selection
+
+    def selection_set(self, iid):
+        self._selection = (iid,)
+
+    def focus(self, iid=None):
+        return self._selection[0] if self._selection else ""
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def tag_configure(self, *args, **kwargs):
+        pass
+
+
+class _StubScrollbar:
+    def configure(self, **kwargs):
+        pass
+
+    def set(self, first, last):
+        pass
+
+
+class _Var:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+def headless_app(manager):
+    """A LibraryApp whose list widgets are stubs: its refresh_* methods run unchanged, without Tk."""
+    import gui_app
+    from search_worker import SearchWorker
+    from virtual_tree import VirtualTree
+
+    class HeadlessApp(gui_app.LibraryApp):
+        def __init__(self):  # The Tk window and the tabs are skipped; the list state is set up as they would.
+            self.manager = manager
+            self.loader = None
+            self.colors = gui_app.THEMES["Dark"]
+            self.changes = manager.track_changes()
+            self._item_filter = ItemQuery()
+            self._user_query = None
+            self.search_worker = SearchWorker(self)
+            for name in ("item_search", "item_year_from", "item_year_to", "item_author", "user_search",
+                         "loan_user", "loan_item", "loan_history"):
+                setattr(self, f"{name}_var", _Var())
+            for name in ("item_status", "item_genre", "item_type", "loan_filter"):
+                setattr(self, f"{name}_var", _Var("All"))
+            self.item_fuzzy_var = _Var(False)
+            self.detail_vars = {}
+            self.items_tree, self.users_tree, self.loans_tree = _StubTree(), _StubTree(), _StubTree()
+            self.items_view = VirtualTree(self.items_tree, _StubScrollbar(), self._fetch_item_rows)
+            self.users_view = VirtualTree(self.users_tree, _StubScrollbar(), self._fetch_user_rows)
+            self.loans_view = VirtualTree(self.loans_tree, _StubScrollbar(), self._fetch_loan_rows, newest_first=True)
+
+        def after(self, delay_ms, callback, *args):
+            return None  # Nothing is searched in the background here.
+
+        def after_cancel(self, timer):
+            pass
+
+    return HeadlessApp()
+
+
+def bench_gui_lists(manager, repeat):
+    """Times the LibraryApp list refreshes on stub widgets, so it needs no display.
+
+    The app's own refresh_* methods run, with VirtualTree drawing the first page into a stub Treeview.
+    """
+    try:
+        app = headless_app(manager)
+    except ImportError as e:
+        return {"skipped": str(e)}
+    try:
+        return {name: timed(lambda _, method=getattr(app, name): method(), range(repeat))
+                for name in ("refresh_items_list", "refresh_users_list", "refresh_loans_list", "refresh_all_lists")}
+    finally:
+        app.search_worker.close()
+
+
+def bench_gui(manager, repeat):
+    """Times the LibraryApp list refreshes on a hidden window; skipped when Tk cannot open a display.
+
+    On a headless machine, run under a virtual display (e.g. xvfb-run python -m benchmarks.run) to get these.
+    """
+    try:
+        import tkinter as tk
+    except ImportError as e:
+        return {"skipped": str(e)}
+    import gui_app
+    try:
+        app = gui_app.LibraryApp(manager)
+    except tk.TclError as e:
+        return {"skipped": f"no display ({e})"}
+    try:
+        app.withdraw()
+
+        def refresh(method):
+            def run(_):
+                method()
+                app.update_idletasks()
+            return run
+
+        results = {}
+        for name in ("refresh_items_list", "refresh_users_list", "refresh_loans_list", "refresh_all_lists"):
+            results[name] = timed(refresh(getattr(app, name)), range(repeat))
+        return results
+    finally:
+        app.search_worker.close()
+        try:
+            app.destroy()
+        except tk.TclError:
+            pass
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales, ops, seed, gui=True, progress=print):
+    report = {"meta": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                       "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "seed": seed, "ops": ops},
+              "scales": {}}
+    for scale in scales:
+        manager = LibraryManager()
+        start = time.perf_counter()
+        populate(manager, n_items=scale, n_users=max(10, scale // 10), n_loans=scale // 2, seed=seed)
+        results = {"populate": {"total_s": round(time.perf_counter() - start, 3), "items": len(manager.items),
+                                "users": len(manager.users), "loans": len(manager.loans)}}
+        results.update(bench_manager(manager, ops, seed))
+        if gui:
+            results["gui_lists"] = bench_gui_lists(manager, repeat=max(3, min(ops, 20)))
+            results["gui"] = bench_gui(manager, repeat=max(3, min(ops, 20)))
+        report["scales"][str(scale)] = results
+        progress(f"📊 {scale:>9,} items: search p50 {results['search_items_by_title']['p50_us']:.1f}µs, "
+                 f"borrow p50 {results['borrow_item'].get('p50_us', 0):.1f}µs, "
+                 f"populate {results['populate']['total_s']:.1f}s")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LibraryManager operations on synthetic libraries "
+                                                 "(run from the project root: python -m benchmarks.run)")
+    parser.add_argument("--scales", default=",".join(str(scale) for scale in DEFAULT_SCALES),
+                        help="Comma-separated catalog sizes (items), e.g. 1000,10000,100000,1000000")
+    parser.add_argument("--ops", type=int, default=1000, help="Operations timed per benchmark (default: 1000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-gui", action="store_true", help="Skip the GUI refresh benchmarks")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file to write the results to")
+    args = parser.parse_args()
+    scales = [int(scale) for scale in args.scales.split(",") if scale]
+    report = run(scales, args.ops, args.seed, gui=not args.no_gui)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
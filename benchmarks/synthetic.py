@@ -0,0 +1,86 @@
+# benchmarks/synthetic.py
+import random
+from datetime import date, timedelta
+
+from models.book import Book
+from models.magazine import Magazine
+from models.multimedia_item import MultimediaItem
+from models.user import User
+
+WORDS = ("river", "shadow", "garden", "empire", "silent", "winter", "machine", "golden", "ocean", "forest",
+         "secret", "journey", "glass", "history", "night", "city", "dragon", "letters", "mountain", "star",
+         "house", "memory", "storm", "island", "science", "kingdom", "paper", "light", "broken", "lost")
+FIRST_NAMES = ("Alice", "Bob", "Carla", "Deepak", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kemi", "Liam")
+LAST_NAMES = ("Wonder", "Builder", "Okafor", "Rossi", "Tanaka", "Novak", "Silva", "Meyer", "Haddad", "Larsen")
+GENRES = ("Sci-Fi", "Fantasy", "History", "Science", "Mystery", "Romance", "Biography", "Travel")
+PUBLISHERS = ("Pan Books", "Penguin", "NGS", "Warner Bros.", "Vintage", "Orbit", "Tor", "HarperCollins")
+MEDIA_TYPES = ("DVD", "Blu-ray", "CD", "Audiobook")
+
+
+def random_title(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))).title()
+
+
+def make_item(rng):
+    """A Book (60%), Magazine (25%) or MultimediaItem (15%) with plausible field values."""
+    common = (random_title(rng), f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", rng.randint(1900, 2024),
+              rng.choice(PUBLISHERS), rng.choice(GENRES))
+    kind = rng.random()
+    if kind < 0.60:
+        return Book(*common, rng.randint(80, 1200), rng.choice(("1st", "2nd", "3rd")),
+                    f"{rng.randint(0, 9)}-{rng.randint(100, 999)}-{rng.randint(10000, 99999)}-{rng.randint(0, 9)}")
+    if kind < 0.85:
+        return Magazine(*common, rng.randint(1, 500), f"{rng.choice(('March', 'July', 'November'))} {common[2]}")
+    return MultimediaItem(*common, rng.choice(MEDIA_TYPES), f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                          rng.randint(20, 240))
+
+
+def make_user(rng):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    return User(name, f"{name.lower().replace(' ', '.')}{rng.randint(1, 999)}@example.com", rng.randint(3, 10))
+
+
+def populate(manager, n_items, n_users, n_loans, seed=42, today=None):
+    """Fills a manager with n_items items, n_users users and a circulation history of n_loans loans.
+
+    The history is spread evenly over the past year in loan ID order. About two thirds of the loans have been
+    returned (some late, with fines); the rest are still open, and those older than two weeks are overdue.
+    The same seed gives the same library.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    items = [make_item(rng) for _ in range(n_items)]
+    users = [make_user(rng) for _ in range(n_users)]
+    manager.add_items_bulk(items)
+    manager.add_users_bulk(users)
+    available = [item.item_id for item in items]
+    borrowers = [user.user_id for user in users]
+    open_loans = []
+    for _ in range(n_loans):
+        if not available:
+            break
+        user_id = rng.choice(borrowers)
+        if len(manager.find_user(user_id).borrowed_items) >= manager.find_user(user_id).max_borrow_limit:
+            continue
+        # Swap a random available item to the end so taking it is O(1).
+        index = rng.randrange(len(available))
+        available[index], available[-1] = available[-1], available[index]
+        item_id = available.pop()
+        manager.borrow_item(user_id, item_id)
+        open_loans.append((user_id, item_id))
+        if rng.random() < 0.66:
+            manager.return_item(user_id, item_id)
+            open_loans.pop()
+            available.append(item_id)
+    # Borrowing always happens "today"; spread the loans back over the past year, oldest first.
+    loans = sorted(manager.loans.values(), key=lambda loan: loan.loan_id)
+    for position, loan in enumerate(loans):
+        loan.borrow_date = today - timedelta(days=365 - 365 * position // max(len(loans), 1))
+        loan.due_date = loan.borrow_date + timedelta(days=14)
+        if loan.return_date is not None:
+            loan.return_date = min(today, loan.borrow_date + timedelta(days=rng.randint(1, 28)))
+            loan.fine_amount = 0.0
+            loan.calculate_fine(manager.fine_per_day, manager.max_fine_per_loan)
+        manager.loans[loan.loan_id] = loan
+    manager.rebuild_indexes()
+    return items, users, open_loans
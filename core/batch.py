@@ -0,0 +1,49 @@
+# core/batch.py
+
+
+class ItemOutcome:
+    """What a batch did, or would have done, with one of its items."""
+    __slots__ = ("item_id", "error", "loan")
+
+    def __init__(self, item_id, error=None, loan=None):
+        self.item_id = item_id
+        self.error = error  # Why this item blocked the batch, or None if it was fine.
+        self.loan = loan  # The loan opened or closed for it, once the batch has been applied.
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class BatchResult:
+    """Outcome of LibraryManager.borrow_items/return_items: applied to every item, or to none of them.
+
+    Truthy when the batch was applied. `outcomes` has one ItemOutcome per requested item, in request order;
+    when the batch was refused, the items that caused it carry an error and the rest are just not applied.
+    """
+
+    def __init__(self, action, user_id, outcomes, applied):
+        self.action = action  # "borrowed" or "returned"
+        self.user_id = user_id
+        self.outcomes = outcomes
+        self.applied = applied
+
+    def __bool__(self):
+        return self.applied
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    @property
+    def failures(self):
+        return [outcome for outcome in self.outcomes if not outcome.ok]
+
+    @property
+    def loans(self):
+        return [outcome.loan for outcome in self.outcomes if outcome.loan is not None]
+
+    def message(self):
+        if self.applied:
+            return f"✅ {len(self.outcomes)} item(s) {self.action}."
+        return (f"❌ Error: Nothing was {self.action}; {len(self.failures)} of {len(self.outcomes)} item(s) "
+                f"could not be.")
@@ -0,0 +1,211 @@
+# core/bulk_io.py
+import csv
+import itertools
+import json
+import time
+
+from core.records import (COMMON_ITEM_FIELDS, ID_COUNTERS, ITEM_TYPES, SPECIFIC_ITEM_FIELDS, USER_FIELDS,
+                          item_from_record, item_to_record, reserve_ids, user_from_record, user_to_record)
+from models.user import User
+
+# Accepted spellings of the type column, lowercased.
+TYPE_ALIASES = {"book": "Book", "magazine": "Magazine", "multimedia": "MultimediaItem",
+                "multimediaitem": "MultimediaItem"}
+INTEGER_FIELDS = {"item_id", "user_id", "publication_year", "page_count", "duration_minutes", "max_borrow_limit"}
+ITEM_COLUMNS = ("item_id", "type") + COMMON_ITEM_FIELDS + tuple(
+    field for fields in SPECIFIC_ITEM_FIELDS.values() for field in fields)
+USER_COLUMNS = ("user_id",) + USER_FIELDS + ("borrowed_items",)
+REQUIRED_ITEM_FIELDS = tuple(field for field in COMMON_ITEM_FIELDS if field != "status")
+
+
+class ImportReport:
+    """Outcome of a bulk import: how many records were added, which were rejected and how fast it ran."""
+
+    def __init__(self):
+        self.added = 0
+        self.errors = []  # [(record_number, message), ...]
+        self.elapsed = 0.0
+
+    @property
+    def records_per_second(self):
+        return self.added / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"✅ Imported {self.added} records in {self.elapsed:.2f}s "
+                f"({self.records_per_second:,.0f} records/s), {len(self.errors)} rejected.")
+
+
+# --- Reading ---
+def _file_format(path, file_format):
+    if file_format:
+        return file_format.lower()
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_records(path, file_format=None):
+    """Yields one dict per record of a CSV or JSONL file, reading it line by line.
+
+    A JSONL line that is not a JSON object is yielded as a ValueError naming the line, so an import can
+    reject that record and carry on with the rest of the file.
+    """
+    if _file_format(path, file_format) == "jsonl":
+        with open(path, "rb") as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield _parse_line(line, line_number)
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+
+def _parse_line(line, line_number):
+    try:
+        record = json.loads(line)
+    except ValueError as e:  # Also raised for bytes that are not UTF-8
+        return ValueError(f"❌ Error: Line {line_number} is not valid JSON ({e}).")
+    if not isinstance(record, dict):
+        return ValueError(f"❌ Error: Line {line_number} is not a JSON object.")
+    return record
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _clean(record):
+    """Drops empty CSV cells and converts numeric columns."""
+    cleaned = {}
+    for key, value in record.items():
+        if value is None or value == "":
+            continue
+        if key in INTEGER_FIELDS and isinstance(value, str):
+            value = int(value)
+        cleaned[key] = value
+    return cleaned
+
+
+def item_from_import(record):
+    """Builds a Book, Magazine or MultimediaItem from an imported record.
+
+    Records that carry an item_id keep it (e.g. when importing an export into a new library); others get a new
+    ID. Items marked Borrowed are rejected, as an import cannot open their loans.
+    """
+    record = _clean(record)
+    item_type = TYPE_ALIASES.get(str(record.get("type", "")).lower())
+    if item_type is None:
+        raise ValueError(f"❌ Error: Unknown item type '{record.get('type', '')}'.")
+    missing = [field for field in REQUIRED_ITEM_FIELDS + SPECIFIC_ITEM_FIELDS[item_type] if field not in record]
+    if missing:
+        raise ValueError(f"❌ Error: Missing field(s): {', '.join(missing)}.")
+    record["type"] = item_type
+    record.setdefault("status", "Available")
+    if record["status"] == "Borrowed":
+        # Imports never create loans, so a Borrowed item could never be returned.
+        raise ValueError("❌ Error: Item is marked Borrowed but has no loan.")
+    if "item_id" in record:
+        return item_from_record(record)
+    fields = {field: record[field] for field in REQUIRED_ITEM_FIELDS + SPECIFIC_ITEM_FIELDS[item_type]}
+    item = ITEM_TYPES[item_type](**fields)
+    item.status = record["status"]
+    return item
+
+
+def user_from_import(record):
+    record = _clean(record)
+    if "name" not in record:
+        raise ValueError("❌ Error: Missing field(s): name.")
+    record.setdefault("contact_info", "")
+    record.setdefault("max_borrow_limit", 3)
+    if "user_id" in record:
+        borrowed = record.get("borrowed_items", [])
+        record["borrowed_items"] = json.loads(borrowed) if isinstance(borrowed, str) else borrowed
+        if record["borrowed_items"]:
+            raise ValueError("❌ Error: User lists borrowed items but has no loans.")
+        return user_from_record(record)
+    return User(record["name"], record["contact_info"], record["max_borrow_limit"])
+
+
+# --- Importing ---
+def _import(records, build, existing, add_bulk, id_counter, id_field, chunk_size, progress):
+    """Adds the records that build() accepts, chunk by chunk.
+
+    A record whose ID is already taken (by the library or an earlier record) is rejected rather than replacing
+    the live record, which may be on loan.
+    """
+    report = ImportReport()
+    start = time.perf_counter()
+    kind = id_field.split("_")[0].capitalize()
+    for chunk_number, chunk in enumerate(chunked(records, chunk_size)):
+        valid = []
+        seen = set()
+        for offset, record in enumerate(chunk, start=chunk_number * chunk_size + 1):
+            try:
+                if isinstance(record, ValueError):
+                    raise record  # A line read_records() could not parse
+                obj = build(record)
+            except (ValueError, TypeError, KeyError) as e:
+                report.errors.append((offset, str(e)))
+                continue
+            record_id = getattr(obj, id_field)
+            if record_id in seen or record_id in existing:
+                report.errors.append((offset, f"❌ Error: {kind} ID {record_id} already exists."))
+                continue
+            seen.add(record_id)
+            valid.append(obj)
+        if valid:
+            # Imported IDs must never be handed out again by the constructors.
+            reserve_ids(id_counter, max(getattr(obj, id_field) for obj in valid) + 1)
+            report.added += add_bulk(valid)
+        report.elapsed = time.perf_counter() - start
+        if progress:
+            progress(report)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def import_items(manager, path, file_format=None, chunk_size=5000, progress=None):
+    """Streams items from a CSV/JSONL file into the manager in validated chunks.
+
+    The `type` column picks the class (Book, Magazine or Multimedia). `progress`, if given, is called
+    with the running ImportReport after each chunk.
+    """
+    return _import(read_records(path, file_format), item_from_import, manager.items, manager.add_items_bulk,
+                   ID_COUNTERS["item"], "item_id", chunk_size, progress)
+
+
+def import_users(manager, path, file_format=None, chunk_size=5000, progress=None):
+    """Streams users from a CSV/JSONL file into the manager in validated chunks."""
+    return _import(read_records(path, file_format), user_from_import, manager.users, manager.add_users_bulk,
+                   ID_COUNTERS["user"], "user_id", chunk_size, progress)
+
+
+# --- Exporting ---
+def _export(path, file_format, columns, objects, to_record):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if _file_format(path, file_format) == "jsonl":
+            for obj in objects:
+                f.write(json.dumps(to_record(obj)) + "\n")
+                count += 1
+        else:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for obj in objects:
+                record = to_record(obj)
+                if "borrowed_items" in record:
+                    record["borrowed_items"] = json.dumps(record["borrowed_items"])
+                writer.writerow(record)
+                count += 1
+    return count
+
+
+def export_items(manager, path, file_format=None):
+    """Writes every item to a CSV/JSONL file one record at a time. Returns the number written."""
+    return _export(path, file_format, ITEM_COLUMNS, manager.items.values(), item_to_record)
+
+
+def export_users(manager, path, file_format=None):
+    """Writes every user to a CSV/JSONL file one record at a time. Returns the number written."""
+    return _export(path, file_format, USER_COLUMNS, manager.users.values(), user_to_record)
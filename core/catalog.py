@@ -0,0 +1,228 @@
+# core/catalog.py
+import bisect
+
+from core.records import ITEM_TYPES
+
+
+def _lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def _year(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ItemQuery:
+    """Combined item criteria; each one left as None matches every item.
+
+    title is a substring and author_prefix a prefix of the author/creator, both case-insensitive; genre and
+    status are case-insensitive equality; year_from/year_to bound publication_year inclusively; item_type is a
+    class name ("Book", "Magazine" or "MultimediaItem").
+    """
+    __slots__ = ("title", "genre", "year_from", "year_to", "author_prefix", "item_type", "status")
+
+    def __init__(self, title=None, genre=None, year_from=None, year_to=None, author_prefix=None, item_type=None,
+                 status=None):
+        if item_type and item_type not in ITEM_TYPES:
+            raise ValueError(f"❌ Error: Unknown item type '{item_type}'.")
+        for year in (year_from, year_to):
+            if year not in (None, "") and _year(year) is None:
+                raise ValueError(f"❌ Error: '{year}' is not a valid year.")
+        if year_from not in (None, "") and year_to not in (None, "") and _year(year_from) > _year(year_to):
+            raise ValueError("❌ Error: The year range ends before it starts.")
+        self.title = _lower(title) or None
+        self.genre = _lower(genre) or None
+        self.year_from = _year(year_from)
+        self.year_to = _year(year_to)
+        self.author_prefix = _lower(author_prefix) or None
+        self.item_type = item_type or None
+        self.status = _lower(status) or None
+
+    def is_empty(self):
+        return all(getattr(self, name) is None for name in self.__slots__)
+
+    def matches(self, item):
+        if self.title is not None and self.title not in item.title.lower():
+            return False
+        if self.genre is not None and _lower(item.genre) != self.genre:
+            return False
+        if self.year_from is not None or self.year_to is not None:
+            year = _year(item.publication_year)
+            if year is None or (self.year_from is not None and year < self.year_from) or (
+                    self.year_to is not None and year > self.year_to):
+                return False
+        if self.author_prefix is not None and not item.author_or_creator.lower().startswith(self.author_prefix):
+            return False
+        if self.item_type is not None and item.__class__.__name__ != self.item_type:
+            return False
+        return self.status is None or item.status.lower() == self.status
+
+
+class PostingIndex:
+    """{key: {item_id, ...}} for one derived key of each item, for equality lookups."""
+
+    def __init__(self, key):
+        self.key = key  # item -> key, or None to leave the item out
+        self._postings = {}
+
+    def add(self, item):
+        key = self.key(item)
+        if key is not None:
+            self.add_id(key, item.item_id)
+
+    def remove(self, item):
+        self.remove_id(self.key(item), item.item_id)
+
+    def add_id(self, key, item_id):
+        postings = self._postings.get(key)
+        if postings is None:
+            self._postings[key] = {item_id}
+            self._new_key(key)
+        else:
+            postings.add(item_id)
+
+    def remove_id(self, key, item_id):
+        postings = self._postings.get(key)
+        if postings is not None:
+            postings.discard(item_id)
+            if not postings:
+                del self._postings[key]
+                self._drop_key(key)
+
+    def _new_key(self, key):
+        pass
+
+    def _drop_key(self, key):
+        pass
+
+    def keys(self):
+        return list(self._postings)
+
+    def lookup(self, key):
+        return self._postings.get(key, frozenset())
+
+
+class SortedPostingIndex(PostingIndex):
+    """A PostingIndex that also keeps its distinct keys sorted, for range and prefix lookups.
+
+    Only distinct keys are sorted (a century of years, or one entry per author), so keeping the order costs
+    far less than sorting every item.
+    """
+
+    def __init__(self, key):
+        super().__init__(key)
+        self._keys = []
+
+    def _new_key(self, key):
+        bisect.insort(self._keys, key)
+
+    def _drop_key(self, key):
+        del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def keys(self):
+        return list(self._keys)
+
+    def _key_range(self, low, high):
+        """Keys k with low <= k <= high; either bound may be None."""
+        start = 0 if low is None else bisect.bisect_left(self._keys, low)
+        end = len(self._keys) if high is None else bisect.bisect_right(self._keys, high)
+        return self._keys[start:end]
+
+    def _prefix_range(self, prefix):
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + "\U0010ffff")
+        return self._keys[start:end]
+
+    def count(self, keys, limit=None):
+        """How many items the keys cover; stops counting once the total passes limit."""
+        total = 0
+        for key in keys:
+            total += len(self._postings[key])
+            if limit is not None and total > limit:
+                break
+        return total
+
+    def union(self, keys):
+        ids = set()
+        for key in keys:
+            ids.update(self._postings[key])
+        return ids
+
+
+class CatalogIndex:
+    """Secondary indexes over the catalog (genre, item type, status, publication year, author) and a planner.
+
+    A query starts from whichever criterion's index matches the fewest items, intersects that with the other
+    equality indexes that are smaller than it, and only then checks the remaining criteria item by item.
+    """
+
+    def __init__(self):
+        self.genre = PostingIndex(lambda item: _lower(item.genre))
+        self.item_type = PostingIndex(lambda item: item.__class__.__name__)
+        self.status = PostingIndex(lambda item: _lower(item.status))
+        self.year = SortedPostingIndex(lambda item: _year(item.publication_year))
+        self.author = SortedPostingIndex(lambda item: _lower(item.author_or_creator))
+        self._indexes = (self.genre, self.item_type, self.status, self.year, self.author)
+        self._genre_names = {}  # {lowercased genre: genre as first entered}
+
+    def add(self, item):
+        for index in self._indexes:
+            index.add(item)
+        if isinstance(item.genre, str):
+            self._genre_names.setdefault(item.genre.lower(), item.genre)
+
+    def remove(self, item):
+        for index in self._indexes:
+            index.remove(item)
+
+    def set_status(self, item, status):
+        """Moves an item to another status before item.status itself is changed."""
+        self.status.remove(item)
+        self.status.add_id(status.lower(), item.item_id)
+
+    def genres(self):
+        """The genres in the catalog, sorted case-insensitively."""
+        return [self._genre_names[genre] for genre in sorted(self.genre.keys()) if genre in self._genre_names]
+
+    def plan(self, query, title_index=None):
+        """Returns [(estimated_matches, name, fetch)] for the criteria an index can answer, cheapest first.
+
+        fetch() returns the candidate item IDs (a superset of the matches). Range and prefix estimates stop
+        counting once they pass the best estimate so far, so a broad criterion costs little to rule out.
+        """
+        steps = []
+        for name in ("genre", "item_type", "status"):
+            value = getattr(query, name)
+            if value is not None:
+                ids = getattr(self, name).lookup(value)
+                steps.append((len(ids), name, lambda ids=ids: ids))
+        best = min((step[0] for step in steps), default=None)
+        if query.year_from is not None or query.year_to is not None:
+            years = self.year._key_range(query.year_from, query.year_to)
+            steps.append((self.year.count(years, best), "year", lambda: self.year.union(years)))
+            best = min(best, steps[-1][0]) if best is not None else steps[-1][0]
+        if query.author_prefix is not None:
+            authors = self.author._prefix_range(query.author_prefix)
+            steps.append((self.author.count(authors, best), "author", lambda: self.author.union(authors)))
+        if query.title is not None and title_index is not None:
+            estimate = title_index.estimate(query.title)
+            if estimate is not None:
+                steps.append((estimate, "title", lambda: title_index.candidates(query.title)))
+        steps.sort(key=lambda step: step[0])
+        return steps
+
+    def candidates(self, query, title_index=None):
+        """Returns (name of the starting index, candidate IDs), or (None, None) when no index applies."""
+        steps = self.plan(query, title_index)
+        if not steps:
+            return None, None
+        estimate, name, fetch = steps[0]
+        ids = fetch()
+        for other_estimate, other_name, other_fetch in steps[1:]:
+            # Equality postings are already sets, so intersecting with them costs no more than the candidates.
+            if other_name in ("genre", "item_type", "status") and ids:
+                ids = ids & other_fetch()
+        return name, ids
@@ -0,0 +1,255 @@
+# core/events.py
+
+
+class Event:
+    """Base class for everything LibraryManager announces. Subscribing to Event receives all of them."""
+    __slots__ = ()
+
+    def message(self):
+        """Returns a human-readable line describing the event."""
+        return ""
+
+
+# --- Item events ---
+class ItemAdded(Event):
+    __slots__ = ("item",)
+
+    def __init__(self, item):
+        self.item = item
+
+    def message(self):
+        return f"✅ Item '{self.item.title}' added with ID {self.item.item_id}."
+
+
+class ItemsAdded(Event):
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = items
+
+    def message(self):
+        return f"✅ {len(self.items)} items added."
+
+
+class ItemUpdated(Event):
+    __slots__ = ("item",)
+
+    def __init__(self, item):
+        self.item = item
+
+    def message(self):
+        return f"✅ Item ID {self.item.item_id} has been updated."
+
+
+class ItemDeleted(Event):
+    __slots__ = ("item",)
+
+    def __init__(self, item):
+        self.item = item
+
+    def message(self):
+        return f"🗑️ Item with ID {self.item.item_id} has been deleted."
+
+
+# --- User events ---
+class UserAdded(Event):
+    __slots__ = ("user",)
+
+    def __init__(self, user):
+        self.user = user
+
+    def message(self):
+        return f"✅ User '{self.user.name}' registered with ID {self.user.user_id}."
+
+
+class UsersAdded(Event):
+    __slots__ = ("users",)
+
+    def __init__(self, users):
+        self.users = users
+
+    def message(self):
+        return f"✅ {len(self.users)} users registered."
+
+
+class UserUpdated(Event):
+    __slots__ = ("user",)
+
+    def __init__(self, user):
+        self.user = user
+
+    def message(self):
+        return f"✅ User ID {self.user.user_id} has been updated."
+
+
+class UserDeleted(Event):
+    __slots__ = ("user",)
+
+    def __init__(self, user):
+        self.user = user
+
+    def message(self):
+        return f"🗑️ User with ID {self.user.user_id} has been deleted."
+
+
+# --- Circulation events ---
+class LoanOpened(Event):
+    __slots__ = ("loan", "item", "user")
+
+    def __init__(self, loan, item, user):
+        self.loan = loan
+        self.item = item
+        self.user = user
+
+    def message(self):
+        return f"✅ Item '{self.item.title}' borrowed by '{self.user.name}'. Due: {self.loan.due_date}."
+
+
+class LoanClosed(Event):
+    __slots__ = ("loan", "item", "user")
+
+    def __init__(self, loan, item, user):
+        self.loan = loan
+        self.item = item
+        self.user = user
+
+    def message(self):
+        return f"✅ Item '{self.item.title}' returned by '{self.user.name}'."
+
+
+class LoansOpened(Event):
+    """Several items borrowed by one user in a single borrow_items batch."""
+    __slots__ = ("loans", "items", "user")
+
+    def __init__(self, loans, items, user):
+        self.loans = loans
+        self.items = items
+        self.user = user
+
+    def message(self):
+        return f"✅ {len(self.loans)} item(s) borrowed by '{self.user.name}'. Due: {self.loans[0].due_date}."
+
+
+class LoansClosed(Event):
+    """Several items returned by one user in a single return_items batch."""
+    __slots__ = ("loans", "items", "user")
+
+    def __init__(self, loans, items, user):
+        self.loans = loans
+        self.items = items
+        self.user = user
+
+    def message(self):
+        return f"✅ {len(self.loans)} item(s) returned by '{self.user.name}'."
+
+
+class FineApplied(Event):
+    __slots__ = ("loan", "amount")
+
+    def __init__(self, loan, amount):
+        self.loan = loan
+        self.amount = amount
+
+    def message(self):
+        return f"🔔 A fine of ${self.amount:.2f} has been applied for late return."
+
+
+class FinesApplied(Event):
+    """Late-return fines from a return_items batch, announced together."""
+    __slots__ = ("loans", "amount")
+
+    def __init__(self, loans, amount):
+        self.loans = loans
+        self.amount = amount
+
+    def message(self):
+        return f"🔔 Fines totalling ${self.amount:.2f} have been applied for {len(self.loans)} late return(s)."
+
+
+class LoansOverdue(Event):
+    __slots__ = ("loans",)
+
+    def __init__(self, loans):
+        self.loans = loans
+
+    def message(self):
+        return f"🔔 {len(self.loans)} loan(s) became overdue."
+
+
+class EventBus:
+    """Delivers events to subscribers. With no subscribers, publishing is a single dict lookup."""
+
+    def __init__(self):
+        self._subscribers = {}  # {event_type: [callback, ...]}
+        self._resolved = {}  # {concrete_event_type: [callback, ...]}, including base-class subscribers
+
+    def subscribe(self, callback, *event_types):
+        """Calls callback(event) for each event of the given types (all events if none are given)."""
+        for event_type in event_types or (Event,):
+            self._subscribers.setdefault(event_type, []).append(callback)
+        self._resolved.clear()
+
+    def unsubscribe(self, callback):
+        for callbacks in self._subscribers.values():
+            while callback in callbacks:
+                callbacks.remove(callback)
+        self._resolved.clear()
+
+    def _callbacks_for(self, event_type):
+        callbacks = [callback for cls in event_type.__mro__ for callback in self._subscribers.get(cls, ())]
+        self._resolved[event_type] = callbacks
+        return callbacks
+
+    def publish(self, event_type, *args):
+        """Builds an event_type(*args) and delivers it, but only if someone is listening."""
+        callbacks = self._resolved.get(event_type)
+        if callbacks is None:
+            callbacks = self._callbacks_for(event_type)
+        if callbacks:
+            event = event_type(*args)
+            for callback in callbacks:
+                callback(event)
+
+
+class ChangeTracker:
+    """Subscriber that collects the IDs of the items, users and loans touched by events until they are drained."""
+
+    def __init__(self):
+        self.items = set()
+        self.users = set()
+        self.loans = set()
+
+    def __call__(self, event):
+        if isinstance(event, (ItemAdded, ItemUpdated, ItemDeleted)):
+            self.items.add(event.item.item_id)
+        elif isinstance(event, ItemsAdded):
+            self.items.update(item.item_id for item in event.items)
+        elif isinstance(event, (UserAdded, UserUpdated, UserDeleted)):
+            self.users.add(event.user.user_id)
+        elif isinstance(event, UsersAdded):
+            self.users.update(user.user_id for user in event.users)
+        elif isinstance(event, (LoanOpened, LoanClosed)):
+            self.loans.add(event.loan.loan_id)
+            self.items.add(event.item.item_id)
+            self.users.add(event.user.user_id)
+        elif isinstance(event, (LoansOpened, LoansClosed)):
+            self.loans.update(loan.loan_id for loan in event.loans)
+            self.items.update(item.item_id for item in event.items)
+            self.users.add(event.user.user_id)
+        elif isinstance(event, FineApplied):
+            self.loans.add(event.loan.loan_id)
+        elif isinstance(event, FinesApplied):
+            self.loans.update(loan.loan_id for loan in event.loans)
+        elif isinstance(event, LoansOverdue):
+            self.loans.update(loan.loan_id for loan in event.loans)
+
+    def drain(self, kind):
+        """Returns and forgets the changed IDs of one kind: "items", "users" or "loans"."""
+        changed = getattr(self, kind)
+        setattr(self, kind, set())
+        return changed
+
+
+def print_event(event):
+    """Subscriber that prints each event's message, as the CLI used to."""
+    print(event.message())
@@ -0,0 +1,203 @@
+# core/fines.py
+import bisect
+import threading
+from array import array
+from datetime import date
+
+from core.events import LoanClosed, LoanOpened, LoansClosed, LoansOpened
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the engine falls back to plain Python loops.
+    np = None
+
+
+class FineEngine:
+    """Computes days overdue and fines for every loan at once, cached per calendar day.
+
+    Loans are kept as parallel columns (loan ID, user ID, due date, return date, charged fine) in ascending
+    loan ID order. With NumPy the whole table is computed in a few vectorized operations; without it the same
+    computation runs as a loop. Returned loans keep the fine charged at return; open loans accrue
+    `fine_per_day` per day overdue, up to `max_fine_per_loan`. Per-user totals are capped at `max_fine_per_user`.
+    """
+
+    def __init__(self, manager, fine_per_day=1.0, max_fine_per_loan=None, max_fine_per_user=None):
+        self.manager = manager
+        self.fine_per_day = fine_per_day
+        self.max_fine_per_loan = max_fine_per_loan
+        self.max_fine_per_user = max_fine_per_user
+        self._lock = threading.RLock()
+        # Dates are stored as proleptic ordinals; 0 means "not returned".
+        self._loan_ids = array("q")
+        self._user_ids = array("q")
+        self._due = array("q")
+        self._returned = array("q")
+        self._charged = array("d")
+        self._day = None  # Ordinal of the day the cached results are for.
+        self._days_overdue = None
+        self._fines = None
+        self._dirty_rows = set()  # Rows changed since the results were computed.
+        self._derived = {}  # Overdue IDs and per-user totals, dropped whenever the results change.
+        with self._lock:
+            # Subscribing first means a loan opened by another thread during the load is caught either way.
+            manager.events.subscribe(self._on_loan_event, LoanOpened, LoanClosed, LoansOpened, LoansClosed)
+            for loan in sorted(manager.loans.values(), key=lambda loan: loan.loan_id):
+                self._append(loan)
+
+    def close(self):
+        """Stops following the manager's loan events."""
+        self.manager.events.unsubscribe(self._on_loan_event)
+
+    # --- Keeping the columns current ---
+    def _append(self, loan):
+        self._loan_ids.append(loan.loan_id)
+        self._user_ids.append(loan.user_id)
+        self._due.append(loan.due_date.toordinal())
+        self._returned.append(loan.return_date.toordinal() if loan.return_date else 0)
+        self._charged.append(loan.fine_amount)
+
+    def _row(self, loan_id):
+        row = bisect.bisect_left(self._loan_ids, loan_id)
+        return row if row < len(self._loan_ids) and self._loan_ids[row] == loan_id else None
+
+    def _on_loan_event(self, event):
+        loans = event.loans if isinstance(event, (LoansOpened, LoansClosed)) else (event.loan,)
+        with self._lock:
+            for loan in loans:
+                row = self._row(loan.loan_id)
+                if row is None:
+                    if self._loan_ids and loan.loan_id < self._loan_ids[-1]:
+                        return self._reload()  # Out of order (should not happen): start again from the records.
+                    self._append(loan)
+                    row = len(self._loan_ids) - 1
+                else:
+                    self._returned[row] = loan.return_date.toordinal() if loan.return_date else 0
+                    self._charged[row] = loan.fine_amount
+                self._dirty_rows.add(row)
+
+    def _reload(self):
+        for column in (self._loan_ids, self._user_ids, self._due, self._returned):
+            del column[:]
+        del self._charged[:]
+        for loan in sorted(self.manager.loans.values(), key=lambda loan: loan.loan_id):
+            self._append(loan)
+        self._day = None
+
+    # --- Computing ---
+    def _cap(self, fine):
+        return fine if self.max_fine_per_loan is None else min(fine, self.max_fine_per_loan)
+
+    def _compute_row(self, row, today):
+        returned = self._returned[row]
+        if returned:
+            return max(returned - self._due[row], 0), self._charged[row]
+        days = max(today - self._due[row], 0)
+        return days, self._cap(days * self.fine_per_day)
+
+    def _compute_all(self, today):
+        if np is not None:
+            due = np.frombuffer(self._due, dtype=np.int64)
+            returned = np.frombuffer(self._returned, dtype=np.int64)
+            charged = np.frombuffer(self._charged, dtype=np.float64)
+            is_open = returned == 0
+            days = np.maximum(np.where(is_open, today, returned) - due, 0)
+            accrued = days * self.fine_per_day
+            if self.max_fine_per_loan is not None:
+                np.minimum(accrued, self.max_fine_per_loan, out=accrued)
+            return days, np.where(is_open, accrued, charged)
+        days, fines = array("q"), array("d")
+        for row in range(len(self._loan_ids)):
+            row_days, row_fine = self._compute_row(row, today)
+            days.append(row_days)
+            fines.append(row_fine)
+        return days, fines
+
+    def refresh(self, today=None):
+        """Brings the cached results up to date for `today`; recomputes everything only when the day changes."""
+        today = (today or date.today()).toordinal()
+        with self._lock:
+            if self._day != today:
+                self._days_overdue, self._fines = self._compute_all(today)
+                self._day = today
+                self._derived.clear()
+            elif self._dirty_rows:
+                self._derived.clear()
+                computed = len(self._days_overdue)
+                new_rows = range(computed, len(self._loan_ids))
+                if len(new_rows):
+                    added = [self._compute_row(row, today) for row in new_rows]
+                    new_days, new_fines = [days for days, _ in added], [fine for _, fine in added]
+                    if np is not None:
+                        self._days_overdue = np.concatenate((self._days_overdue, new_days)).astype(np.int64)
+                        self._fines = np.concatenate((self._fines, new_fines))
+                    else:
+                        self._days_overdue.extend(new_days)
+                        self._fines.extend(new_fines)
+                for row in self._dirty_rows:
+                    if row < computed:
+                        self._days_overdue[row], self._fines[row] = self._compute_row(row, today)
+            self._dirty_rows.clear()
+            return self._days_overdue, self._fines
+
+    # --- Queries ---
+    def fine_for(self, loan_id, today=None):
+        """The fine a loan has accrued so far (or was charged, if it has been returned)."""
+        with self._lock:
+            days, fines = self.refresh(today)
+            row = self._row(loan_id)
+            return float(fines[row]) if row is not None else 0.0
+
+    def days_overdue(self, loan_id, today=None):
+        with self._lock:
+            days, fines = self.refresh(today)
+            row = self._row(loan_id)
+            return int(days[row]) if row is not None else 0
+
+    def overdue_loan_ids(self, today=None):
+        """IDs of the loans that are open and past their due date."""
+        return list(self._derived_result("overdue", today))
+
+    def totals_by_user(self, today=None):
+        """{user_id: total fines} for every user who owes something, each capped at max_fine_per_user."""
+        return dict(self._derived_result("totals", today))
+
+    def user_total(self, user_id, today=None):
+        return self._derived_result("totals", today).get(user_id, 0.0)
+
+    def summary(self, today=None):
+        """Counts and totals for a whole-library overdue sweep."""
+        with self._lock:
+            overdue = self._derived_result("overdue", today)
+            totals = self._derived_result("totals", today)
+            return {"loans": len(self._loan_ids), "overdue_loans": len(overdue), "users_owing": len(totals),
+                    "total_fines": round(sum(totals.values()), 2)}
+
+    def _derived_result(self, name, today):
+        with self._lock:
+            days, fines = self.refresh(today)
+            if name not in self._derived:
+                self._derived[name] = self._overdue(days) if name == "overdue" else self._totals(fines)
+            return self._derived[name]
+
+    def _overdue(self, days):
+        if np is not None:
+            loan_ids = np.frombuffer(self._loan_ids, dtype=np.int64)[:len(days)]
+            returned = np.frombuffer(self._returned, dtype=np.int64)[:len(days)]
+            return loan_ids[(days > 0) & (returned == 0)].tolist()
+        return [self._loan_ids[row] for row in range(len(days)) if days[row] > 0 and not self._returned[row]]
+
+    def _totals(self, fines):
+        if np is not None:
+            user_ids = np.frombuffer(self._user_ids, dtype=np.int64)[:len(fines)]
+            owing = fines > 0
+            sums = np.bincount(user_ids[owing], weights=fines[owing])
+            totals = {int(user_id): float(sums[user_id]) for user_id in np.flatnonzero(sums)}
+        else:
+            totals = {}
+            for row in range(len(fines)):
+                if fines[row] > 0:
+                    user_id = self._user_ids[row]
+                    totals[user_id] = totals.get(user_id, 0.0) + fines[row]
+        if self.max_fine_per_user is not None:
+            totals = {user_id: min(total, self.max_fine_per_user) for user_id, total in totals.items()}
+        return totals
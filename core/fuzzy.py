@@ -0,0 +1,128 @@
+# core/fuzzy.py
+import heapq
+import re
+
+WORD = re.compile(r"\w+")
+
+
+def words(text):
+    return WORD.findall(text.lower()) if isinstance(text, str) else []
+
+
+def allowed_edits(word):
+    """Typos tolerated in a query word: none for short words, where one edit already changes the word."""
+    if len(word) <= 3:
+        return 0
+    return 1 if len(word) <= 7 else 2
+
+
+def bounded_edit_distance(a, b, limit):
+    """Levenshtein distance between a and b, or None if it is more than limit.
+
+    Only the diagonal band of width 2 * limit + 1 is computed, and the computation stops as soon as every
+    cell in a row exceeds the limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    if a == b:
+        return 0
+    too_far = limit + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [too_far] * (len(b) + 1)
+        current[0] = i if i <= limit else too_far
+        char = a[i - 1]
+        for j in range(low, high + 1):
+            cost = 0 if char == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost, too_far)
+        if min(current[low - 1:high + 1]) > limit:
+            return None
+        previous = current
+    return previous[len(b)] if previous[len(b)] <= limit else None
+
+
+class FuzzyIndex:
+    """Typo-tolerant search over the words of item titles and creators.
+
+    The index maps each distinct word to the items using it, and each padded trigram to the words containing
+    it. A query word first gathers candidate words through the trigram index: a word within k edits shares
+    all but 3k of its trigrams, so only the rarest 3k + 1 trigram postings need to be read. The candidates
+    are then re-ranked by bounded edit distance. Items score the average closeness of their best match for
+    each query word, 1.0 meaning every word was found exactly.
+    """
+
+    def __init__(self, attributes=("title", "author_or_creator")):
+        self.attributes = attributes
+        self._items_by_word = {}  # {word: {item_id, ...}}
+        self._words_by_gram = {}  # {trigram: {word, ...}}
+
+    @staticmethod
+    def _grams(word):
+        padded = f"${word}$"
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _item_words(self, item):
+        return {word for attribute in self.attributes for word in words(getattr(item, attribute))}
+
+    def add(self, item):
+        for word in self._item_words(item):
+            item_ids = self._items_by_word.get(word)
+            if item_ids is None:
+                self._items_by_word[word] = {item.item_id}
+                for gram in self._grams(word):
+                    self._words_by_gram.setdefault(gram, set()).add(word)
+            else:
+                item_ids.add(item.item_id)
+
+    def remove(self, item):
+        for word in self._item_words(item):
+            item_ids = self._items_by_word.get(word)
+            if item_ids is None:
+                continue
+            item_ids.discard(item.item_id)
+            if not item_ids:
+                del self._items_by_word[word]
+                for gram in self._grams(word):
+                    gram_words = self._words_by_gram.get(gram)
+                    if gram_words is not None:
+                        gram_words.discard(word)
+                        if not gram_words:
+                            del self._words_by_gram[gram]
+
+    def similar_words(self, word):
+        """{indexed word: edit distance} for the words within allowed_edits(word) of word."""
+        limit = allowed_edits(word)
+        if limit == 0:
+            return {word: 0} if word in self._items_by_word else {}
+        postings = sorted((self._words_by_gram.get(gram, ()) for gram in self._grams(word)), key=len)
+        candidates = set().union(*postings[:3 * limit + 1])
+        found = {}
+        for candidate in candidates:
+            distance = bounded_edit_distance(word, candidate, limit)
+            if distance is not None:
+                found[candidate] = distance
+        return found
+
+    def search(self, text, limit=10, accept=None):
+        """Returns up to limit (item_id, score) pairs, best first; ties go to the lower (older) item ID.
+
+        accept, if given, is called with each candidate item ID and filters it out by returning False.
+        """
+        query_words = list(dict.fromkeys(words(text)))
+        if not query_words:
+            return []
+        scores = {}
+        for query_word in query_words:
+            best = {}  # {item_id: closeness of this query word to the item's closest word}
+            for word, distance in self.similar_words(query_word).items():
+                closeness = 1.0 - distance / (len(query_word) + 1)
+                for item_id in self._items_by_word[word]:
+                    if best.get(item_id, 0.0) < closeness:
+                        best[item_id] = closeness
+            for item_id, closeness in best.items():
+                scores[item_id] = scores.get(item_id, 0.0) + closeness
+        if accept is not None:
+            scores = {item_id: score for item_id, score in scores.items() if accept(item_id)}
+        top = heapq.nsmallest(limit, scores.items(), key=lambda pair: (-pair[1], pair[0]))
+        return [(item_id, round(score / len(query_words), 3)) for item_id, score in top]
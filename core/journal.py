@@ -0,0 +1,166 @@
+# core/journal.py
+import json
+import os
+import threading
+import time
+
+from core.records import (ID_COUNTERS, item_from_record, item_to_record, loan_from_record, loan_to_record,
+                          peek_next_id, reserve_ids, user_from_record, user_to_record)
+
+SNAPSHOT_FILE = "snapshot.json"
+JOURNAL_FILE = "journal.log"
+
+
+class Journal:
+    """Append-only log of LibraryManager operations, compacted into periodic snapshots.
+
+    Each entry stores the records an operation left behind, so replaying it needs no business logic
+    and gives the same result on any day. Writes are fsync'ed every `sync_every` entries or
+    `sync_interval` seconds, whichever comes first.
+    """
+
+    def __init__(self, directory, sync_every=64, sync_interval=1.0, snapshot_every=10000):
+        self.directory = directory
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.manager = None
+        self._lock = threading.RLock()
+        self._file = None
+        self._seq = 0
+        self._unsynced = 0
+        self._since_snapshot = 0
+        self._last_sync = time.monotonic()
+
+    # --- Startup ---
+    def attach(self, manager):
+        """Restores the manager from the latest snapshot plus the journal tail, then starts logging its changes."""
+        os.makedirs(self.directory, exist_ok=True)
+        next_ids = {kind: 1 for kind in ID_COUNTERS}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._seq = snapshot["seq"]
+            next_ids.update(snapshot["next_ids"])
+            self._apply(manager, snapshot, next_ids)
+        if os.path.exists(self.journal_path):
+            self._replay(manager, next_ids)
+        for kind, cls in ID_COUNTERS.items():
+            reserve_ids(cls, next_ids[kind])
+        manager.rebuild_indexes()
+        self.manager = manager
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+        manager.journal = self
+
+    def _replay(self, manager, next_ids):
+        """Applies the logged entries, then cuts off a torn write at the end so new entries start on a clean line."""
+        with open(self.journal_path, "r+b") as f:
+            intact = 0  # Byte offset just past the last complete entry
+            for line in iter(f.readline, b""):
+                if not line.endswith(b"\n"):
+                    break  # The final write never finished.
+                try:
+                    entry = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break  # A torn write at the end of the log; everything before it is intact.
+                intact += len(line)
+                if entry["seq"] > self._seq:
+                    self._seq = entry["seq"]
+                    self._apply(manager, entry, next_ids)
+                    self._since_snapshot += 1
+            if intact < os.fstat(f.fileno()).st_size:
+                f.truncate(intact)
+                f.flush()
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _apply(manager, entry, next_ids):
+        for record in entry.get("items", ()):
+            item = item_from_record(record)
+            manager.items[item.item_id] = item
+            next_ids["item"] = max(next_ids["item"], item.item_id + 1)
+        for record in entry.get("users", ()):
+            user = user_from_record(record)
+            manager.users[user.user_id] = user
+            next_ids["user"] = max(next_ids["user"], user.user_id + 1)
+        for record in entry.get("loans", ()):
+            loan = loan_from_record(record)
+            manager.loans[loan.loan_id] = loan
+            next_ids["loan"] = max(next_ids["loan"], loan.loan_id + 1)
+        for item_id in entry.get("deleted_items", ()):
+            manager.items.pop(item_id, None)
+        for user_id in entry.get("deleted_users", ()):
+            manager.users.pop(user_id, None)
+
+    # --- Logging ---
+    def record(self, op, items=(), users=(), loans=(), deleted_items=(), deleted_users=()):
+        """Appends one operation to the journal."""
+        with self._lock:
+            self._seq += 1
+            entry = {"seq": self._seq, "op": op}
+            if items:
+                entry["items"] = [item_to_record(item) for item in items]
+            if users:
+                entry["users"] = [user_to_record(user) for user in users]
+            if loans:
+                entry["loans"] = [loan_to_record(loan) for loan in loans]
+            if deleted_items:
+                entry["deleted_items"] = list(deleted_items)
+            if deleted_users:
+                entry["deleted_users"] = list(deleted_users)
+            self._file.write(json.dumps(entry) + "\n")
+            self._unsynced += 1
+            self._since_snapshot += 1
+            if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self.sync()
+            if self._since_snapshot >= self.snapshot_every:
+                self.snapshot()
+
+    def sync(self):
+        """Forces every logged operation onto disk."""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    # --- Compaction ---
+    def snapshot(self):
+        """Writes the manager's full state to a new snapshot and starts an empty journal."""
+        with self._lock:
+            manager = self.manager
+            # Other threads keep changing the manager meanwhile, so its tables are copied before they are walked.
+            # A change that lands after self._seq is both in the snapshot and in the new journal, which is fine:
+            # replaying an entry just stores the records it left behind again.
+            items, users, loans = (list(table.values()) for table in (manager.items, manager.users, manager.loans))
+            snapshot = {
+                "seq": self._seq,
+                "next_ids": {kind: peek_next_id(cls) for kind, cls in ID_COUNTERS.items()},
+                "items": [item_to_record(item) for item in items],
+                "users": [user_to_record(user) for user in users],
+                "loans": [loan_to_record(loan) for loan in loans],
+            }
+            temp_path = self.snapshot_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.snapshot_path)
+            # Entries up to self._seq are now covered by the snapshot, so the log can start over.
+            self._file.close()
+            self._file = open(self.journal_path, "w", encoding="utf-8")
+            self._unsynced = 0
+            self._since_snapshot = 0
+            self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self.sync()
+                self._file.close()
+                self._file = None
+            if self.manager is not None:
+                self.manager.journal = None
+                self.manager = None
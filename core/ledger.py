@@ -0,0 +1,158 @@
+# core/ledger.py
+import bisect
+
+LOAN_STATUSES = (None, "open", "overdue")
+
+
+class LedgerEntry:
+    """A loan together with the item title and user name it is listed under."""
+    __slots__ = ("loan", "item_title", "user_name")
+
+    def __init__(self, loan, item_title, user_name):
+        self.loan = loan
+        self.item_title = item_title
+        self.user_name = user_name
+
+    @property
+    def is_open(self):
+        return self.loan.return_date is None
+
+    def matches(self, status, today):
+        if status is None:
+            return True
+        if status == "open":
+            return self.loan.return_date is None
+        return self.loan.return_date is None and self.loan.due_date < today
+
+
+class LoanLedger:
+    """Every loan in borrowing order (ascending loan ID), with its item title and user name copied in.
+
+    Listing a page touches only the entries on that page: nothing is sorted and no item or user is looked up.
+    Open loans and each user's and item's loans are kept in their own ID lists, so filtered pages skip the rest,
+    and how often each user has borrowed each item is counted as loans are added.
+    """
+
+    def __init__(self):
+        self.loan_ids = []
+        self._entries = {}  # {loan_id: LedgerEntry}
+        self._open_ids = []
+        self._by_user = {}  # {user_id: [loan_id, ...]}
+        self._by_item = {}  # {item_id: [loan_id, ...]}
+        self._borrow_counts = {}  # {user_id: {item_id: times borrowed}}
+
+    def __len__(self):
+        return len(self.loan_ids)
+
+    @staticmethod
+    def _append(ids, loan_id):
+        # Loans almost always arrive in ID order, so this is an append.
+        if not ids or ids[-1] < loan_id:
+            ids.append(loan_id)
+        else:
+            bisect.insort(ids, loan_id)
+
+    @staticmethod
+    def _discard(ids, loan_id):
+        index = bisect.bisect_left(ids, loan_id)
+        if index < len(ids) and ids[index] == loan_id:
+            del ids[index]
+
+    # --- Maintenance ---
+    def add(self, loan, item_title, user_name):
+        if loan.loan_id in self._entries:
+            return self.update_loan(loan)  # Already picked up while the ledger was being built.
+        self._entries[loan.loan_id] = LedgerEntry(loan, item_title, user_name)
+        self._append(self.loan_ids, loan.loan_id)
+        self._append(self._by_user.setdefault(loan.user_id, []), loan.loan_id)
+        self._append(self._by_item.setdefault(loan.item_id, []), loan.loan_id)
+        user_counts = self._borrow_counts.setdefault(loan.user_id, {})
+        user_counts[loan.item_id] = user_counts.get(loan.item_id, 0) + 1
+        if loan.return_date is None:
+            self._append(self._open_ids, loan.loan_id)
+
+    def update_loan(self, loan):
+        """Records a change to a listed loan, such as its return."""
+        self._entries[loan.loan_id].loan = loan
+        if loan.return_date is not None:
+            self._discard(self._open_ids, loan.loan_id)
+
+    def rename_item(self, item_id, title):
+        for loan_id in self._by_item.get(item_id, ()):
+            self._entries[loan_id].item_title = title
+
+    def rename_user(self, user_id, name):
+        for loan_id in self._by_user.get(user_id, ()):
+            self._entries[loan_id].user_name = name
+
+    # --- Queries ---
+    def get(self, loan_id):
+        return self._entries.get(loan_id)
+
+    def _source(self, status, user_id, item_id):
+        """The shortest ID list that holds every match; returns (ids, whether entries still need checking)."""
+        if status not in LOAN_STATUSES:
+            raise ValueError(f"❌ Error: Unknown loan status '{status}' (use 'open' or 'overdue').")
+        if user_id is not None and item_id is not None:
+            user_ids, item_ids = self._by_user.get(user_id, []), self._by_item.get(item_id, [])
+            return min(user_ids, item_ids, key=len), True
+        if user_id is not None:
+            return self._by_user.get(user_id, []), status is not None
+        if item_id is not None:
+            return self._by_item.get(item_id, []), status is not None
+        return (self._open_ids if status else self.loan_ids), status == "overdue"
+
+    def _matches(self, entry, status, user_id, item_id, today):
+        loan = entry.loan
+        return ((user_id is None or loan.user_id == user_id) and (item_id is None or loan.item_id == item_id)
+                and entry.matches(status, today))
+
+    def ids(self, status=None, user_id=None, today=None, item_id=None):
+        """IDs of the loans matching the filters, oldest first. status is None, "open" or "overdue"."""
+        source, check = self._source(status, user_id, item_id)
+        if not check:
+            return list(source)
+        return [loan_id for loan_id in source
+                if self._matches(self._entries[loan_id], status, user_id, item_id, today)]
+
+    def page(self, cursor=None, limit=50, status=None, user_id=None, today=None, item_id=None):
+        """Returns (entries, next_cursor) for up to `limit` loans, newest first.
+
+        Pass the returned next_cursor to get the following page; it is None after the last page.
+        """
+        source, check = self._source(status, user_id, item_id)
+        position = bisect.bisect_left(source, cursor) if cursor is not None else len(source)
+        entries = []
+        while position > 0 and len(entries) < limit:
+            position -= 1
+            entry = self._entries[source[position]]
+            if not check or self._matches(entry, status, user_id, item_id, today):
+                entries.append(entry)
+        next_cursor = entries[-1].loan.loan_id if entries and position > 0 else None
+        return entries, next_cursor
+
+    # --- History ---
+    def last_loan(self, item_id):
+        """The most recent loan of an item, or None if it has never been borrowed."""
+        loan_ids = self._by_item.get(item_id)
+        return self._entries[loan_ids[-1]] if loan_ids else None
+
+    def borrow_count(self, user_id, item_id):
+        return self._borrow_counts.get(user_id, {}).get(item_id, 0)
+
+    def items_borrowed_by(self, user_id, min_count=1):
+        """{item_id: times borrowed} for the items the user has borrowed at least min_count times."""
+        counts = self._borrow_counts.get(user_id, {})
+        if min_count <= 1:
+            return dict(counts)
+        return {item_id: count for item_id, count in counts.items() if count >= min_count}
+
+    def borrowers_of(self, item_id, min_count=1):
+        """{user_id: times borrowed} for the users who have borrowed the item at least min_count times."""
+        counts = {}
+        for loan_id in self._by_item.get(item_id, ()):
+            user_id = self._entries[loan_id].loan.user_id
+            counts[user_id] = counts.get(user_id, 0) + 1
+        if min_count <= 1:
+            return counts
+        return {user_id: count for user_id, count in counts.items() if count >= min_count}
@@ -1,123 +1,962 @@
 # core/library_manager.py
+import bisect
+import itertools
+import threading
+from contextlib import nullcontext
 from datetime import date
+from core.batch import BatchResult, ItemOutcome
+from core.catalog import CatalogIndex, ItemQuery
+from core.events import (ChangeTracker, EventBus, FineApplied, FinesApplied, ItemAdded, ItemDeleted, ItemsAdded,
+                         ItemUpdated, LoanClosed, LoanOpened, LoansClosed, LoansOpened, UserAdded, UserDeleted,
+                         UsersAdded, UserUpdated)
+from core.fines import FineEngine
+from core.fuzzy import FuzzyIndex
+from core.ledger import LoanLedger
+from core.locking import LockStripes, NullLocks
+from core.records import USER_FIELDS, checked_changes, item_fields
+from core.render_cache import RenderCache
+from core.stats import ManagerStats
+from core.storage import MemoryStorage
 from models.loan import Loan
 
 
+class NgramIndex:
+    """Inverted n-gram index over a text attribute of library items."""
+
+    def __init__(self, attribute="title", n=3):
+        self.attribute = attribute
+        self.n = n
+        self._postings = {}  # {gram: {item_id, ...}}
+
+    def _grams(self, text):
+        n = self.n
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def add(self, item):
+        item_id = item.item_id
+        for gram in self._grams(getattr(item, self.attribute).lower()):
+            postings = self._postings.get(gram)
+            if postings is None:
+                self._postings[gram] = {item_id}
+            else:
+                postings.add(item_id)
+
+    def remove(self, item):
+        item_id = item.item_id
+        for gram in self._grams(getattr(item, self.attribute).lower()):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(item_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def candidates(self, query):
+        """Returns the IDs of items that contain every n-gram of the (lowercased) query.
+
+        Returns None when the query is shorter than n, since the index cannot narrow it down.
+        """
+        grams = self._grams(query)
+        if not grams:
+            return None
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def estimate(self, query):
+        """An upper bound on the number of candidates for the query, or None if the index cannot narrow it."""
+        grams = self._grams(query)
+        if not grams:
+            return None
+        return min(len(self._postings.get(gram, ())) for gram in grams)
+
+
 class LibraryManager:
     """Manages all library operations."""
+    # Public operations timed while stats are enabled.
+    INSTRUMENTED_OPERATIONS = ("add_item", "add_items_bulk", "find_item", "update_item", "delete_item", "add_user",
+                               "add_users_bulk", "find_user", "update_user", "delete_user", "borrow_item",
+                               "return_item", "borrow_items", "return_items", "find_active_loan",
+                               "active_loans_for_user", "search_items_by_title", "filter_items_by_status",
+                               "query_item_ids", "fuzzy_search", "search_users", "item_ids", "user_ids", "loan_ids",
+                               "loan_page", "user_history", "item_history", "last_borrower", "repeat_borrows",
+                               "get_many", "ledger_entries", "render_item", "render_user", "item_page",
+                               "user_page")
+
+    def __init__(self, storage=None, index_titles=True, thread_safe=False, lock_stripes=64, fine_per_day=1.0,
+                 max_fine_per_loan=None, max_fine_per_user=None, render_cache_size=10_000):
+        # The storage backend owns the records; MemoryStorage keeps them in plain dicts.
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.items = self.storage.items  # {item_id: item_object}
+        self.users = self.storage.users  # {user_id: user_object}
+        self.loans = self.storage.loans  # {loan_id: loan_object}
+        self.index_titles = index_titles
+        self._title_index = None  # Built on the first title search, then kept up to date.
+        self._catalog = None  # CatalogIndex over genre, type, status, year and author, built on the first query.
+        self._fuzzy_index = None  # FuzzyIndex over title and creator words, built on the first fuzzy search.
+        self._active_loans = None  # {item_id: open_loan}, built on first use.
+        self._active_loans_by_user = None  # {user_id: {item_id: open_loan}}
+        self._ledger = None  # LoanLedger of every loan in borrowing order, built on first use.
+        self._fine_engine = None  # FineEngine with live fines for all loans, built on first use.
+        self._id_orders = {}  # {"items"/"users": sorted IDs} for dict-backed tables, built on the first page.
+        self.fine_per_day = fine_per_day
+        self.max_fine_per_loan = max_fine_per_loan
+        self.max_fine_per_user = max_fine_per_user
+        self.journal = None  # Set by Journal.attach() to log every change.
+        # display_info() text of recently shown records; entries are discarded whenever their record changes.
+        self._item_renders = RenderCache(render_cache_size)
+        self._user_renders = RenderCache(render_cache_size)
+        self.events = EventBus()  # Silent until something subscribes.
+        self.stats = ManagerStats()  # Disabled until enable_stats() is called.
+        # In thread-safe mode each operation locks the stripes of the users/items it touches, so circulation
+        # desks working on different records do not wait on each other. Shared indexes have their own lock.
+        self.thread_safe = thread_safe
+        self._locks = LockStripes(lock_stripes) if thread_safe else NullLocks()
+        self._index_lock = threading.RLock() if thread_safe else nullcontext()
+        if thread_safe:
+            # Built up front: a lazy build could miss loans opened by other threads while it runs.
+            self._build_active_loan_index()
+
+    # --- Indexes ---
+    def rebuild_indexes(self):
+        """Drops all derived indexes so they are rebuilt from the records on next use.
+
+        Call it after writing records straight into the storage tables (items, users, loans), which the
+        indexes do not see. In thread-safe mode the active-loan index is rebuilt at once, as in __init__.
+        """
+        with self._index_lock:
+            self._title_index = None
+            self._catalog = None
+            self._fuzzy_index = None
+            self._active_loans = None
+            self._active_loans_by_user = None
+            self._ledger = None
+            self._id_orders = {}
+            self._item_renders.clear()
+            self._user_renders.clear()
+            if self._fine_engine is not None:
+                self._fine_engine.close()
+                self._fine_engine = None
+            if self.thread_safe:
+                self._build_active_loan_index()
+
+    def _get_title_index(self):
+        if self._title_index is None and self.index_titles:
+            with self._index_lock:
+                if self._title_index is None:
+                    self.stats.count("title_index.build")
+                    title_index = NgramIndex("title")
+                    for item in self.items.values():
+                        title_index.add(item)
+                    self._title_index = title_index
+        return self._title_index
+
+    def _get_catalog(self):
+        if self._catalog is None:
+            with self._index_lock:
+                if self._catalog is None:
+                    self.stats.count("catalog_index.build")
+                    catalog = CatalogIndex()
+                    for item in self._all_items():
+                        catalog.add(item)
+                    self._catalog = catalog
+        return self._catalog
+
+    def _get_fuzzy_index(self):
+        if self._fuzzy_index is None:
+            with self._index_lock:
+                if self._fuzzy_index is None:
+                    self.stats.count("fuzzy_index.build")
+                    fuzzy_index = FuzzyIndex()
+                    for item in self._all_items():
+                        fuzzy_index.add(item)
+                    self._fuzzy_index = fuzzy_index
+        return self._fuzzy_index
+
+    def _build_active_loan_index(self):
+        with self._index_lock:
+            if self._active_loans_by_user is not None:
+                return
+            self.stats.count("active_loan_index.build")
+            self._active_loans_by_user = {}
+            self._active_loans = {}
+            for loan in self.storage.open_loans():
+                self._open_loan(loan)
+
+    def _open_loan(self, loan):
+        self._active_loans[loan.item_id] = loan
+        self._active_loans_by_user.setdefault(loan.user_id, {})[loan.item_id] = loan
+
+    def _close_loan(self, loan):
+        if self._active_loans.get(loan.item_id) is loan:
+            del self._active_loans[loan.item_id]
+        user_loans = self._active_loans_by_user[loan.user_id]
+        del user_loans[loan.item_id]
+        if not user_loans:
+            del self._active_loans_by_user[loan.user_id]
+
+    def find_active_loan(self, item_id):
+        """Returns the open loan for an item, or None if it is not on loan."""
+        if self._active_loans is None:
+            self._build_active_loan_index()
+        return self._active_loans.get(item_id)
+
+    def active_loans_for_user(self, user_id):
+        """Returns the user's open loans."""
+        if self._active_loans_by_user is None:
+            self._build_active_loan_index()
+        return list(self._active_loans_by_user.get(user_id, {}).values())
+
+    def _find_user_active_loan(self, user_id, item_id):
+        if self._active_loans_by_user is None:
+            self._build_active_loan_index()
+        return self._active_loans_by_user.get(user_id, {}).get(item_id)
+
+    def _item_title(self, item_id):
+        item = self.items.get(item_id)
+        return item.title if item else f"Deleted Item (ID: {item_id})"
+
+    def _user_name(self, user_id):
+        user = self.users.get(user_id)
+        return user.name if user else f"Deleted User (ID: {user_id})"
 
-    def __init__(self):
-        self.items = {}  # {item_id: item_object}
-        self.users = {}  # {user_id: user_object}
-        self.loans = {}  # {loan_id: loan_object}
+    def _get_ledger(self):
+        if self._ledger is None:
+            with self._index_lock:
+                if self._ledger is None:
+                    self.stats.count("ledger.build")
+                    ledger = LoanLedger()
+                    titles, names = {}, {}
+                    for loan in sorted(self.loans.values(), key=lambda loan: loan.loan_id):
+                        if loan.item_id not in titles:
+                            titles[loan.item_id] = self._item_title(loan.item_id)
+                        if loan.user_id not in names:
+                            names[loan.user_id] = self._user_name(loan.user_id)
+                        ledger.add(loan, titles[loan.item_id], names[loan.user_id])
+                    self._ledger = ledger
+        return self._ledger
+
+    def _update_ledger(self, method, *args):
+        """Applies a change to the loan ledger if it has been built; otherwise the build will pick it up."""
+        with self._index_lock:
+            if self._ledger is not None:
+                getattr(self._ledger, method)(*args)
+
+    def _index_item(self, item):
+        with self._index_lock:
+            if self._title_index is not None:
+                self._title_index.add(item)
+            if self._catalog is not None:
+                self._catalog.add(item)
+            if self._fuzzy_index is not None:
+                self._fuzzy_index.add(item)
+
+    def _unindex_item(self, item):
+        with self._index_lock:
+            if self._title_index is not None:
+                self._title_index.remove(item)
+            if self._catalog is not None:
+                self._catalog.remove(item)
+            if self._fuzzy_index is not None:
+                self._fuzzy_index.remove(item)
+
+    def _set_item_status(self, item, status):
+        with self._index_lock:
+            if self._catalog is not None:
+                self._catalog.set_status(item, status)
+        item.status = status
+        self._item_renders.discard(item.item_id)
+
+    def _set_items_status(self, items, status):
+        """_set_item_status for a whole batch, under one acquisition of the index lock."""
+        with self._index_lock:
+            catalog = self._catalog
+            for item in items:
+                if catalog is not None:
+                    catalog.set_status(item, status)
+                item.status = status
+        self._item_renders.discard_many(item.item_id for item in items)
 
     # --- Item Management ---
     def add_item(self, item):
-        self.items[item.item_id] = item
-        print(f"✅ Item '{item.title}' added with ID {item.item_id}.")
+        with self._locks.hold(("item", item.item_id)):
+            indexed = any(index is not None for index in (self._title_index, self._catalog, self._fuzzy_index))
+            existing = self.items.get(item.item_id) if indexed else None
+            if existing is not None:
+                self._unindex_item(existing)
+            self.items[item.item_id] = item
+            self._index_item(item)
+            self._order_ids("items", (item.item_id,))
+            self._item_renders.discard(item.item_id)
+            self._log("add_item", items=(item,))
+        self.events.publish(ItemAdded, item)
+
+    def add_items_bulk(self, items):
+        """Adds many items in one pass, without per-item output. Returns the number of items added."""
+        items = list(items)
+        # Holds the same stripes as add_item would for each of them (a big batch ends up holding them all).
+        with self._locks.hold(*(("item", item.item_id) for item in items)):
+            if any(index is not None for index in (self._title_index, self._catalog, self._fuzzy_index)):
+                for item in items:
+                    existing = self.items.get(item.item_id)
+                    if existing is not None:
+                        self._unindex_item(existing)
+            self.items.update((item.item_id, item) for item in items)
+            for item in items:
+                self._index_item(item)
+            self._order_ids("items", [item.item_id for item in items])
+            self._item_renders.discard_many(item.item_id for item in items)
+            self._log("add_items_bulk", items=items)
+        self.events.publish(ItemsAdded, items)
+        return len(items)
 
     def find_item(self, item_id):
         return self.items.get(item_id)
 
     # --- NEW: update_item method ---
     def update_item(self, item_id, **new_data):
-        """Updates an existing item's attributes."""
-        item = self.find_item(item_id)
-        if not item:
-            raise ValueError("❌ Error: Item not found.")
+        """Updates an existing item's attributes.
 
-        for key, value in new_data.items():
-            if hasattr(item, key):
-                setattr(item, key, value)
-        print(f"✅ Item ID {item_id} has been updated.")
+        Only the item's own fields can be set, with values of their type (see records.FIELD_TYPES); anything
+        else raises ValueError before the item is touched. Status changes to or from Borrowed are refused, as
+        only borrowing and returning keep the loans in step.
+        """
+        with self._locks.hold(("item", item_id)):
+            item = self.find_item(item_id)
+            if not item:
+                raise ValueError("❌ Error: Item not found.")
+            changes = checked_changes(item_fields(item), new_data)
+            status = changes.get("status", item.status)
+            if status != item.status and "Borrowed" in (status, item.status):
+                raise ValueError("❌ Error: An item is only borrowed or returned through a loan.")
+
+            self._unindex_item(item)
+            try:
+                for key, value in changes.items():
+                    setattr(item, key, value)
+                item.intern_fields()
+                self.items[item_id] = item
+            finally:
+                self._index_item(item)  # Even if the storage write failed, the indexes match the item again.
+            self._item_renders.discard(item_id)
+            self._update_ledger("rename_item", item_id, item.title)
+            self._log("update_item", items=(item,))
+        self.events.publish(ItemUpdated, item)
 
     def delete_item(self, item_id):
-        item = self.find_item(item_id)
-        if not item:
-            raise ValueError("❌ Error: Item not found.")
-        if item.status == "Borrowed":
-            raise ValueError("❌ Error: Cannot delete a borrowed item.")
-        del self.items[item_id]
-        print(f"🗑️ Item with ID {item_id} has been deleted.")
+        with self._locks.hold(("item", item_id)):
+            item = self.find_item(item_id)
+            if not item:
+                raise ValueError("❌ Error: Item not found.")
+            if item.status == "Borrowed":
+                raise ValueError("❌ Error: Cannot delete a borrowed item.")
+            del self.items[item_id]
+            self._unindex_item(item)
+            self._unorder_id("items", item_id)
+            self._item_renders.discard(item_id)
+            self._update_ledger("rename_item", item_id, self._item_title(item_id))
+            self._log("delete_item", deleted_items=(item_id,))
+        self.events.publish(ItemDeleted, item)
 
     # --- User Management ---
     def add_user(self, user):
-        self.users[user.user_id] = user
-        print(f"✅ User '{user.name}' registered with ID {user.user_id}.")
+        with self._locks.hold(("user", user.user_id)):
+            self.users[user.user_id] = user
+            self._order_ids("users", (user.user_id,))
+            self._user_renders.discard(user.user_id)
+            self._log("add_user", users=(user,))
+        self.events.publish(UserAdded, user)
+
+    def add_users_bulk(self, users):
+        """Adds many users in one pass, without per-user output. Returns the number of users added."""
+        users = list(users)
+        with self._locks.hold(*(("user", user.user_id) for user in users)):
+            self.users.update((user.user_id, user) for user in users)
+            self._order_ids("users", [user.user_id for user in users])
+            self._user_renders.discard_many(user.user_id for user in users)
+            self._log("add_users_bulk", users=users)
+        self.events.publish(UsersAdded, users)
+        return len(users)
 
     def find_user(self, user_id):
         return self.users.get(user_id)
 
     # --- NEW: update_user method ---
     def update_user(self, user_id, **new_data):
-        """Updates an existing user's attributes."""
-        user = self.find_user(user_id)
-        if not user:
-            raise ValueError("❌ Error: User not found.")
+        """Updates an existing user's name, contact info or borrowing limit; other fields raise ValueError."""
+        with self._locks.hold(("user", user_id)):
+            user = self.find_user(user_id)
+            if not user:
+                raise ValueError("❌ Error: User not found.")
 
-        for key, value in new_data.items():
-            if hasattr(user, key):
+            for key, value in checked_changes(USER_FIELDS, new_data).items():
                 setattr(user, key, value)
-        print(f"✅ User ID {user_id} has been updated.")
+            self.users[user_id] = user
+            self._user_renders.discard(user_id)
+            self._update_ledger("rename_user", user_id, user.name)
+            self._log("update_user", users=(user,))
+        self.events.publish(UserUpdated, user)
 
     def delete_user(self, user_id):
-        user = self.find_user(user_id)
-        if not user:
-            raise ValueError("❌ Error: User not found.")
-        if user.borrowed_items:
-            raise ValueError("❌ Error: Cannot delete a user with borrowed items.")
-        del self.users[user_id]
-        print(f"🗑️ User with ID {user_id} has been deleted.")
+        with self._locks.hold(("user", user_id)):
+            user = self.find_user(user_id)
+            if not user:
+                raise ValueError("❌ Error: User not found.")
+            if user.borrowed_items:
+                raise ValueError("❌ Error: Cannot delete a user with borrowed items.")
+            del self.users[user_id]
+            self._unorder_id("users", user_id)
+            self._user_renders.discard(user_id)
+            self._update_ledger("rename_user", user_id, self._user_name(user_id))
+            self._log("delete_user", deleted_users=(user_id,))
+        self.events.publish(UserDeleted, user)
 
     # ... (Borrowing & Returning methods are unchanged) ...
     def borrow_item(self, user_id, item_id):
-        user = self.find_user(user_id)
-        item = self.find_item(item_id)
-
-        if not user: raise ValueError("❌ Error: User not found.")
-        if not item: raise ValueError("❌ Error: Item not found.")
+        with self._locks.hold(("user", user_id), ("item", item_id)):
+            user = self.find_user(user_id)
+            item = self.find_item(item_id)
 
-        if item.status != "Available":
-            raise ValueError("❌ Error: Item is not available for borrowing.")
-        if len(user.borrowed_items) >= user.max_borrow_limit:
-            raise ValueError("❌ Error: User has reached the maximum borrowing limit.")
+            if not user: raise ValueError("❌ Error: User not found.")
+            if not item: raise ValueError("❌ Error: Item not found.")
 
-        item.status = "Borrowed"
-        user.borrowed_items.append(item.item_id)
-        new_loan = Loan(item_id=item.item_id, user_id=user.user_id)
-        self.loans[new_loan.loan_id] = new_loan
+            if item.status != "Available":
+                raise ValueError("❌ Error: Item is not available for borrowing.")
+            if len(user.borrowed_items) >= user.max_borrow_limit:
+                raise ValueError("❌ Error: User has reached the maximum borrowing limit.")
 
-        print(f"✅ Item '{item.title}' borrowed by '{user.name}'. Due: {new_loan.due_date}.")
+            self._set_item_status(item, "Borrowed")
+            user.borrowed_items.add(item.item_id)
+            new_loan = Loan(item_id=item.item_id, user_id=user.user_id)
+            self.items[item.item_id] = item
+            self.users[user.user_id] = user
+            self._user_renders.discard(user.user_id)
+            self.loans[new_loan.loan_id] = new_loan
+            if self._active_loans is not None:
+                self._open_loan(new_loan)
+            self._update_ledger("add", new_loan, item.title, user.name)
+            self._log("borrow_item", items=(item,), users=(user,), loans=(new_loan,))
+        self.events.publish(LoanOpened, new_loan, item, user)
 
     def return_item(self, user_id, item_id):
-        user = self.find_user(user_id)
-        item = self.find_item(item_id)
-
-        if not user: raise ValueError("❌ Error: User not found.")
-        if not item: raise ValueError("❌ Error: Item not found.")
-        if item.item_id not in user.borrowed_items:
-            raise ValueError("❌ Error: This user has not borrowed this item.")
-
-        active_loan = None
-        for loan in self.loans.values():
-            if loan.user_id == user_id and loan.item_id == item_id and loan.return_date is None:
-                active_loan = loan
-                break
+        with self._locks.hold(("user", user_id), ("item", item_id)):
+            user = self.find_user(user_id)
+            item = self.find_item(item_id)
 
-        if not active_loan:
-            raise ValueError("❌ Error: Active loan record not found.")
+            if not user: raise ValueError("❌ Error: User not found.")
+            if not item: raise ValueError("❌ Error: Item not found.")
+            if item.item_id not in user.borrowed_items:
+                raise ValueError("❌ Error: This user has not borrowed this item.")
 
-        item.status = "Available"
-        user.borrowed_items.remove(item.item_id)
-        active_loan.return_date = date.today()
-        fine = active_loan.calculate_fine()
+            active_loan = self._find_user_active_loan(user_id, item_id)
+            if not active_loan:
+                raise ValueError("❌ Error: Active loan record not found.")
 
-        print(f"✅ Item '{item.title}' returned by '{user.name}'.")
+            self._set_item_status(item, "Available")
+            user.borrowed_items.remove(item.item_id)
+            active_loan.return_date = date.today()
+            self._close_loan(active_loan)
+            fine = active_loan.calculate_fine(self.fine_per_day, self.max_fine_per_loan)
+            self.items[item.item_id] = item
+            self.users[user.user_id] = user
+            self._user_renders.discard(user.user_id)
+            self.loans[active_loan.loan_id] = active_loan
+            self._update_ledger("update_loan", active_loan)
+            self._log("return_item", items=(item,), users=(user,), loans=(active_loan,))
+        self.events.publish(LoanClosed, active_loan, item, user)
         if fine > 0:
-            print(f"🔔 A fine of ${fine:.2f} has been applied for late return.")
+            self.events.publish(FineApplied, active_loan, fine)
+
+    # --- Batch circulation ---
+    def _batch_locks(self, user_id, item_ids):
+        return self._locks.hold(("user", user_id), *(("item", item_id) for item_id in item_ids))
+
+    def borrow_items(self, user_id, item_ids):
+        """Borrows a stack of items for one user as a single transaction: all of them, or none.
+
+        The whole batch is checked first (each item exists, is available and is listed once, and together
+        they fit the user's max_borrow_limit). Returns a BatchResult with one outcome per item; if any item
+        fails, nothing is changed and the failing items carry the reason. The batch is journaled once and
+        announced as one LoansOpened event.
+        """
+        item_ids = list(item_ids)
+        with self._batch_locks(user_id, item_ids):
+            user = self.find_user(user_id)
+            if not user: raise ValueError("❌ Error: User not found.")
+            items = self.get_many("items", item_ids)
+            outcomes, seen = [], set()
+            room = user.max_borrow_limit - len(user.borrowed_items)
+            for item_id, item in zip(item_ids, items):
+                if item is None:
+                    error = "❌ Error: Item not found."
+                elif item_id in seen:
+                    error = "❌ Error: Item is listed more than once."
+                elif item.status != "Available":
+                    error = "❌ Error: Item is not available for borrowing."
+                elif room <= 0:
+                    error = "❌ Error: User has reached the maximum borrowing limit."
+                else:
+                    error = None
+                    room -= 1
+                seen.add(item_id)
+                outcomes.append(ItemOutcome(item_id, error))
+            if not item_ids or any(not outcome.ok for outcome in outcomes):
+                return BatchResult("borrowed", user_id, outcomes, applied=False)
+
+            loans = [Loan(item_id=item.item_id, user_id=user.user_id) for item in items]
+            self._set_items_status(items, "Borrowed")
+            written = []
+            try:
+                with self.storage.transaction():
+                    for item, loan in zip(items, loans):
+                        user.borrowed_items.add(item.item_id)
+                        written.append((item, loan))
+                        self.items[item.item_id] = item
+                        self.loans[loan.loan_id] = loan
+                    self.users[user.user_id] = user
+            except Exception:
+                # A storage write failed part way. The transaction undid the stored rows; put back the objects.
+                self._set_items_status(items, "Available")
+                for item, loan in written:
+                    user.borrowed_items.discard(item.item_id)
+                    self.loans.pop(loan.loan_id, None)  # Still there if the storage holds the objects themselves
+                raise
+            self._user_renders.discard(user.user_id)
+            with self._index_lock:
+                for outcome, item, loan in zip(outcomes, items, loans):
+                    outcome.loan = loan
+                    if self._active_loans is not None:
+                        self._open_loan(loan)
+                    if self._ledger is not None:
+                        self._ledger.add(loan, item.title, user.name)
+            self._log("borrow_items", items=items, users=(user,), loans=loans)
+        self.events.publish(LoansOpened, loans, items, user)
+        return BatchResult("borrowed", user_id, outcomes, applied=True)
+
+    def return_items(self, user_id, item_ids):
+        """Returns a stack of items for one user as a single transaction: all of them, or none.
+
+        Each item must be on loan to the user and listed once. Returns a BatchResult as borrow_items does.
+        Late-return fines are charged per loan and announced together as one FinesApplied event.
+        """
+        item_ids = list(item_ids)
+        with self._batch_locks(user_id, item_ids):
+            user = self.find_user(user_id)
+            if not user: raise ValueError("❌ Error: User not found.")
+            items = self.get_many("items", item_ids)
+            outcomes, loans, seen = [], [], set()
+            for item_id, item in zip(item_ids, items):
+                loan = self._find_user_active_loan(user_id, item_id) if item is not None else None
+                if item is None:
+                    error = "❌ Error: Item not found."
+                elif item_id in seen:
+                    error = "❌ Error: Item is listed more than once."
+                elif item_id not in user.borrowed_items:
+                    error = "❌ Error: This user has not borrowed this item."
+                elif loan is None:
+                    error = "❌ Error: Active loan record not found."
+                else:
+                    error = None
+                seen.add(item_id)
+                outcomes.append(ItemOutcome(item_id, error))
+                loans.append(loan)
+            if not item_ids or any(not outcome.ok for outcome in outcomes):
+                return BatchResult("returned", user_id, outcomes, applied=False)
+
+            today = date.today()
+            self._set_items_status(items, "Available")
+            written = []
+            try:
+                with self.storage.transaction():
+                    for item, loan in zip(items, loans):
+                        user.borrowed_items.remove(item.item_id)
+                        written.append((item, loan, loan.fine_amount))
+                        loan.return_date = today
+                        loan.calculate_fine(self.fine_per_day, self.max_fine_per_loan)
+                        self.items[item.item_id] = item
+                        self.loans[loan.loan_id] = loan
+                    self.users[user.user_id] = user
+            except Exception:
+                self._set_items_status(items, "Borrowed")
+                for item, loan, fine_amount in written:
+                    user.borrowed_items.add(item.item_id)
+                    loan.return_date, loan.fine_amount = None, fine_amount
+                raise
+            self._user_renders.discard(user.user_id)
+            with self._index_lock:
+                for outcome, loan in zip(outcomes, loans):
+                    outcome.loan = loan
+                    self._close_loan(loan)
+                    if self._ledger is not None:
+                        self._ledger.update_loan(loan)
+            self._log("return_items", items=items, users=(user,), loans=loans)
+        self.events.publish(LoansClosed, loans, items, user)
+        fined = [loan for loan in loans if loan.fine_amount > 0]
+        if fined:
+            self.events.publish(FinesApplied, fined, sum(loan.fine_amount for loan in fined))
+        return BatchResult("returned", user_id, outcomes, applied=True)
 
     def search_items_by_title(self, title_query):
-        return [item for item in self.items.values() if title_query.lower() in item.title.lower()]
+        query = title_query.lower()
+        index = self._get_title_index()
+        candidate_ids = index.candidates(query) if index is not None else None
+        if candidate_ids is None:
+            self.stats.count("title_index.miss")
+            return [item for item in self._all_items() if query in item.title.lower()]
+        self.stats.count("title_index.hit")
+        # Item IDs are handed out in creation order, so sorting them keeps the catalog order.
+        candidates = (self.items.get(item_id) for item_id in sorted(candidate_ids))
+        return [item for item in candidates if item is not None and query in item.title.lower()]
 
     def filter_items_by_status(self, status):
-        return [item for item in self.items.values() if item.status.lower() == status.lower()]
\ No newline at end of file
+        return list(self.storage.items_with_status(status))
+
+    def query_item_ids(self, query):
+        """IDs of the items matching an ItemQuery, in ascending order.
+
+        The catalog indexes pick the starting candidates (see CatalogIndex.plan); every candidate is then
+        checked against the full query. Without any indexed criterion this falls back to a scan.
+        """
+        if query.is_empty():
+            return sorted(self.items)
+        catalog = self._get_catalog()
+        with self._index_lock:
+            title_index = self._get_title_index() if query.title else None
+            source, candidate_ids = catalog.candidates(query, title_index)
+            if candidate_ids is None:
+                self.stats.count("catalog_index.scan")
+                return sorted(item.item_id for item in self._all_items() if query.matches(item))
+            self.stats.count(f"catalog_index.{source}")
+            candidate_ids = sorted(candidate_ids)
+        candidates = self.get_many("items", candidate_ids)
+        return [item.item_id for item in candidates if item is not None and query.matches(item)]
+
+    def query_items(self, query=None, **criteria):
+        """Items matching an ItemQuery, or the ItemQuery keyword criteria, in catalog order."""
+        query = query if query is not None else ItemQuery(**criteria)
+        return [item for item in self.get_many("items", self.query_item_ids(query)) if item is not None]
+
+    def fuzzy_search(self, text, limit=10, query=None):
+        """Typo-tolerant search over titles and creators. Returns up to limit (item, score) pairs, best first.
+
+        Scores run from 0 to 1; 1.0 means every word of the text was found exactly. An optional ItemQuery
+        narrows the results further, e.g. to available Books.
+        """
+        fuzzy_index = self._get_fuzzy_index()
+        accept = None
+        if query is not None and not query.is_empty():
+            def accept(item_id):
+                item = self.items.get(item_id)
+                return item is not None and query.matches(item)
+        with self._index_lock:
+            ranked = fuzzy_index.search(text, limit, accept)
+        items = self.get_many("items", [item_id for item_id, _ in ranked])
+        return [(item, score) for item, (_, score) in zip(items, ranked) if item is not None]
+
+    def genres(self):
+        """The distinct genres in the catalog, sorted."""
+        return self._get_catalog().genres()
+
+    def search_users(self, query):
+        """Users whose name contains the query (case-insensitively) or whose ID is exactly the query."""
+        matches = self._user_matcher(query)
+        return [user for user in self._all_users() if matches(user)]
+
+    @staticmethod
+    def _user_matcher(query):
+        query = query.lower()
+        return lambda user: query in user.name.lower() or query == str(user.user_id)
+
+    # --- Paging ---
+    PAGE_CANDIDATE_LIMIT = 50_000  # Index candidates sorted per page before a page walks the ID order instead
+
+    def item_page(self, cursor=None, limit=50, query=None):
+        """Returns (items, next_cursor) for one page of the items matching an optional ItemQuery, in ID order.
+
+        Pass next_cursor back in to get the following page; it is None once there are no more items. The
+        cursor is the last item ID returned, so it stays valid while items are added or deleted in between.
+        The title and catalog indexes narrow the candidates once they exist; until then the items are walked in
+        ID order from the cursor and filtered, so a listing's first page never waits for an index to be built.
+        """
+        after = cursor or 0
+        if query is None or query.is_empty():
+            return self._page("items", "item_id", after, limit)
+        candidate_ids = None
+        with self._index_lock:
+            title_index = self._title_index if query.title else None
+            if self._catalog is not None:
+                steps = self._catalog.plan(query, title_index)
+                if steps and steps[0][0] <= self.PAGE_CANDIDATE_LIMIT:
+                    _, candidate_ids = self._catalog.candidates(query, title_index)
+            elif title_index is not None and (title_index.estimate(query.title) or 0) <= self.PAGE_CANDIDATE_LIMIT:
+                candidate_ids = title_index.candidates(query.title)
+            if candidate_ids is not None:
+                candidate_ids = sorted(item_id for item_id in candidate_ids if item_id > after)
+        return self._page("items", "item_id", after, limit, query.matches, candidate_ids)
+
+    def user_page(self, cursor=None, limit=50, query=None):
+        """Returns (users, next_cursor) for one page of users in ID order, optionally matching a name/ID query.
+
+        The cursor works as in item_page().
+        """
+        return self._page("users", "user_id", cursor or 0, limit, self._user_matcher(query) if query else None)
+
+    def iter_items(self, query=None, page_size=500):
+        """Yields every item matching an optional ItemQuery in ID order, one page at a time."""
+        cursor = None
+        while True:
+            items, cursor = self.item_page(cursor, page_size, query)
+            yield from items
+            if cursor is None:
+                return
+
+    def iter_users(self, query=None, page_size=500):
+        """Yields every user matching an optional name/ID query in ID order, one page at a time."""
+        cursor = None
+        while True:
+            users, cursor = self.user_page(cursor, page_size, query)
+            yield from users
+            if cursor is None:
+                return
+
+    def _page(self, kind, id_field, after, limit, matches=None, ids=None):
+        """Collects up to limit records with IDs above after that pass matches: (records, next_cursor).
+
+        Records are read a chunk at a time, in ID order or from the sorted candidate ids.
+        """
+        found = []
+        chunk = limit + 1 if matches is None else max(limit + 1, 256)
+        position = 0
+        while len(found) <= limit:
+            if ids is None:
+                batch = self._keys_after(kind, after, chunk)
+            else:
+                batch, position = ids[position:position + chunk], position + chunk
+            if not batch:
+                break
+            for record in self.get_many(kind, batch):
+                if record is not None and (matches is None or matches(record)):
+                    found.append(record)
+                    if len(found) > limit:
+                        break
+            after = batch[-1]
+        if len(found) > limit:
+            del found[limit:]
+            return found, getattr(found[-1], id_field)
+        return found, None
+
+    def _keys_after(self, kind, after, limit):
+        """Up to limit IDs of "items" or "users" above after, ascending.
+
+        Storage tables that keep their keys in order page themselves; plain dicts get a sorted ID list.
+        """
+        records = getattr(self, kind)
+        keys_after = getattr(records, "keys_after", None)
+        if keys_after is not None:
+            return keys_after(after, limit)
+        with self._index_lock:
+            order = self._id_orders.get(kind)
+            if order is None:
+                self.stats.count("id_order.build")
+                order = self._id_orders[kind] = sorted(records)
+            start = bisect.bisect_right(order, after)
+            return order[start:start + limit]
+
+    def _order_ids(self, kind, ids):
+        with self._index_lock:
+            order = self._id_orders.get(kind)
+            if order is None:
+                return
+            for record_id in ids:
+                if not order or record_id > order[-1]:
+                    order.append(record_id)  # The usual case: IDs are handed out in ascending order.
+                else:
+                    index = bisect.bisect_left(order, record_id)
+                    if index == len(order) or order[index] != record_id:
+                        order.insert(index, record_id)
+
+    def _unorder_id(self, kind, record_id):
+        with self._index_lock:
+            order = self._id_orders.get(kind)
+            if order is not None:
+                index = bisect.bisect_left(order, record_id)
+                if index < len(order) and order[index] == record_id:
+                    del order[index]
+
+    def item_ids(self, title_query=None, status=None):
+        """IDs of the items matching the optional title substring and status, in ascending order."""
+        return self.query_item_ids(ItemQuery(title=title_query, status=status))
+
+    def user_ids(self, query=None):
+        """IDs of the users matching the optional name/ID query, in ascending order."""
+        if query:
+            return sorted(user.user_id for user in self.search_users(query))
+        return sorted(self.users)
+
+    def loan_ids(self, status=None, user_id=None, item_id=None):
+        """IDs of the loans matching the filters, in borrowing order. status is None, "open" or "overdue"."""
+        return self._get_ledger().ids(status, user_id, date.today(), item_id)
+
+    def loan_page(self, cursor=None, limit=50, status=None, user_id=None, item_id=None):
+        """Returns (ledger_entries, next_cursor) for one page of loans, newest first.
+
+        Each LedgerEntry carries the loan with its item title and user name. Pass next_cursor back in to get
+        the following page; it is None once there are no older loans.
+        """
+        return self._get_ledger().page(cursor, limit, status, user_id, date.today(), item_id)
+
+    # --- Loan history ---
+    def user_history(self, user_id, cursor=None, limit=50):
+        """One page of everything a user has borrowed, newest first: (ledger_entries, next_cursor)."""
+        return self.loan_page(cursor, limit, user_id=user_id)
+
+    def item_history(self, item_id, cursor=None, limit=50):
+        """One page of everyone who has had an item, newest first: (ledger_entries, next_cursor)."""
+        return self.loan_page(cursor, limit, item_id=item_id)
+
+    def last_loan(self, item_id):
+        """The LedgerEntry of an item's most recent loan, or None if it has never been borrowed."""
+        return self._get_ledger().last_loan(item_id)
+
+    def last_borrower(self, item_id):
+        """The user who borrowed the item most recently, or None if nobody has (or they have been deleted)."""
+        entry = self.last_loan(item_id)
+        return self.find_user(entry.loan.user_id) if entry is not None else None
+
+    def borrow_count(self, user_id, item_id):
+        """How many times the user has borrowed the item."""
+        return self._get_ledger().borrow_count(user_id, item_id)
+
+    def repeat_borrows(self, user_id=None, item_id=None, min_count=2):
+        """Counts of repeat borrowing, for either a user or an item.
+
+        For a user: {item_id: count} of the items they have borrowed at least min_count times. For an item:
+        {user_id: count} of the users who have borrowed it that often.
+        """
+        if (user_id is None) == (item_id is None):
+            raise ValueError("❌ Error: Give either a user ID or an item ID.")
+        ledger = self._get_ledger()
+        if user_id is not None:
+            return ledger.items_borrowed_by(user_id, min_count)
+        return ledger.borrowers_of(item_id, min_count)
+
+    def fine_engine(self):
+        """The FineEngine with live fines for every loan, using this manager's fine rules. Built on first use."""
+        if self._fine_engine is None:
+            with self._index_lock:
+                if self._fine_engine is None:
+                    self.stats.count("fine_engine.build")
+                    self._fine_engine = FineEngine(self, self.fine_per_day, self.max_fine_per_loan,
+                                                   self.max_fine_per_user)
+        return self._fine_engine
+
+    def ledger_entries(self, loan_ids):
+        """Looks up ledger entries by loan ID; IDs that are not in the ledger give None."""
+        ledger = self._get_ledger()
+        return [ledger.get(loan_id) for loan_id in loan_ids]
+
+    def get_many(self, kind, ids):
+        """Looks up a page of "items", "users" or "loans" by ID; IDs that no longer exist give None."""
+        records = getattr(self, kind)
+        return [records.get(record_id) for record_id in ids]
+
+    def id_batches(self, kind, size=10_000):
+        """Yields the IDs of all "items", "users" or "loans" in lists of up to size, in storage order.
+
+        Lets a caller show a large table while it is still being read. In thread-safe mode plain dicts are
+        copied first, since other threads may add or delete meanwhile; other backends are streamed.
+        """
+        records = getattr(self, kind)
+        ids = iter(list(records) if self.thread_safe and isinstance(records, dict) else records)
+        while True:
+            batch = list(itertools.islice(ids, size))
+            if not batch:
+                return
+            yield batch
+
+    # --- Rendering ---
+    def render_item(self, item):
+        """item.display_info(), served from the render cache until the item changes."""
+        text = self._item_renders.get(item.item_id)
+        if text is None:
+            text = self._render(self._item_renders, "item", self.items, item, item.item_id)
+        elif self.stats.enabled:
+            self.stats.count("render_cache.hit")
+        return text
+
+    def render_user(self, user):
+        """user.display_info(), served from the render cache until the user changes."""
+        text = self._user_renders.get(user.user_id)
+        if text is None:
+            text = self._render(self._user_renders, "user", self.users, user, user.user_id)
+        elif self.stats.enabled:
+            self.stats.count("render_cache.hit")
+        return text
+
+    def _render(self, cache, kind, records, record, record_id):
+        self.stats.count("render_cache.miss")
+        with self._locks.hold((kind, record_id)):
+            if self.thread_safe:
+                # Render the stored record under its lock, so a change made meanwhile cannot be cached over.
+                stored = records.get(record_id)
+                if stored is None:
+                    return record.display_info()  # Deleted meanwhile: nothing to cache.
+                record = stored
+            text = record.display_info()
+            cache.put(record_id, text)
+        return text
+
+    def set_render_cache_size(self, max_entries):
+        """Bounds each render cache (items and users) to max_entries texts; 0 turns caching off."""
+        self._item_renders.resize(max_entries)
+        self._user_renders.resize(max_entries)
+
+    def _all_items(self):
+        """Iterates over all items; in thread-safe mode over a copy, since other threads may add or delete."""
+        if self.thread_safe and isinstance(self.items, dict):
+            return list(self.items.values())
+        return self.items.values()
+
+    def _all_users(self):
+        if self.thread_safe and isinstance(self.users, dict):
+            return list(self.users.values())
+        return self.users.values()
+
+    def track_changes(self):
+        """Returns a ChangeTracker that records the IDs of every item, user and loan changed from now on."""
+        tracker = ChangeTracker()
+        self.events.subscribe(tracker)
+        return tracker
+
+    # --- Instrumentation ---
+    def enable_stats(self):
+        """Starts timing every operation in INSTRUMENTED_OPERATIONS into self.stats.
+
+        The timing wrappers are installed on this instance only, and removed again by disable_stats(), so a
+        manager without stats enabled runs the plain methods.
+        """
+        if self.stats.enabled:
+            return
+        for name in self.INSTRUMENTED_OPERATIONS:
+            setattr(self, name, self.stats.wrap(name, getattr(self, name)))
+        self.stats.enabled = True
+
+    def disable_stats(self):
+        """Stops collecting stats; what was collected so far stays available in self.stats."""
+        self.stats.enabled = False
+        for name in self.INSTRUMENTED_OPERATIONS:
+            self.__dict__.pop(name, None)
+
+    # --- Persistence ---
+    def _log(self, op, **records):
+        if self.journal is not None:
+            self.journal.record(op, **records)
+
+    def flush(self):
+        """Writes any batched changes through to the storage backend and journal."""
+        self.storage.flush()
+        if self.journal is not None:
+            self.journal.sync()
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+        self.storage.close()
@@ -0,0 +1,140 @@
+# core/overdue.py
+import heapq
+import json
+import os
+import threading
+from datetime import date
+
+from core.events import LoanClosed, LoanOpened, LoansClosed, LoansOpened, LoansOverdue
+
+STATE_FILE = "state.json"
+
+
+class OutboxNotifier:
+    """Writes overdue notices in batches to JSONL files in a local outbox directory, standing in for email.
+
+    Each batch file is written under a temporary name and renamed into place, so whatever picks the files up
+    never sees a half-written batch. The date of the last tick is kept in the outbox too, so a restart does
+    not notify the same loans again.
+    """
+
+    def __init__(self, directory, batch_size=500):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.state_path = os.path.join(directory, STATE_FILE)
+        self._batches = 0
+        os.makedirs(directory, exist_ok=True)
+        self._last_written = self.last_tick()
+
+    def last_tick(self):
+        if not os.path.exists(self.state_path):
+            return None
+        with open(self.state_path, encoding="utf-8") as f:
+            return date.fromisoformat(json.load(f)["last_tick"])
+
+    def send(self, notices, today):
+        """Writes the notices in batch files of at most batch_size. Returns the paths written."""
+        paths = []
+        if not notices and today == self._last_written:
+            return paths
+        for start in range(0, len(notices), self.batch_size):
+            self._batches += 1
+            name = f"notices-{today.isoformat()}-{os.getpid()}-{self._batches:05d}.jsonl"
+            batch = notices[start:start + self.batch_size]
+            path = os.path.join(self.directory, name)
+            self._write(path, "".join(json.dumps(notice) + "\n" for notice in batch))
+            paths.append(path)
+        self._write(self.state_path, json.dumps({"last_tick": today.isoformat()}))
+        self._last_written = today
+        return paths
+
+    @staticmethod
+    def _write(path, text):
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+
+class OverdueScheduler:
+    """Min-heap of open loans keyed on due date, so each tick finds exactly the loans that just became overdue.
+
+    borrow_item/return_item keep the heap current through the manager's events. A returned loan's heap entry
+    is dropped lazily when it reaches the top, so a tick costs O(k log n) for the k loans falling due since
+    the last tick, however many loans there are. Overdue loans are published as a LoansOverdue event and,
+    if a notifier is given, sent to it as notices.
+    """
+
+    def __init__(self, manager, notifier=None):
+        self.manager = manager
+        self.notifier = notifier
+        self._lock = threading.Lock()
+        self._heap = []  # [(due_date_ordinal, loan_id), ...]
+        self._pending = {}  # {loan_id: due_date_ordinal} for open loans not yet reported overdue
+        self.last_tick = notifier.last_tick() if notifier else None
+        with self._lock:
+            manager.events.subscribe(self._on_loan_event, LoanOpened, LoanClosed, LoansOpened, LoansClosed)
+            for loan in manager.storage.open_loans():
+                # Loans due before the last tick were reported by it.
+                if self.last_tick is None or loan.due_date >= self.last_tick:
+                    self._pending[loan.loan_id] = loan.due_date.toordinal()
+            self._heap = [(due, loan_id) for loan_id, due in self._pending.items()]
+            heapq.heapify(self._heap)
+
+    def close(self):
+        self.manager.events.unsubscribe(self._on_loan_event)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _on_loan_event(self, event):
+        loans = event.loans if isinstance(event, (LoansOpened, LoansClosed)) else (event.loan,)
+        with self._lock:
+            if isinstance(event, (LoanOpened, LoansOpened)):
+                for loan in loans:
+                    due = loan.due_date.toordinal()
+                    self._pending[loan.loan_id] = due
+                    heapq.heappush(self._heap, (due, loan.loan_id))
+            else:
+                for loan in loans:
+                    self._pending.pop(loan.loan_id, None)
+                # Returned loans leave stale heap entries; rebuild once they make up most of the heap.
+                if len(self._heap) > 64 and len(self._heap) > 2 * len(self._pending):
+                    self._heap = [(due, loan_id) for loan_id, due in self._pending.items()]
+                    heapq.heapify(self._heap)
+
+    def tick(self, today=None):
+        """Pops every open loan whose due date has passed since the last tick and reports it. Returns those loans."""
+        today = today or date.today()
+        cutoff = today.toordinal()
+        overdue_ids = []
+        with self._lock:
+            heap, pending = self._heap, self._pending
+            while heap and heap[0][0] < cutoff:
+                due, loan_id = heapq.heappop(heap)
+                if pending.get(loan_id) == due:
+                    del pending[loan_id]
+                    overdue_ids.append(loan_id)
+            self.last_tick = today
+        loans = [loan for loan in self.manager.get_many("loans", overdue_ids) if loan is not None]
+        if loans:
+            self.manager.events.publish(LoansOverdue, loans)
+        if self.notifier is not None:
+            self.notifier.send([self._notice(loan, today) for loan in loans], today)
+        return loans
+
+    def _notice(self, loan, today):
+        user = self.manager.find_user(loan.user_id)
+        item = self.manager.find_item(loan.item_id)
+        return {
+            "loan_id": loan.loan_id,
+            "user_id": loan.user_id,
+            "user_name": user.name if user else None,
+            "contact_info": user.contact_info if user else None,
+            "item_id": loan.item_id,
+            "item_title": item.title if item else None,
+            "due_date": loan.due_date.isoformat(),
+            "days_overdue": (today - loan.due_date).days,
+        }
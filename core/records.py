@@ -0,0 +1,136 @@
+# core/records.py
+import itertools
+from datetime import date
+
+from models.book import Book
+from models.library_item import LibraryItem
+from models.loan import Loan
+from models.magazine import Magazine
+from models.multimedia_item import MultimediaItem
+from models.user import BorrowedItems, User
+
+ITEM_TYPES = {"Book": Book, "Magazine": Magazine, "MultimediaItem": MultimediaItem}
+COMMON_ITEM_FIELDS = ("title", "author_or_creator", "publication_year", "publisher", "genre", "status")
+SPECIFIC_ITEM_FIELDS = {
+    "Book": ("page_count", "edition", "isbn"),
+    "Magazine": ("issue_number", "publication_date"),
+    "MultimediaItem": ("media_type", "director_or_narrator", "duration_minutes"),
+}
+USER_FIELDS = ("name", "contact_info", "max_borrow_limit")
+# Value types of the fields an update may set; whole-number fields also take digit strings, e.g. from a form.
+FIELD_TYPES = {
+    "title": str, "author_or_creator": str, "publication_year": int, "publisher": str, "genre": str,
+    "status": str, "page_count": int, "edition": str, "isbn": str, "issue_number": (str, int),
+    "publication_date": str, "media_type": str, "director_or_narrator": str, "duration_minutes": int,
+    "name": str, "contact_info": str, "max_borrow_limit": int,
+}
+
+
+def _blank(cls):
+    """Creates an instance without running __init__, so no new ID is drawn from the counter."""
+    return cls.__new__(cls)
+
+
+# --- Items ---
+def item_to_record(item):
+    """Returns a plain dict describing an item, including its type-specific fields."""
+    item_type = item.__class__.__name__
+    record = {"item_id": item.item_id, "type": item_type}
+    for field in COMMON_ITEM_FIELDS + SPECIFIC_ITEM_FIELDS[item_type]:
+        record[field] = getattr(item, field)
+    return record
+
+
+def item_from_record(record):
+    """Rebuilds a Book, Magazine or MultimediaItem from a record made by item_to_record."""
+    item_type = record["type"]
+    cls = ITEM_TYPES.get(item_type)
+    if cls is None:
+        raise ValueError(f"❌ Error: Unknown item type '{item_type}'.")
+    item = _blank(cls)
+    item.item_id = record["item_id"]
+    for field in COMMON_ITEM_FIELDS + SPECIFIC_ITEM_FIELDS[item_type]:
+        setattr(item, field, record[field])
+    item.intern_fields()
+    return item
+
+
+def item_fields(item):
+    """The fields of an item, common and type-specific, in record order."""
+    return COMMON_ITEM_FIELDS + SPECIFIC_ITEM_FIELDS[item.__class__.__name__]
+
+
+def checked_changes(fields, changes):
+    """Validates an update against the fields that may change; returns the values to set.
+
+    Raises ValueError for the first unknown field or mistyped value, so a bad update changes nothing.
+    """
+    checked = {}
+    for field, value in changes.items():
+        if field not in fields:
+            raise ValueError(f"❌ Error: '{field}' cannot be updated.")
+        expected = FIELD_TYPES[field]
+        if expected is int and isinstance(value, str) and value.strip().isascii() and value.strip().isdigit():
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise ValueError(f"❌ Error: {field} must be {'a whole number' if expected is int else 'text'}.")
+        checked[field] = value
+    return checked
+
+
+# --- Users ---
+def user_to_record(user):
+    record = {"user_id": user.user_id}
+    for field in USER_FIELDS:
+        record[field] = getattr(user, field)
+    record["borrowed_items"] = list(user.borrowed_items)
+    return record
+
+
+def user_from_record(record):
+    user = _blank(User)
+    user.user_id = record["user_id"]
+    for field in USER_FIELDS:
+        setattr(user, field, record[field])
+    user.borrowed_items = BorrowedItems(record["borrowed_items"])
+    return user
+
+
+# --- Loans ---
+def _date_or_none(value):
+    return date.fromisoformat(value) if value else None
+
+
+def loan_to_record(loan):
+    return {"loan_id": loan.loan_id, "item_id": loan.item_id, "user_id": loan.user_id,
+            "borrow_date": loan.borrow_date.isoformat(), "due_date": loan.due_date.isoformat(),
+            "return_date": loan.return_date.isoformat() if loan.return_date else None,
+            "fine_amount": loan.fine_amount}
+
+
+def loan_from_record(record):
+    loan = _blank(Loan)
+    loan.loan_id = record["loan_id"]
+    loan.item_id = record["item_id"]
+    loan.user_id = record["user_id"]
+    loan.borrow_date = date.fromisoformat(record["borrow_date"])
+    loan.due_date = date.fromisoformat(record["due_date"])
+    loan.return_date = _date_or_none(record["return_date"])
+    loan.fine_amount = record["fine_amount"]
+    return loan
+
+
+# --- ID counters ---
+ID_COUNTERS = {"item": LibraryItem, "user": User, "loan": Loan}
+
+
+def peek_next_id(cls):
+    """Returns the ID the class will hand out next, without consuming it."""
+    next_id = next(cls._id_counter)
+    cls._id_counter = itertools.count(next_id)
+    return next_id
+
+
+def reserve_ids(cls, next_id):
+    """Moves the class's ID counter forward so it never hands out an ID below next_id."""
+    cls._id_counter = itertools.count(max(peek_next_id(cls), next_id))
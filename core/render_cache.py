@@ -0,0 +1,61 @@
+# core/render_cache.py
+import threading
+from collections import OrderedDict
+
+
+class RenderCache:
+    """Least-recently-used cache of rendered record text, keyed by record ID and bounded to max_entries.
+
+    Only the text is kept, never the record, so an entry costs the string plus one dict slot. The manager
+    discards an entry whenever the record changes; a max_entries of 0 turns the cache off.
+    """
+
+    def __init__(self, max_entries=10_000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # {record_id: text}, least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, record_id):
+        # Lookups take no lock: get() and move_to_end() are each atomic, and an entry discarded in between
+        # only means its recency is not updated.
+        text = self._entries.get(record_id)
+        if text is not None:
+            try:
+                self._entries.move_to_end(record_id)
+            except KeyError:
+                pass
+        return text
+
+    def put(self, record_id, text):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[record_id] = text
+            self._entries.move_to_end(record_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, record_id):
+        if self._entries:
+            with self._lock:
+                self._entries.pop(record_id, None)
+
+    def discard_many(self, record_ids):
+        if self._entries:
+            with self._lock:
+                for record_id in record_ids:
+                    self._entries.pop(record_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def resize(self, max_entries):
+        """Changes the bound, dropping the least recently used entries that no longer fit."""
+        with self._lock:
+            self.max_entries = max_entries
+            while len(self._entries) > max(max_entries, 0):
+                self._entries.popitem(last=False)
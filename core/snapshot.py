@@ -0,0 +1,566 @@
+# core/snapshot.py
+import bisect
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import MutableMapping
+from contextlib import nullcontext
+from datetime import date
+
+from core.records import ID_COUNTERS, ITEM_TYPES, peek_next_id, reserve_ids
+from models.loan import Loan
+from models.user import BorrowedItems, User
+
+MAGIC = b"LIBSNAP1"
+# Header: magic, format version, then record counts, the next IDs and the offset of every section.
+HEADER = struct.Struct("<8sI4x17Q")
+VERSION = 2
+SECTIONS = ("item_ids", "items", "user_ids", "users", "loan_ids", "loans", "open_loans", "borrowed", "heap")
+NO_INT = -2 ** 31  # Stands for None in 32-bit integer fields.
+NO_STRING = 0xFFFFFFFF  # Length that stands for None in string references.
+WRITE_CHUNK = 1 << 20  # Bytes buffered before each write while a snapshot is written
+
+# Fixed-width records. Strings are (offset, length) references into the string heap; each distinct string
+# is stored once, so repeated genres, publishers and statuses cost 12 bytes per record.
+# Items: type, flags, publication year, type-specific number, then title, creator, publisher, genre, status and
+# two type-specific strings. A year or number that is not an int (a magazine issue called "Spring", a year typed
+# into a form) is kept as text in the heap instead: its flag is set and the field holds a packed string reference.
+ITEM_RECORD = struct.Struct("<BB2xqq" + "QI" * 7)
+YEAR_TEXT = 1  # Item flags: the publication year is a string reference
+NUMBER_TEXT = 2  # The type-specific number is a string reference
+TEXT_LENGTH_BITS = 24  # A packed string reference is offset << TEXT_LENGTH_BITS | length
+# Users: max_borrow_limit, name, contact info, then a slice of the borrowed item ID array.
+USER_RECORD = struct.Struct("<qQIQIQI")
+# Loans: item ID, user ID, borrow/due/return dates as ordinals (0 = not returned), fine. The open_loans section
+# lists the rows of the loans not yet returned.
+LOAN_RECORD = struct.Struct("<qqiiid")
+
+TYPE_CODES = {name: code for code, name in enumerate(ITEM_TYPES)}
+TYPE_NAMES = list(ITEM_TYPES)
+# The type-specific fields: (number field, first string field, second string field).
+TYPE_FIELDS = {
+    "Book": ("page_count", "edition", "isbn"),
+    "Magazine": ("issue_number", "publication_date", None),
+    "MultimediaItem": ("duration_minutes", "media_type", "director_or_narrator"),
+}
+
+
+def _id_column(buffer, offset, count):
+    """A zero-copy view of `count` little-endian int64 IDs starting at offset."""
+    view = memoryview(buffer)[offset:offset + 8 * count]
+    if sys.byteorder == "little":
+        return view.cast("q")
+    column = array("q", view)
+    column.byteswap()
+    return column
+
+
+def _number(value, heap, flag):
+    """(flag or 0, field value) for a number field: ints are stored as they are, anything else as text."""
+    if value is None:
+        return 0, NO_INT
+    if type(value) is int and NO_INT < value < 2 ** 63:
+        return 0, value
+    offset, length = heap.ref(str(value))
+    if length >> TEXT_LENGTH_BITS:
+        raise ValueError(f"❌ Error: Cannot write '{str(value)[:40]}...' to a snapshot; the text is too long.")
+    return flag, offset << TEXT_LENGTH_BITS | length
+
+
+class _StringHeap:
+    """Collects the string heap in a temporary spill file while the record tables are written.
+
+    Strings that many records share (genres, publishers, statuses...) are stored once; per-record strings
+    such as titles are appended as they come, so memory does not grow with the size of the library.
+    """
+    MAX_SHARED = 100_000  # Distinct shared strings remembered; later ones are stored per record
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.size = 0
+        self._pending = bytearray()
+        self._refs = {}
+
+    def ref(self, text, shared=True):
+        if text is None:
+            return 0, NO_STRING
+        ref = self._refs.get(text) if shared else None
+        if ref is None:
+            encoded = str(text).encode("utf-8")
+            ref = (self.size, len(encoded))
+            if shared and len(self._refs) < self.MAX_SHARED:
+                self._refs[text] = ref
+            self._pending += encoded
+            self.size += len(encoded)
+            if len(self._pending) >= WRITE_CHUNK:
+                self.file.write(self._pending)
+                self._pending.clear()
+        return ref
+
+    def copy_to(self, f):
+        self.file.write(self._pending)
+        self.file.seek(0)
+        shutil.copyfileobj(self.file, f, WRITE_CHUNK)
+        self.file.close()
+
+
+# --- Writing ---
+def in_id_order(table):
+    """The records of a storage table in ascending ID order, as write_snapshot() takes them.
+
+    SQLite and snapshot tables iterate in key order already; a plain dict has only its keys sorted.
+    """
+    if isinstance(table, dict):
+        return (table[key] for key in sorted(table))
+    return table.values()
+
+
+class _SectionWriter:
+    """Writes fixed-width records to one section of the file, a chunk at a time."""
+
+    def __init__(self, f, record):
+        self.f = f
+        self.record = record
+        self.count = 0
+        self._chunk = bytearray()
+
+    def add(self, *fields):
+        self._chunk += self.record.pack(*fields)
+        self.count += 1
+        if len(self._chunk) >= WRITE_CHUNK:
+            self.f.write(self._chunk)
+            self._chunk.clear()
+
+    def close(self):
+        self.f.write(self._chunk)
+
+
+def _ids_in_order(records, id_field, ids):
+    """Yields the records, appending each ID to ids and checking that they ascend."""
+    last = None
+    for record in records:
+        record_id = getattr(record, id_field)
+        if last is not None and record_id <= last:
+            raise ValueError("❌ Error: Snapshot records must be written in ascending ID order.")
+        ids.append(record_id)
+        last = record_id
+        yield record
+
+
+def _write_temp_snapshot(path, items, users, loans):
+    """Streams the records into a new snapshot next to path: (temp_path, size). See write_snapshot()."""
+    temp_path = path + ".tmp"
+    try:
+        return temp_path, _write_records(temp_path, items, users, loans)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _write_records(path, items, users, loans):
+    heap = _StringHeap()
+    columns = {name: array("q") for name in ("item_ids", "user_ids", "loan_ids", "open_loans", "borrowed")}
+    offsets = {}
+    with open(path, "wb") as f:
+        f.write(bytes(HEADER.size))
+
+        def begin(name):
+            f.write(bytes(-f.tell() % 8))  # Keep every section 8-byte aligned.
+            offsets[name] = f.tell()
+
+        begin("items")
+        table = _SectionWriter(f, ITEM_RECORD)
+        for item in _ids_in_order(items, "item_id", columns["item_ids"]):
+            item_type = item.__class__.__name__
+            number_field, first_field, second_field = TYPE_FIELDS[item_type]
+            year_flag, year = _number(item.publication_year, heap, YEAR_TEXT)
+            number_flag, number = _number(getattr(item, number_field), heap, NUMBER_TEXT)
+            table.add(TYPE_CODES[item_type], year_flag | number_flag, year, number,
+                      *heap.ref(item.title, shared=False), *heap.ref(item.author_or_creator),
+                      *heap.ref(item.publisher), *heap.ref(item.genre), *heap.ref(item.status),
+                      *heap.ref(getattr(item, first_field)),
+                      *heap.ref(getattr(item, second_field) if second_field else None,
+                                shared=second_field != "isbn"))
+        table.close()
+
+        begin("users")
+        table = _SectionWriter(f, USER_RECORD)
+        borrowed = columns["borrowed"]
+        for user in _ids_in_order(users, "user_id", columns["user_ids"]):
+            start = len(borrowed)
+            borrowed.extend(user.borrowed_items)
+            table.add(user.max_borrow_limit, *heap.ref(user.name, shared=False),
+                      *heap.ref(user.contact_info, shared=False), start, len(borrowed) - start)
+        table.close()
+
+        begin("loans")
+        table = _SectionWriter(f, LOAN_RECORD)
+        for loan in _ids_in_order(loans, "loan_id", columns["loan_ids"]):
+            if loan.return_date is None:
+                columns["open_loans"].append(table.count)
+            table.add(loan.item_id, loan.user_id, loan.borrow_date.toordinal(), loan.due_date.toordinal(),
+                      loan.return_date.toordinal() if loan.return_date else 0, loan.fine_amount)
+        table.close()
+
+        # ID columns are 8 bytes per record; they are kept in memory until the tables are out.
+        for name, column in columns.items():
+            if sys.byteorder != "little":
+                column.byteswap()
+            begin(name)
+            column.tofile(f)
+        begin("heap")
+        heap.copy_to(f)
+        size = f.tell()
+
+        next_ids = [peek_next_id(ID_COUNTERS[kind]) for kind in ("item", "user", "loan")]
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(columns["item_ids"]), len(columns["user_ids"]),
+                            len(columns["loan_ids"]), len(columns["open_loans"]), len(columns["borrowed"]),
+                            *next_ids, *(offsets[name] for name in SECTIONS)))
+        f.flush()
+        os.fsync(f.fileno())
+    return size
+
+
+def write_snapshot(path, items, users, loans):
+    """Writes items, users and loans (iterables of model objects in ascending ID order) as a snapshot at path.
+
+    Records are streamed straight into the file, so only their IDs are held in memory; in_id_order() gives
+    a storage table's records in the order needed. The file is written under a temporary name and renamed
+    into place, so a crash never leaves a torn snapshot behind. Returns the number of bytes written.
+    """
+    temp_path, size = _write_temp_snapshot(path, items, users, loans)
+    os.replace(temp_path, path)
+    return size
+
+
+# --- Reading ---
+class SnapshotTable(MutableMapping):
+    """A dict-like view of one snapshot table plus the changes made since it was opened.
+
+    Records are decoded from the mapped file each time they are read and never cached, like SQLiteTable,
+    so writes must go back through table[key] = record. Written and deleted records are kept in memory
+    until the storage is saved.
+    """
+
+    def __init__(self, ids=(), decode=None):
+        self.reset(ids, decode)
+
+    def reset(self, ids, decode, keep_changes=False):
+        self._ids = ids  # Sorted record IDs; a record's position here is its row in the table.
+        self._decode = decode  # row -> model object
+        if keep_changes:
+            return
+        self._changed = {}  # {key: record} written since opening, new or replacing a snapshot row
+        self._deleted = set()  # Keys of snapshot rows deleted since opening
+        self._added = 0  # How many of the changed keys have no snapshot row
+
+    @property
+    def dirty(self):
+        return bool(self._changed or self._deleted)
+
+    def _row(self, key):
+        ids = self._ids
+        if not ids:
+            return None
+        # IDs are usually dense, so the key's distance from the first ID is almost always its row.
+        guess = key - ids[0]
+        if 0 <= guess < len(ids) and ids[guess] == key:
+            return guess
+        row = bisect.bisect_left(ids, key)
+        return row if row < len(ids) and ids[row] == key else None
+
+    def __getitem__(self, key):
+        record = self._changed.get(key)
+        if record is not None:
+            return record
+        row = self._row(key) if key not in self._deleted else None
+        if row is None:
+            raise KeyError(key)
+        return self._decode(row)
+
+    def __contains__(self, key):
+        return key in self._changed or (key not in self._deleted and self._row(key) is not None)
+
+    def __setitem__(self, key, value):
+        if key not in self._changed and self._row(key) is None:
+            self._added += 1
+        self._deleted.discard(key)
+        self._changed[key] = value
+
+    def update(self, other=(), **kwargs):
+        pairs = other.items() if hasattr(other, "items") else other
+        for key, value in pairs:
+            self[key] = value
+
+    def __delitem__(self, key):
+        row = self._row(key) if key not in self._deleted else None
+        if key in self._changed:
+            del self._changed[key]
+            if row is None:
+                self._added -= 1
+        elif row is None:
+            raise KeyError(key)
+        if row is not None:
+            self._deleted.add(key)
+
+    def __iter__(self):
+        if not self._deleted and not self._added:
+            return iter(self._ids)
+        return self._iter_keys()
+
+    def _iter_keys(self):
+        for key, _ in self._merged(list(self._changed)):
+            yield key
+
+    def _merged(self, changed):
+        """(key, row) in ascending key order: the undeleted snapshot rows, with the added keys (row None) between."""
+        deleted = self._deleted
+        added = sorted(key for key in changed if self._row(key) is None)
+        next_added = 0
+        for row, key in enumerate(self._ids):
+            while next_added < len(added) and added[next_added] < key:
+                yield added[next_added], None
+                next_added += 1
+            if key not in deleted:
+                yield key, row
+        for key in added[next_added:]:
+            yield key, None
+
+    def __len__(self):
+        return len(self._ids) - len(self._deleted) + self._added
+
+    def keys_after(self, after, limit):
+        """Up to limit keys greater than after, ascending, found by bisecting the ID column."""
+        ids, deleted = self._ids, self._deleted
+        added = sorted(key for key in list(self._changed) if key > after and self._row(key) is None)
+        keys, position, next_added = [], bisect.bisect_right(ids, after), 0
+        while len(keys) < limit:
+            key = ids[position] if position < len(ids) else None
+            if next_added < len(added) and (key is None or added[next_added] < key):
+                keys.append(added[next_added])
+                next_added += 1
+            elif key is None:
+                break
+            else:
+                position += 1
+                if key not in deleted:
+                    keys.append(key)
+        return keys
+
+    def values(self):
+        return (record for _, record in self.items())
+
+    def items(self):
+        """(key, record) pairs in ascending key order."""
+        changed, decode = self._changed, self._decode
+        for key, row in self._merged(changed):
+            record = changed.get(key)
+            yield key, record if record is not None else decode(row)
+
+    def changed_records(self):
+        return self._changed.values()
+
+    def rows_matching(self, row_filter):
+        """Decodes the unchanged snapshot rows for which row_filter(row) is true."""
+        changed, deleted, decode = self._changed, self._deleted, self._decode
+        for row, key in enumerate(self._ids):
+            if key not in changed and key not in deleted and row_filter(row):
+                yield decode(row)
+
+
+class SnapshotStorage:
+    """Storage backend that opens a binary snapshot with mmap and decodes records only when they are read.
+
+    Opening costs the same whatever the size of the library: the header is read and the ID columns are
+    mapped, nothing more. Changes are kept in memory and written out as a new snapshot by save(), flush()
+    or close(), which rewrite the whole file however little changed. A path that does not exist yet starts
+    an empty library that is saved there.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._map = None
+        self.items = SnapshotTable()
+        self.users = SnapshotTable()
+        self.loans = SnapshotTable()
+        self._open_loan_rows = ()
+        self._status_refs = {}  # {(offset, length): status} for the status strings seen so far
+        self._dates = {}  # {ordinal: date}
+        if os.path.exists(path):
+            self._open()
+
+    # --- Opening ---
+    def _open(self, keep_changes=False):
+        self._file = open(self.path, "rb")
+        self._map = buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(buffer) < HEADER.size or buffer[:len(MAGIC)] != MAGIC:
+            self._close_map()
+            raise ValueError(f"❌ Error: '{self.path}' is not a library snapshot.")
+        (_, version, n_items, n_users, n_loans, n_open, _, next_item, next_user, next_loan,
+         *offsets) = HEADER.unpack_from(buffer)
+        if version != VERSION:
+            self._close_map()
+            raise ValueError(f"❌ Error: Unsupported snapshot version {version} in '{self.path}'.")
+        self._offsets = dict(zip(SECTIONS, offsets))
+        self.items.reset(_id_column(buffer, self._offsets["item_ids"], n_items), self._decode_item, keep_changes)
+        self.users.reset(_id_column(buffer, self._offsets["user_ids"], n_users), self._decode_user, keep_changes)
+        self.loans.reset(_id_column(buffer, self._offsets["loan_ids"], n_loans), self._decode_loan, keep_changes)
+        self._open_loan_rows = _id_column(buffer, self._offsets["open_loans"], n_open)
+        self._status_refs = {}
+        for kind, next_id in (("item", next_item), ("user", next_user), ("loan", next_loan)):
+            reserve_ids(ID_COUNTERS[kind], next_id)
+
+    def _close_map(self, keep_changes=False):
+        # The ID columns are views into the map, which cannot be closed while any of them is still exported.
+        columns = [table._ids for table in (self.items, self.users, self.loans)] + [self._open_loan_rows]
+        for table in (self.items, self.users, self.loans):
+            table.reset((), None, keep_changes)
+        self._open_loan_rows = ()
+        for column in columns:
+            if isinstance(column, memoryview):
+                column.release()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # --- Decoding ---
+    def _string(self, offset, length):
+        if length == NO_STRING:
+            return None
+        start = self._offsets["heap"] + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def _number(self, value, is_text):
+        if is_text:
+            return self._string(value >> TEXT_LENGTH_BITS, value & ((1 << TEXT_LENGTH_BITS) - 1))
+        return None if value == NO_INT else value
+
+    def _decode_item(self, row):
+        (type_code, flags, year, number, *refs) = ITEM_RECORD.unpack_from(self._map, self._offsets["items"]
+                                                                    + row * ITEM_RECORD.size)
+        strings = [self._string(refs[i], refs[i + 1]) for i in range(0, len(refs), 2)]
+        item_type = TYPE_NAMES[type_code]
+        item = ITEM_TYPES[item_type].__new__(ITEM_TYPES[item_type])
+        item.item_id = self.items._ids[row]
+        (item.title, item.author_or_creator, item.publisher, item.genre, item.status, first, second) = strings
+        item.publication_year = self._number(year, flags & YEAR_TEXT)
+        number_field, first_field, second_field = TYPE_FIELDS[item_type]
+        setattr(item, number_field, self._number(number, flags & NUMBER_TEXT))
+        setattr(item, first_field, first)
+        if second_field:
+            setattr(item, second_field, second)
+        item.intern_fields()
+        return item
+
+    def _decode_user(self, row):
+        (limit, name_offset, name_length, contact_offset, contact_length, start,
+         count) = USER_RECORD.unpack_from(self._map, self._offsets["users"] + row * USER_RECORD.size)
+        user = User.__new__(User)
+        user.user_id = self.users._ids[row]
+        user.name = self._string(name_offset, name_length)
+        user.contact_info = self._string(contact_offset, contact_length)
+        user.max_borrow_limit = limit
+        user.borrowed_items = BorrowedItems(struct.unpack_from(f"<{count}q", self._map,
+                                                               self._offsets["borrowed"] + 8 * start))
+        return user
+
+    def _decode_loan(self, row):
+        item_id, user_id, borrowed, due, returned, fine = LOAN_RECORD.unpack_from(
+            self._map, self._offsets["loans"] + row * LOAN_RECORD.size)
+        loan = Loan.__new__(Loan)
+        loan.loan_id = self.loans._ids[row]
+        loan.item_id = item_id
+        loan.user_id = user_id
+        dates = self._dates
+        loan.borrow_date = dates.get(borrowed) or self._date(borrowed)
+        loan.due_date = dates.get(due) or self._date(due)
+        loan.return_date = (dates.get(returned) or self._date(returned)) if returned else None
+        loan.fine_amount = fine
+        return loan
+
+    def _date(self, ordinal):
+        # Loans share a few thousand distinct dates at most, and dates are immutable, so each is built once.
+        day = self._dates[ordinal] = date.fromordinal(ordinal)
+        return day
+
+    # --- Queries ---
+    def items_with_status(self, status):
+        """Compares each row's status reference instead of decoding it; only matching rows are decoded."""
+        status = status.lower()
+        status_field = ITEM_RECORD.size - 3 * 12  # The status reference precedes the two type-specific ones.
+        reference = struct.Struct("<QI")
+        base = self._offsets["items"] + status_field if self._map is not None else 0
+
+        def row_filter(row):
+            ref = reference.unpack_from(self._map, base + row * ITEM_RECORD.size)
+            known = self._status_refs.get(ref)
+            if known is None:
+                known = self._status_refs[ref] = (self._string(*ref) or "").lower()
+            return known == status
+
+        yield from self.items.rows_matching(row_filter)
+        for item in list(self.items.changed_records()):
+            if item.status.lower() == status:
+                yield item
+
+    def open_loans(self):
+        """Open loans from the snapshot's own list, adjusted for the loans opened and returned since."""
+        loans = self.loans
+        ids, changed, deleted, decode = loans._ids, loans._changed, loans._deleted, self._decode_loan
+        for row in self._open_loan_rows:
+            loan_id = ids[row]
+            if loan_id not in changed and loan_id not in deleted:
+                yield decode(row)
+        for loan in list(loans.changed_records()):
+            if loan.return_date is None:
+                yield loan
+
+    def transaction(self):
+        """Changes only reach the file in save(), so there is nothing to roll back."""
+        return nullcontext()
+
+    # --- Saving ---
+    @property
+    def dirty(self):
+        return self.items.dirty or self.users.dirty or self.loans.dirty or self._map is None
+
+    def save(self, path=None):
+        """Writes the library, changes included, as a new snapshot (by default over the one it was opened from).
+
+        Every record is rewritten, so saving a few changes costs as much as exporting the whole library; close()
+        and flush() do this whenever anything has changed.
+        """
+        path = path or self.path
+        if path != self.path:
+            write_snapshot(path, self.items.values(), self.users.values(), self.loans.values())
+            return
+        temp_path, _ = _write_temp_snapshot(path, self.items.values(), self.users.values(), self.loans.values())
+        # The old file is read until the new one is complete, but it must be unmapped before it can be
+        # replaced on Windows. The changes are kept until the new file is in place; if it cannot be, the
+        # old file is mapped again with the changes still pending over it.
+        self._close_map(keep_changes=True)
+        try:
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            self._open(keep_changes=True)
+            raise
+        self._open()
+
+    def flush(self):
+        if self.dirty:
+            self.save()
+
+    def close(self):
+        self.flush()
+        self._close_map()
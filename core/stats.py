@@ -0,0 +1,158 @@
+# core/stats.py
+import cProfile
+import io
+import pstats
+import threading
+import time
+
+SUB_BUCKETS = 4  # Buckets per power of two: percentiles are accurate to within about 10%.
+
+
+class LatencyHistogram:
+    """Log-scale histogram of latencies in nanoseconds, with a fixed number of buckets."""
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (65 * SUB_BUCKETS)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def _bucket(ns):
+        bits = ns.bit_length()
+        if bits < 3:
+            return ns
+        # The bit length picks the power of two, the next two bits below the top one pick the sub-bucket.
+        return bits * SUB_BUCKETS + ((ns >> (bits - 3)) & (SUB_BUCKETS - 1))
+
+    @staticmethod
+    def _bucket_value(index):
+        """A representative latency for a bucket: the middle of its range."""
+        bits, sub = divmod(index, SUB_BUCKETS)
+        if bits < 3:
+            return index
+        width = 1 << (bits - 3)
+        return (SUB_BUCKETS + sub) * width + width // 2
+
+    def record(self, ns):
+        self.buckets[self._bucket(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self._bucket_value(index), self.max)
+        return self.max
+
+
+class ManagerStats:
+    """Per-operation call counts and latency histograms, named counters and an optional cProfile window.
+
+    LibraryManager.enable_stats() wraps its public methods to feed this; while stats are disabled the methods
+    are not wrapped at all and count() returns at once, so the cost is a single attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}  # {operation: LatencyHistogram}
+        self.errors = {}  # {operation: number of calls that raised}
+        self.counters = {}  # {name: count}, e.g. title index hits and misses
+        self._lock = threading.Lock()
+        self._profiler = None
+
+    def reset(self):
+        with self._lock:
+            for name in self.histograms:
+                self.histograms[name] = LatencyHistogram()
+            self.errors.clear()
+            self.counters.clear()
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def wrap(self, name, method):
+        """Returns method wrapped to record its latency (and failures) under name."""
+        self.histograms.setdefault(name, LatencyHistogram())
+        clock = time.perf_counter_ns
+        lock = self._lock
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            except BaseException:
+                with lock:
+                    self.errors[name] = self.errors.get(name, 0) + 1
+                raise
+            finally:
+                elapsed = clock() - start
+                with lock:
+                    self.histograms[name].record(elapsed)
+
+        timed.__name__ = name
+        timed.__doc__ = method.__doc__
+        return timed
+
+    # --- Reporting ---
+    def snapshot(self):
+        """{"operations": {name: {count, errors, mean_us, p50_us, p95_us, p99_us, max_us}}, "counters": {...}}."""
+        with self._lock:
+            operations = {}
+            for name, histogram in sorted(self.histograms.items()):
+                if not histogram.count:
+                    continue
+                operations[name] = {
+                    "count": histogram.count,
+                    "errors": self.errors.get(name, 0),
+                    "mean_us": histogram.total / histogram.count / 1e3,
+                    "p50_us": histogram.percentile(0.50) / 1e3,
+                    "p95_us": histogram.percentile(0.95) / 1e3,
+                    "p99_us": histogram.percentile(0.99) / 1e3,
+                    "max_us": histogram.max / 1e3,
+                }
+            return {"operations": operations, "counters": dict(sorted(self.counters.items()))}
+
+    def format_report(self):
+        snapshot = self.snapshot()
+        lines = [f"{'Operation':<26}{'Calls':>9}{'Errors':>8}{'Mean µs':>11}{'p50 µs':>11}{'p95 µs':>11}"
+                 f"{'p99 µs':>11}{'Max µs':>11}"]
+        for name, row in snapshot["operations"].items():
+            lines.append(f"{name:<26}{row['count']:>9}{row['errors']:>8}{row['mean_us']:>11.1f}{row['p50_us']:>11.1f}"
+                         f"{row['p95_us']:>11.1f}{row['p99_us']:>11.1f}{row['max_us']:>11.1f}")
+        if not snapshot["operations"]:
+            lines.append("No operations recorded yet.")
+        if snapshot["counters"]:
+            lines.append("Counters: " + ", ".join(f"{name}={value}" for name, value in snapshot["counters"].items()))
+        return "\n".join(lines)
+
+    # --- Profiling ---
+    @property
+    def profiling(self):
+        return self._profiler is not None
+
+    def start_profile(self):
+        """Starts a cProfile capture window on the calling thread."""
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop_profile(self, limit=25, sort="cumulative"):
+        """Ends the capture window and returns the top `limit` functions as text."""
+        profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return ""
+        profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats(sort).print_stats(limit)
+        return output.getvalue()
@@ -0,0 +1,282 @@
+# core/storage.py
+import json
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager, nullcontext
+
+from core.records import (ITEM_TYPES, SPECIFIC_ITEM_FIELDS, ID_COUNTERS, loan_from_record, loan_to_record,
+                          reserve_ids, user_from_record)
+
+
+class MemoryStorage:
+    """Keeps items, users and loans in plain dicts. This is the default backend."""
+
+    def __init__(self):
+        self.items = {}  # {item_id: item_object}
+        self.users = {}  # {user_id: user_object}
+        self.loans = {}  # {loan_id: loan_object}
+
+    # Both scans iterate over a copy of the values, so other threads may keep adding records meanwhile.
+    def items_with_status(self, status):
+        status = status.lower()
+        return (item for item in list(self.items.values()) if item.status.lower() == status)
+
+    def open_loans(self):
+        return (loan for loan in list(self.loans.values()) if loan.return_date is None)
+
+    def transaction(self):
+        """Dict writes cannot fail part way, so there is nothing to roll back."""
+        return nullcontext()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    item_id INTEGER PRIMARY KEY,
+    item_type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    author_or_creator TEXT,
+    publication_year INTEGER,
+    publisher TEXT,
+    genre TEXT,
+    status TEXT NOT NULL,
+    details TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_status ON items (status COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_items_title ON items (title);
+
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    contact_info TEXT,
+    max_borrow_limit INTEGER NOT NULL,
+    borrowed_items TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS loans (
+    loan_id INTEGER PRIMARY KEY,
+    item_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    borrow_date TEXT NOT NULL,
+    due_date TEXT NOT NULL,
+    return_date TEXT,
+    fine_amount REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_loans_user_id ON loans (user_id);
+CREATE INDEX IF NOT EXISTS idx_loans_item_id ON loans (item_id);
+CREATE INDEX IF NOT EXISTS idx_loans_open ON loans (item_id) WHERE return_date IS NULL;
+"""
+
+ITEM_COLUMNS = ("item_id", "item_type", "title", "author_or_creator", "publication_year", "publisher", "genre",
+                "status", "details")
+USER_COLUMNS = ("user_id", "name", "contact_info", "max_borrow_limit", "borrowed_items")
+LOAN_COLUMNS = ("loan_id", "item_id", "user_id", "borrow_date", "due_date", "return_date", "fine_amount")
+
+
+def _item_to_row(item):
+    item_type = item.__class__.__name__
+    details = {field: getattr(item, field) for field in SPECIFIC_ITEM_FIELDS[item_type]}
+    return (item.item_id, item_type, item.title, item.author_or_creator, item.publication_year, item.publisher,
+            item.genre, item.status, json.dumps(details))
+
+
+def _item_from_row(row):
+    cls = ITEM_TYPES[row[1]]
+    item = cls.__new__(cls)
+    (item.item_id, _, item.title, item.author_or_creator, item.publication_year, item.publisher, item.genre,
+     item.status) = row[:8]
+    for field, value in json.loads(row[8]).items():
+        setattr(item, field, value)
+    item.intern_fields()
+    return item
+
+
+def _user_to_row(user):
+    return (user.user_id, user.name, user.contact_info, user.max_borrow_limit, json.dumps(list(user.borrowed_items)))
+
+
+def _user_from_row(row):
+    record = dict(zip(USER_COLUMNS, row))
+    record["borrowed_items"] = json.loads(record["borrowed_items"])
+    return user_from_record(record)
+
+
+def _loan_to_row(loan):
+    return tuple(loan_to_record(loan)[column] for column in LOAN_COLUMNS)
+
+
+def _loan_from_row(row):
+    return loan_from_record(dict(zip(LOAN_COLUMNS, row)))
+
+
+class SQLiteTable(MutableMapping):
+    """A dict-like view of one table. Objects are built on access and streamed on iteration, never cached."""
+
+    def __init__(self, storage, table, columns, to_row, from_row):
+        self._storage = storage
+        self._to_row = to_row
+        self._from_row = from_row
+        key, column_list = columns[0], ", ".join(columns)
+        self._key = key
+        self._select_one = f"SELECT {column_list} FROM {table} WHERE {key} = ?"
+        self._select_all = f"SELECT {column_list} FROM {table} ORDER BY {key}"
+        self._select_keys = f"SELECT {key} FROM {table} ORDER BY {key}"
+        self._exists = f"SELECT 1 FROM {table} WHERE {key} = ?"
+        self._count = f"SELECT COUNT(*) FROM {table}"
+        self._max_key = f"SELECT MAX({key}) FROM {table}"
+        self._keys_after = f"SELECT {key} FROM {table} WHERE {key} > ? ORDER BY {key} LIMIT ?"
+        self._upsert = f"INSERT OR REPLACE INTO {table} ({column_list}) VALUES ({', '.join('?' * len(columns))})"
+        self._delete = f"DELETE FROM {table} WHERE {key} = ?"
+
+    def __getitem__(self, key):
+        row = self._storage.fetchone(self._select_one, (key,))
+        if row is None:
+            raise KeyError(key)
+        return self._from_row(row)
+
+    def __contains__(self, key):
+        return self._storage.fetchone(self._exists, (key,)) is not None
+
+    def __setitem__(self, key, value):
+        self._storage.write(self._upsert, self._to_row(value))
+
+    def update(self, other=(), **kwargs):
+        """Writes many objects with a single executemany() call."""
+        pairs = other.items() if hasattr(other, "items") else other
+        self._storage.write_many(self._upsert, (self._to_row(value) for _, value in pairs))
+
+    def __delitem__(self, key):
+        if self._storage.write(self._delete, (key,)) == 0:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for row in self._storage.stream(self._select_keys):
+            yield row[0]
+
+    def __len__(self):
+        return self._storage.fetchone(self._count)[0]
+
+    def values(self):
+        return (self._from_row(row) for row in self._storage.stream(self._select_all))
+
+    def items(self):
+        return ((row[0], self._from_row(row)) for row in self._storage.stream(self._select_all))
+
+    def select(self, where, params=()):
+        """Streams the objects matching a SQL WHERE clause, in key order."""
+        query = self._select_all.replace(" ORDER BY ", f" WHERE {where} ORDER BY ")
+        return (self._from_row(row) for row in self._storage.stream(query, params))
+
+    def keys_after(self, after, limit):
+        """Up to limit keys greater than after, ascending; the primary key index makes this a range read."""
+        return [row[0] for row in self._storage.fetchall(self._keys_after, (after, limit))]
+
+    def max_key(self):
+        return self._storage.fetchone(self._max_key)[0] or 0
+
+
+class SQLiteStorage:
+    """Persists items, users and loans in an SQLite database running in WAL mode.
+
+    Writes are grouped into transactions of up to `batch_size` statements; call flush() to commit early.
+    Writes that must land together go in a `with storage.transaction():` block.
+    """
+
+    def __init__(self, path, batch_size=500, fetch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.fetch_size = fetch_size
+        self._lock = threading.RLock()
+        self._pending_writes = 0
+        self._transactions = 0  # Depth of open transaction() blocks; batched commits wait until it is 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, cached_statements=64)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self.items = SQLiteTable(self, "items", ITEM_COLUMNS, _item_to_row, _item_from_row)
+        self.users = SQLiteTable(self, "users", USER_COLUMNS, _user_to_row, _user_from_row)
+        self.loans = SQLiteTable(self, "loans", LOAN_COLUMNS, _loan_to_row, _loan_from_row)
+        # IDs come from class-level counters, so move them past everything already stored.
+        for kind, table in (("item", self.items), ("user", self.users), ("loan", self.loans)):
+            reserve_ids(ID_COUNTERS[kind], table.max_key() + 1)
+
+    def fetchone(self, query, params=()):
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()
+
+    def fetchall(self, query, params=()):
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def stream(self, query, params=()):
+        """Yields rows in chunks of fetch_size, so large tables are never held in memory at once."""
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            rows = cursor.fetchmany(self.fetch_size)
+        while rows:
+            yield from rows
+            with self._lock:
+                rows = cursor.fetchmany(self.fetch_size)
+
+    def write(self, query, params):
+        with self._lock:
+            rowcount = self._conn.execute(query, params).rowcount
+            self._pending_writes += 1
+            if self._pending_writes >= self.batch_size and not self._transactions:
+                self.flush()
+            return rowcount
+
+    def write_many(self, query, rows):
+        with self._lock:
+            rowcount = self._conn.executemany(query, rows).rowcount
+            self._pending_writes += max(rowcount, 0)
+            if self._pending_writes >= self.batch_size and not self._transactions:
+                self.flush()
+            return rowcount
+
+    def items_with_status(self, status):
+        return self.items.select("status = ? COLLATE NOCASE", (status,))
+
+    def open_loans(self):
+        return self.loans.select("return_date IS NULL")
+
+    @contextmanager
+    def transaction(self):
+        """Makes the writes in the block all-or-nothing.
+
+        The block runs in a savepoint: no batched commit happens inside it, and an exception rolls back the
+        block's own writes, leaving earlier uncommitted ones in place. Other threads wait until the block ends.
+        """
+        with self._lock:
+            self._conn.execute("SAVEPOINT batch")
+            self._transactions += 1
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK TO batch")
+                raise
+            finally:
+                self._transactions -= 1
+                self._conn.execute("RELEASE batch")
+            if not self._conn.in_transaction:
+                self._pending_writes = 0  # The savepoint began the transaction, so releasing it committed.
+            elif self._pending_writes >= self.batch_size and not self._transactions:
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._transactions:
+                return  # Committing now would end the open transaction() block; it commits when it ends.
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
@@ -1,9 +1,21 @@
 # gui_app.py
 
+import argparse
+import time
+from datetime import date
 import tkinter as tk
 from tkinter import ttk, messagebox
+from core.catalog import ItemQuery
+from core.events import Event, FineApplied, FinesApplied
+from core.journal import Journal
 from core.library_manager import LibraryManager
+from core.overdue import OutboxNotifier, OverdueScheduler
+from core.snapshot import SnapshotStorage
+from core.storage import SQLiteStorage
 from dialogs import ItemDialog, UserDialog
+from search_worker import SearchWorker
+from startup_loader import StartupLoader
+from virtual_tree import VirtualTree
 from models.book import Book
 from models.magazine import Magazine
 from models.multimedia_item import MultimediaItem
@@ -23,9 +35,28 @@ FONT_TITLE = ("Segoe UI", 16, "bold")
 
 
 class LibraryApp(tk.Tk):
-    def __init__(self, manager):
+    ITEMS_TAB, USERS_TAB, BORROW_RETURN_TAB, LOANS_TAB, DIAGNOSTICS_TAB = range(5)
+    OVERDUE_CHECK_MS = 60_000
+    PROFILE_WINDOW_MS = 10_000
+    FUZZY_RESULTS = 200
+    LOAD_CHUNK = 20_000  # IDs handed to a list per step of a progressive load
+
+    def __init__(self, manager=None, scheduler=None, progressive=False, started=None, open_library=None):
+        """progressive shows the window with empty lists at once and fills them from a loader thread.
+
+        open_library, if given, is called instead of passing manager and scheduler and returns the two; in
+        progressive mode it runs on the loader thread, so the window is up while a journal is replayed.
+        started is the time.perf_counter() value startup is measured from; by default, now.
+        """
         super().__init__()
-        self.manager = manager
+        self.started = started if started is not None else time.perf_counter()
+        self.startup_times = {}  # {"first_paint_s": ..., "loaded_s": ...}
+        self.loader = None
+        self.manager = None
+        self.scheduler = None
+        self._item_filter = ItemQuery()
+        self._user_query = None
+        self.search_worker = SearchWorker(self)
         self.title("📚 Library Management System")
         self.geometry("1200x700")
         self.theme_var = tk.StringVar(value="Dark")
@@ -33,13 +64,43 @@ class LibraryApp(tk.Tk):
         self.apply_theme()
         title_label = ttk.Label(self, text="Library Management System", font=FONT_TITLE, style='Title.TLabel')
         title_label.pack(pady=(10, 20))
+        self.status_var = tk.StringVar(value="Ready.")
+        ttk.Label(self, textvariable=self.status_var, style='Status.TLabel').pack(side='bottom', fill='x', padx=10,
+                                                                                 pady=(0, 5))
+        if open_library is not None and progressive:
+            self.status_var.set("⏳ Opening the library...")
+            opener = StartupLoader(self)
+            opener.add("library", lambda: iter((open_library(),)),
+                       lambda opened: self._on_library_opened(*opened, progressive))
+            opener.start()
+        else:
+            if open_library is not None:
+                manager, scheduler = open_library()
+            self._on_library_opened(manager, scheduler, progressive)
+        self.after_idle(self._on_first_paint)
+
+    def _on_library_opened(self, manager, scheduler, progressive):
+        """Builds the tabs once the manager is ready, and starts filling the lists."""
+        self.manager = manager
+        self.scheduler = scheduler
+        self.changes = manager.track_changes()
+        self.manager.events.subscribe(self._on_library_event, Event)
+        self.manager.events.subscribe(self._on_fine_applied, FineApplied, FinesApplied)
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(pady=10, padx=10, expand=True, fill="both")
         self.create_items_tab()
         self.create_users_tab()
         self.create_borrow_return_tab()
         self.create_loans_tab()
-        self.refresh_all_lists()
+        self.create_diagnostics_tab()
+        self.notebook.bind('<<NotebookTabChanged>>', self.refresh_changed)
+        if progressive:
+            self._start_progressive_load()
+        else:
+            self.refresh_all_lists()
+            self.startup_times["loaded_s"] = time.perf_counter() - self.started
+        if self.scheduler is not None:
+            self._check_overdue()
 
     def create_menu(self):
         menubar = tk.Menu(self)
@@ -64,6 +125,7 @@ class LibraryApp(tk.Tk):
         style.theme_use("clam")
         style.configure('.', background=colors["BG_COLOR"], foreground=colors["TEXT_COLOR"], font=FONT_NORMAL)
         style.configure('TFrame', background=colors["FRAME_COLOR"])
+        style.configure('Status.TLabel', foreground=colors["DETAIL_LABEL_COLOR"], background=colors["BG_COLOR"])
         style.configure('Title.TLabel', font=FONT_TITLE, foreground=colors["ACCENT_COLOR"],
                         background=colors["BG_COLOR"])
         style.configure('TLabel', background=colors["FRAME_COLOR"], foreground=colors["TEXT_COLOR"])
@@ -107,21 +169,60 @@ class LibraryApp(tk.Tk):
         ttk.Label(search_frame, text="Search Title:", font=FONT_BOLD).pack(side='left', padx=(0, 5))
         self.item_search_var = tk.StringVar();
         ttk.Entry(search_frame, textvariable=self.item_search_var, width=30).pack(side='left', padx=5)
+        self.item_fuzzy_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Fuzzy", variable=self.item_fuzzy_var,
+                        command=self._perform_item_search).pack(side='left', padx=5)
         ttk.Label(search_frame, text="Status:", font=FONT_BOLD).pack(side='left', padx=(10, 5))
         self.item_status_var = tk.StringVar()
         status_filter_combo = ttk.Combobox(search_frame, textvariable=self.item_status_var,
                                            values=["All", "Available", "Borrowed", "Lost"], state="readonly");
         status_filter_combo.pack(side='left', padx=5);
         status_filter_combo.set("All")
+        self.item_search_var.trace_add("write", lambda *args: self._perform_item_search(self.search_worker.delay_ms))
+        self.item_status_var.trace_add("write", lambda *args: self._perform_item_search())
         ttk.Button(search_frame, text="🔍 Search", command=self._perform_item_search, style='Accent.TButton').pack(
             side='left', padx=5)
         ttk.Button(search_frame, text="Clear", command=self._clear_item_search).pack(side='left', padx=5)
+        filter_frame = ttk.Frame(list_frame);
+        filter_frame.pack(fill='x', pady=(0, 10))
+        ttk.Label(filter_frame, text="Genre:", font=FONT_BOLD).pack(side='left', padx=(0, 5))
+        self.item_genre_var = tk.StringVar()
+        # Genres are listed when the dropdown opens, so the catalog index is only built once it is needed.
+        genre_combo = ttk.Combobox(filter_frame, textvariable=self.item_genre_var, values=["All"], width=14,
+                                   state="readonly",
+                                   postcommand=lambda: genre_combo.configure(values=["All"] + self.manager.genres()));
+        genre_combo.pack(side='left', padx=5);
+        genre_combo.set("All")
+        ttk.Label(filter_frame, text="Type:", font=FONT_BOLD).pack(side='left', padx=(10, 5))
+        self.item_type_var = tk.StringVar()
+        type_combo = ttk.Combobox(filter_frame, textvariable=self.item_type_var,
+                                  values=["All", "Book", "Magazine", "MultimediaItem"], width=14, state="readonly");
+        type_combo.pack(side='left', padx=5);
+        type_combo.set("All")
+        ttk.Label(filter_frame, text="Year:", font=FONT_BOLD).pack(side='left', padx=(10, 5))
+        self.item_year_from_var = tk.StringVar();
+        ttk.Entry(filter_frame, textvariable=self.item_year_from_var, width=6).pack(side='left')
+        ttk.Label(filter_frame, text="–").pack(side='left', padx=2)
+        self.item_year_to_var = tk.StringVar();
+        ttk.Entry(filter_frame, textvariable=self.item_year_to_var, width=6).pack(side='left')
+        ttk.Label(filter_frame, text="Author starts with:", font=FONT_BOLD).pack(side='left', padx=(10, 5))
+        self.item_author_var = tk.StringVar();
+        ttk.Entry(filter_frame, textvariable=self.item_author_var, width=16).pack(side='left', padx=5)
+        for var in (self.item_genre_var, self.item_type_var):
+            var.trace_add("write", lambda *args: self._perform_item_search())
+        for var in (self.item_year_from_var, self.item_year_to_var, self.item_author_var):
+            var.trace_add("write", lambda *args: self._perform_item_search(self.search_worker.delay_ms))
         cols = ("ID", "Title", "Type", "Status");
-        self.items_tree = ttk.Treeview(list_frame, columns=cols, show='headings', selectmode='browse')
+        tree_frame = ttk.Frame(list_frame);
+        tree_frame.pack(expand=True, fill="both")
+        self.items_tree = ttk.Treeview(tree_frame, columns=cols, show='headings', selectmode='browse')
         for col in cols: self.items_tree.heading(col, text=col)
         self.items_tree.column("ID", width=50, anchor='center');
         self.items_tree.column("Title", width=300)
+        items_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical');
+        items_scrollbar.pack(side='right', fill='y')
         self.items_tree.pack(expand=True, fill="both")
+        self.items_view = VirtualTree(self.items_tree, items_scrollbar, self._fetch_item_rows)
         btn_frame = ttk.Frame(list_frame);
         btn_frame.pack(fill='x', pady=(10, 0))
         ttk.Button(btn_frame, text="➕ Add", command=self.add_item_window, style='Accent.TButton').pack(side='left',
@@ -144,7 +245,7 @@ class LibraryApp(tk.Tk):
             ttk.Label(details_frame, textvariable=self.detail_vars[label_text], style='Detail.TLabel',
                       wraplength=250).grid(row=i, column=1, sticky='w', padx=5, pady=2)
         paned_window.add(details_frame_container, weight=1);
-        self.items_tree.bind('<<TreeviewSelect>>', self._show_item_details)
+        self.items_tree.bind('<<TreeviewSelect>>', self._show_item_details, add='+')
 
     def create_users_tab(self):
         users_frame = ttk.Frame(self.notebook, style='TFrame');
@@ -156,15 +257,21 @@ class LibraryApp(tk.Tk):
         ttk.Label(user_search_frame, text="Search Name/ID:", font=FONT_BOLD).pack(side='left', padx=(0, 5))
         self.user_search_var = tk.StringVar();
         ttk.Entry(user_search_frame, textvariable=self.user_search_var, width=30).pack(side='left', padx=5)
+        self.user_search_var.trace_add("write", lambda *args: self._perform_user_search(self.search_worker.delay_ms))
         ttk.Button(user_search_frame, text="🔍 Search", command=self._perform_user_search, style='Accent.TButton').pack(
             side='left', padx=5)
         ttk.Button(user_search_frame, text="Clear", command=self._clear_user_search).pack(side='left', padx=5)
         cols = ("ID", "Name", "Contact", "Borrowed");
-        self.users_tree = ttk.Treeview(content_frame, columns=cols, show='headings', selectmode='browse')
+        tree_frame = ttk.Frame(content_frame);
+        tree_frame.pack(expand=True, fill="both")
+        self.users_tree = ttk.Treeview(tree_frame, columns=cols, show='headings', selectmode='browse')
         for col in cols: self.users_tree.heading(col, text=col)
         self.users_tree.column("ID", width=50, anchor='center');
         self.users_tree.column("Name", width=200)
+        users_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical');
+        users_scrollbar.pack(side='right', fill='y')
         self.users_tree.pack(expand=True, fill="both")
+        self.users_view = VirtualTree(self.users_tree, users_scrollbar, self._fetch_user_rows)
         btn_frame = ttk.Frame(content_frame);
         btn_frame.pack(fill='x', pady=(10, 0))
         ttk.Button(btn_frame, text="➕ Register", command=self.add_user_window, style='Accent.TButton').pack(side='left',
@@ -180,7 +287,7 @@ class LibraryApp(tk.Tk):
         ttk.Label(borrow_lf, text="User ID:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
         self.borrow_user_id = ttk.Entry(borrow_lf, width=30);
         self.borrow_user_id.grid(row=0, column=1, padx=5, pady=5)
-        ttk.Label(borrow_lf, text="Item ID:").grid(row=1, column=0, padx=5, pady=5, sticky='w')
+        ttk.Label(borrow_lf, text="Item ID(s):").grid(row=1, column=0, padx=5, pady=5, sticky='w')
         self.borrow_item_id = ttk.Entry(borrow_lf, width=30);
         self.borrow_item_id.grid(row=1, column=1, padx=5, pady=5)
         ttk.Button(borrow_lf, text="Borrow Item", style='Accent.TButton', command=self.borrow_item).grid(row=2,
@@ -193,7 +300,7 @@ class LibraryApp(tk.Tk):
         ttk.Label(return_lf, text="User ID:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
         self.return_user_id = ttk.Entry(return_lf, width=30);
         self.return_user_id.grid(row=0, column=1, padx=5, pady=5)
-        ttk.Label(return_lf, text="Item ID:").grid(row=1, column=0, padx=5, pady=5, sticky='w')
+        ttk.Label(return_lf, text="Item ID(s):").grid(row=1, column=0, padx=5, pady=5, sticky='w')
         self.return_item_id = ttk.Entry(return_lf, width=30);
         self.return_item_id.grid(row=1, column=1, padx=5, pady=5)
         ttk.Button(return_lf, text="Return Item", style='Accent.TButton', command=self.return_item).grid(row=2,
@@ -207,67 +314,295 @@ class LibraryApp(tk.Tk):
         self.notebook.add(loans_frame, text="  Loan Records  ")
         content_frame = ttk.Frame(loans_frame, padding=10);
         content_frame.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        filter_frame = ttk.Frame(content_frame);
+        filter_frame.pack(fill='x', pady=(0, 10))
+        ttk.Label(filter_frame, text="Show:", font=FONT_BOLD).pack(side='left', padx=(0, 5))
+        self.loan_filter_var = tk.StringVar()
+        loan_filter_combo = ttk.Combobox(filter_frame, textvariable=self.loan_filter_var,
+                                         values=["All", "Open", "Overdue"], state="readonly");
+        loan_filter_combo.pack(side='left', padx=5);
+        loan_filter_combo.set("All")
+        self.loan_filter_var.trace_add("write", lambda *args: self.refresh_loans_list())
+        ttk.Label(filter_frame, text="User ID:", font=FONT_BOLD).pack(side='left', padx=(10, 5))
+        self.loan_user_var = tk.StringVar();
+        ttk.Entry(filter_frame, textvariable=self.loan_user_var, width=8).pack(side='left', padx=5)
+        ttk.Label(filter_frame, text="Item ID:", font=FONT_BOLD).pack(side='left', padx=(10, 5))
+        self.loan_item_var = tk.StringVar();
+        ttk.Entry(filter_frame, textvariable=self.loan_item_var, width=8).pack(side='left', padx=5)
+        for var in (self.loan_user_var, self.loan_item_var):
+            var.trace_add("write", lambda *args: self.refresh_loans_list())
+        self.loan_history_var = tk.StringVar()
+        ttk.Label(filter_frame, textvariable=self.loan_history_var).pack(side='left', padx=10)
         cols = ("Loan ID", "Item Title", "User Name", "Borrowed", "Due", "Returned", "Fine");
-        self.loans_tree = ttk.Treeview(content_frame, columns=cols, show='headings', selectmode='browse')
+        tree_frame = ttk.Frame(content_frame);
+        tree_frame.pack(expand=True, fill='both')
+        self.loans_tree = ttk.Treeview(tree_frame, columns=cols, show='headings', selectmode='browse')
         for col in cols: self.loans_tree.heading(col, text=col)
         self.loans_tree.column("Loan ID", width=60, anchor='center');
         self.loans_tree.column("Item Title", width=250);
         self.loans_tree.column("User Name", width=150);
         self.loans_tree.column("Fine", width=80, anchor='e')
+        loans_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical');
+        loans_scrollbar.pack(side='right', fill='y')
         self.loans_tree.pack(expand=True, fill='both')
+        # Loan IDs are handed out in borrowing order, so newest-first by ID is newest-first by borrow date.
+        self.loans_view = VirtualTree(self.loans_tree, loans_scrollbar, self._fetch_loan_rows, newest_first=True)
         btn_frame = ttk.Frame(content_frame);
         btn_frame.pack(fill='x', pady=(10, 0))
         ttk.Button(btn_frame, text="🔄 Refresh", command=self.refresh_loans_list).pack(side='left', padx=5)
 
+    def create_diagnostics_tab(self):
+        diagnostics_frame = ttk.Frame(self.notebook, style='TFrame');
+        self.notebook.add(diagnostics_frame, text="  Diagnostics  ")
+        content_frame = ttk.Frame(diagnostics_frame, padding=10);
+        content_frame.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        control_frame = ttk.Frame(content_frame);
+        control_frame.pack(fill='x', pady=(0, 10))
+        self.stats_enabled_var = tk.BooleanVar(value=self.manager.stats.enabled)
+        ttk.Checkbutton(control_frame, text="Collect stats", variable=self.stats_enabled_var,
+                        command=self._toggle_stats).pack(side='left', padx=5)
+        ttk.Button(control_frame, text="🔄 Refresh", command=self.refresh_diagnostics).pack(side='left', padx=5)
+        ttk.Button(control_frame, text="Reset", command=self._reset_stats).pack(side='left', padx=5)
+        self.profile_button = ttk.Button(control_frame, text="⏱️ Profile 10s", command=self._start_profile)
+        self.profile_button.pack(side='left', padx=5)
+        cols = ("Operation", "Calls", "Errors", "Mean µs", "p50 µs", "p95 µs", "p99 µs", "Max µs");
+        self.stats_tree = ttk.Treeview(content_frame, columns=cols, show='headings', height=10)
+        for col in cols: self.stats_tree.heading(col, text=col); self.stats_tree.column(col, width=90, anchor='e')
+        self.stats_tree.column("Operation", width=200, anchor='w')
+        self.stats_tree.pack(fill='x')
+        self.counters_var = tk.StringVar(value="Counters: none yet.")
+        ttk.Label(content_frame, textvariable=self.counters_var, wraplength=1000).pack(fill='x', pady=10)
+        self.startup_var = tk.StringVar(value="Startup: still loading.")
+        ttk.Label(content_frame, textvariable=self.startup_var).pack(fill='x', pady=(0, 10))
+        self.profile_text = tk.Text(content_frame, height=12, wrap='none', font=("Consolas", 9))
+        self.profile_text.pack(expand=True, fill='both')
+
+    # --- Diagnostics ---
+    def refresh_diagnostics(self):
+        snapshot = self.manager.stats.snapshot()
+        self.stats_tree.delete(*self.stats_tree.get_children())
+        for name, row in snapshot["operations"].items():
+            self.stats_tree.insert("", "end", values=(name, row["count"], row["errors"], *(
+                f"{row[key]:.1f}" for key in ("mean_us", "p50_us", "p95_us", "p99_us", "max_us"))))
+        counters = snapshot["counters"]
+        self.counters_var.set("Counters: " + (", ".join(f"{name}={value}" for name, value in counters.items())
+                                              if counters else "none yet."))
+        if len(self.startup_times) == 2:
+            self.startup_var.set(f"Startup: {self._startup_summary()}")
+
+    def _toggle_stats(self):
+        if self.stats_enabled_var.get():
+            self.manager.enable_stats()
+        else:
+            self.manager.disable_stats()
+        self.refresh_diagnostics()
+
+    def _reset_stats(self):
+        self.manager.stats.reset(); self.refresh_diagnostics()
+
+    def _start_profile(self):
+        """Profiles the Tk thread for PROFILE_WINDOW_MS, then shows the slowest functions."""
+        if self.manager.stats.profiling: return
+        self.manager.stats.start_profile()
+        self.profile_button.config(state='disabled')
+        self.status_var.set("⏱️ Profiling for 10 seconds; use the app as usual...")
+        self.after(self.PROFILE_WINDOW_MS, self._stop_profile)
+
+    def _stop_profile(self):
+        report = self.manager.stats.stop_profile()
+        self.profile_text.delete("1.0", tk.END); self.profile_text.insert("1.0", report)
+        self.profile_button.config(state='normal')
+        self.status_var.set("✅ Profile captured.")
+        self.refresh_diagnostics()
+
+    # --- Startup ---
+    def _start_progressive_load(self):
+        """Fills the item and user lists chunk by chunk, then the loans, from a StartupLoader thread."""
+        self._load_total = max(1, len(self.manager.items) + len(self.manager.users))
+        self._load_count = 0
+        self.load_progress = ttk.Progressbar(self, mode='determinate', maximum=self._load_total)
+        self.load_progress.pack(side='bottom', fill='x', padx=10)
+        self.status_var.set("⏳ Loading the library...")
+        self.loader = StartupLoader(self, on_done=self._on_loaded)
+        for kind, view, tree in (("items", self.items_view, self.items_tree),
+                                 ("users", self.users_view, self.users_tree)):
+            self._stripe(tree)
+            self.loader.add(kind, lambda kind=kind: self.manager.id_batches(kind, self.LOAD_CHUNK),
+                            lambda ids, view=view: self._on_ids_loaded(view, ids),
+                            lambda kind=kind, view=view: self._on_list_loaded(kind, view))
+        self.loader.add("loans", self._build_loan_indexes, lambda loan_ids: self.refresh_loans_list())
+        self.loader.start()
+
+    def _build_loan_indexes(self):
+        """Runs on the loader thread: the loan list needs the ledger (titles and names) and the fine engine."""
+        self.manager.fine_engine()
+        yield self.manager.loan_ids()
+
+    def _on_ids_loaded(self, view, ids):
+        view.extend_ids(ids)
+        self._load_count += len(ids)
+        self.load_progress.configure(value=self._load_count)
+        self.status_var.set(f"⏳ Loading the library... {self._load_count:,} of {self._load_total:,} records.")
+
+    def _on_list_loaded(self, kind, view):
+        view.ids.sort()  # Storage order is almost always ID order already, which makes this a single pass.
+        view.render()
+        # Records changed while the list loaded were held back in self.changes; apply them now.
+        apply_changes = self._apply_item_changes if kind == "items" else self._apply_user_changes
+        apply_changes(self.changes.drain(kind))
+        if kind == "users":
+            self.status_var.set("⏳ Loading loan records...")
+
+    def _on_loaded(self):
+        self.startup_times["loaded_s"] = time.perf_counter() - self.started
+        self.load_progress.destroy()
+        self._report_startup()
+
+    def _on_first_paint(self):
+        self.update_idletasks()  # Draw the window before taking the time.
+        self.startup_times["first_paint_s"] = time.perf_counter() - self.started
+        self._report_startup()
+
+    def _is_loading(self, kind):
+        return self.loader is not None and self.loader.is_loading(kind)
+
+    def _startup_summary(self):
+        return (f"first paint {self.startup_times['first_paint_s'] * 1000:.0f} ms, "
+                f"fully loaded {self.startup_times['loaded_s']:.2f} s")
+
+    def _report_startup(self):
+        if len(self.startup_times) == 2:
+            self.status_var.set(f"✅ {len(self.items_view):,} items and {len(self.users_view):,} users ready; "
+                                f"{self._startup_summary()}.")
+
+    # --- Row rendering ---
+    def _loan_row(self, entry):
+        loan = entry.loan
+        return_date = loan.return_date if loan.return_date else "Not Returned";
+        # Open loans show the fine accrued so far, not just fines charged at return.
+        fine = self.manager.fine_engine().fine_for(loan.loan_id)
+        fine_str = f"${fine:.2f}" if fine > 0 else "$0.00"
+        return (loan.loan_id, entry.item_title, entry.user_name, loan.borrow_date, loan.due_date, return_date, fine_str)
+
+    @staticmethod
+    def _item_row(item):
+        return (item.item_id, item.title, item.__class__.__name__, item.status)
+
+    @staticmethod
+    def _user_row(user):
+        return (user.user_id, user.name, user.contact_info, f"{len(user.borrowed_items)}/{user.max_borrow_limit}")
+
+    def _fetch_item_rows(self, item_ids):
+        return [self._item_row(item) if item else None for item in self.manager.get_many("items", item_ids)]
+
+    def _fetch_user_rows(self, user_ids):
+        return [self._user_row(user) if user else None for user in self.manager.get_many("users", user_ids)]
+
+    def _fetch_loan_rows(self, loan_ids):
+        return [self._loan_row(entry) if entry else None for entry in self.manager.ledger_entries(loan_ids)]
+
+    def _stripe(self, tree):
+        tree.tag_configure('oddrow', background=self.colors["ODD_ROW_COLOR"]);
+        tree.tag_configure('evenrow', background=self.colors["EVEN_ROW_COLOR"])
+
+    # --- Full refreshes ---
     def refresh_loans_list(self):
-        self.loans_tree.tag_configure('oddrow', background=self.colors["ODD_ROW_COLOR"]);
-        self.loans_tree.tag_configure('evenrow', background=self.colors["EVEN_ROW_COLOR"])
-        for i in self.loans_tree.get_children(): self.loans_tree.delete(i)
-        sorted_loans = sorted(self.manager.loans.values(), key=lambda loan: loan.borrow_date, reverse=True)
-        for i, loan in enumerate(sorted_loans):
-            item = self.manager.find_item(loan.item_id);
-            user = self.manager.find_user(loan.user_id)
-            item_title = item.title if item else f"Deleted Item (ID: {loan.item_id})";
-            user_name = user.name if user else f"Deleted User (ID: {loan.user_id})"
-            return_date = loan.return_date if loan.return_date else "Not Returned";
-            fine_str = f"${loan.fine_amount:.2f}" if loan.fine_amount > 0 else "$0.00"
-            self.loans_tree.insert("", "end", values=(
-            loan.loan_id, item_title, user_name, loan.borrow_date, loan.due_date, return_date, fine_str),
-                                   tags=('evenrow' if i % 2 == 0 else 'oddrow',))
-
-    def refresh_items_list(self, title_query=None, status_filter=None):
-        self.items_tree.tag_configure('oddrow', background=self.colors["ODD_ROW_COLOR"]);
-        self.items_tree.tag_configure('evenrow', background=self.colors["EVEN_ROW_COLOR"])
-        for i in self.items_tree.get_children(): self.items_tree.delete(i)
-        items_to_display = list(self.manager.items.values())
-        if title_query: items_to_display = [item for item in items_to_display if
-                                            title_query.lower() in item.title.lower()]
-        if status_filter and status_filter != "All": items_to_display = [item for item in items_to_display if
-                                                                         item.status == status_filter]
-        for i, item in enumerate(items_to_display):
-            self.items_tree.insert("", "end", values=(item.item_id, item.title, item.__class__.__name__, item.status),
-                                   tags=('evenrow' if i % 2 == 0 else 'oddrow',))
-
-    def _perform_item_search(self):
-        self.refresh_items_list(self.item_search_var.get().strip(), self.item_status_var.get())
+        if self.loader is not None:
+            self.loader.cancel("loans")
+        self._stripe(self.loans_tree)
+        self.changes.drain("loans")
+        status, user_id, item_id = self._loan_filters()
+        self.loans_view.set_ids(self.manager.loan_ids(status, user_id, item_id))
+        self.loan_history_var.set(self._history_summary(user_id, item_id))
+
+    def refresh_items_list(self, query=None):
+        self.search_worker.cancel("items")
+        query = query if query is not None else ItemQuery()
+        self._show_item_results(query, self.manager.query_item_ids(query))
+
+    def _show_item_results(self, query, item_ids, ranked=False):
+        if self.loader is not None:
+            self.loader.cancel("items")
+        self._stripe(self.items_tree)
+        self.changes.drain("items")
+        self._item_filter = query
+        self.items_view.set_ids(item_ids, ranked)
+
+    def _item_query(self):
+        """Builds an ItemQuery from the search and filter fields; "All" and empty fields match everything."""
+        def chosen(var):
+            value = var.get().strip()
+            return value if value and value != "All" else None
+
+        return ItemQuery(title=chosen(self.item_search_var), genre=chosen(self.item_genre_var),
+                         year_from=chosen(self.item_year_from_var), year_to=chosen(self.item_year_to_var),
+                         author_prefix=chosen(self.item_author_var), item_type=chosen(self.item_type_var),
+                         status=chosen(self.item_status_var))
+
+    def _perform_item_search(self, delay_ms=0):
+        """Runs the item search on the search worker; typing passes a delay so only the last keystroke counts."""
+        try:
+            query = self._item_query()
+        except ValueError as e:
+            self.search_worker.cancel("items")
+            return self.status_var.set(str(e))
+
+        if self.item_fuzzy_var.get() and query.title:
+            return self._perform_fuzzy_search(query, delay_ms)
+
+        def show(item_ids):
+            self._show_item_results(query, item_ids)
+            # Items changed while the query ran are re-checked against the filter it used.
+            self._apply_item_changes(self.changes.drain("items"))
+            self.status_var.set(f"🔍 {len(item_ids)} matching item(s).")
+
+        self.search_worker.submit("items", lambda: self.manager.query_item_ids(query), show, delay_ms)
+
+    def _perform_fuzzy_search(self, query, delay_ms):
+        """Lists the best typo-tolerant matches for the title box (titles and creators), best first."""
+        text, query.title = query.title, None  # The other filters still apply; the title is matched fuzzily.
+
+        def show(results):
+            self._show_item_results(query, [item.item_id for item, _ in results], ranked=True)
+            self._apply_item_changes(self.changes.drain("items"))
+            if results:
+                best, score = results[0]
+                self.status_var.set(f"🔍 {len(results)} close match(es); best: '{best.title}' ({score:.0%}).")
+            else:
+                self.status_var.set(f"🔍 Nothing close to '{text}'.")
+
+        self.search_worker.submit("items", lambda: self.manager.fuzzy_search(text, self.FUZZY_RESULTS, query), show,
+                                  delay_ms)
 
     def _clear_item_search(self):
-        self.item_search_var.set(""); self.item_status_var.set("All"); self.refresh_items_list()
+        for var in (self.item_search_var, self.item_year_from_var, self.item_year_to_var, self.item_author_var):
+            var.set("")
+        for var in (self.item_status_var, self.item_genre_var, self.item_type_var):
+            var.set("All")
+        self.item_fuzzy_var.set(False)
+        self.refresh_items_list()
 
     def refresh_users_list(self, query=None):
-        self.users_tree.tag_configure('oddrow', background=self.colors["ODD_ROW_COLOR"]);
-        self.users_tree.tag_configure('evenrow', background=self.colors["EVEN_ROW_COLOR"])
-        for i in self.users_tree.get_children(): self.users_tree.delete(i)
-        users_to_display = list(self.manager.users.values())
-        if query: q = query.lower(); users_to_display = [user for user in users_to_display if
-                                                         q in user.name.lower() or q == str(user.user_id)]
-        for i, user in enumerate(users_to_display):
-            self.users_tree.insert("", "end", values=(
-            user.user_id, user.name, user.contact_info, f"{len(user.borrowed_items)}/{user.max_borrow_limit}"),
-                                   tags=('evenrow' if i % 2 == 0 else 'oddrow',))
-
-    def _perform_user_search(self):
-        self.refresh_users_list(self.user_search_var.get().strip())
+        self.search_worker.cancel("users")
+        self._show_user_results(query, self.manager.user_ids(query))
+
+    def _show_user_results(self, query, user_ids):
+        if self.loader is not None:
+            self.loader.cancel("users")
+        self._stripe(self.users_tree)
+        self.changes.drain("users")
+        self._user_query = query
+        self.users_view.set_ids(user_ids)
+
+    def _perform_user_search(self, delay_ms=0):
+        query = self.user_search_var.get().strip()
+
+        def show(user_ids):
+            self._show_user_results(query, user_ids)
+            self._apply_user_changes(self.changes.drain("users"))
+            self.status_var.set(f"🔍 {len(user_ids)} matching user(s).")
+
+        self.search_worker.submit("users", lambda: self.manager.user_ids(query), show, delay_ms)
 
     def _clear_user_search(self):
         self.user_search_var.set(""); self.refresh_users_list()
@@ -276,6 +611,80 @@ class LibraryApp(tk.Tk):
         self._clear_item_search(); self._clear_user_search(); self.refresh_loans_list(); [
             self.detail_vars[key].set("N/A") for key in self.detail_vars]
 
+    # --- Incremental refreshes ---
+    def refresh_changed(self, event=None):
+        """Updates only the rows of records changed since the last refresh, and only on the visible tab.
+
+        Changes to the other tabs, and to lists still being loaded, stay queued in self.changes until their tab
+        is shown or their list is complete.
+        """
+        tab = self.notebook.index(self.notebook.select())
+        if tab == self.ITEMS_TAB and not self._is_loading("items"):
+            self._apply_item_changes(self.changes.drain("items"))
+        elif tab == self.USERS_TAB and not self._is_loading("users"):
+            self._apply_user_changes(self.changes.drain("users"))
+        elif tab == self.LOANS_TAB and not self._is_loading("loans"):
+            self._apply_loan_changes(self.changes.drain("loans"))
+        elif tab == self.DIAGNOSTICS_TAB:
+            self.refresh_diagnostics()
+
+    def _apply_item_changes(self, item_ids):
+        listed = {}
+        for item_id in item_ids:
+            item = self.manager.find_item(item_id)
+            listed[item_id] = item is not None and self._item_filter.matches(item)
+        self.items_view.apply_changes(listed)
+        shown = self.detail_vars["ID"].get()
+        if shown.isdigit() and int(shown) in item_ids:
+            if self.items_tree.selection():
+                self._show_item_details(None)
+            else:
+                for var in self.detail_vars.values(): var.set("N/A")
+
+    def _apply_user_changes(self, user_ids):
+        q = self._user_query.lower() if self._user_query else None
+        listed = {}
+        for user_id in user_ids:
+            user = self.manager.find_user(user_id)
+            listed[user_id] = user is not None and (not q or q in user.name.lower() or q == str(user.user_id))
+        self.users_view.apply_changes(listed)
+
+    def _loan_filters(self):
+        """(status, user_id, item_id) from the Loan Records filters; an empty or non-numeric ID is ignored."""
+        def record_id(var):
+            value = var.get().strip()
+            return int(value) if value.isdigit() else None
+
+        status = {"Open": "open", "Overdue": "overdue"}.get(self.loan_filter_var.get())
+        return status, record_id(self.loan_user_var), record_id(self.loan_item_var)
+
+    def _history_summary(self, user_id, item_id):
+        if item_id is not None and user_id is None:
+            entry = self.manager.last_loan(item_id)
+            if entry is None:
+                return "Never borrowed."
+            repeat = self.manager.repeat_borrows(item_id=item_id)
+            return (f"Last borrower: {entry.user_name} (ID: {entry.loan.user_id}) on {entry.loan.borrow_date}"
+                    + (f" · {len(repeat)} repeat borrower(s)" if repeat else ""))
+        if user_id is not None and item_id is None:
+            borrowed = self.manager.repeat_borrows(user_id=user_id, min_count=1)
+            repeat = sum(1 for count in borrowed.values() if count > 1)
+            return f"{len(borrowed)} different item(s) borrowed, {repeat} of them more than once."
+        if user_id is not None:
+            return f"Borrowed {self.manager.borrow_count(user_id, item_id)} time(s)."
+        return ""
+
+    def _apply_loan_changes(self, loan_ids):
+        loan_ids = sorted(loan_ids)
+        (status, user_id, item_id), today = self._loan_filters(), date.today()
+        entries = self.manager.ledger_entries(loan_ids)
+        self.loans_view.apply_changes({
+            loan_id: entry is not None and entry.matches(status, today)
+                     and user_id in (None, entry.loan.user_id) and item_id in (None, entry.loan.item_id)
+            for loan_id, entry in zip(loan_ids, entries)})
+        if loan_ids and (user_id is not None or item_id is not None):
+            self.loan_history_var.set(self._history_summary(user_id, item_id))
+
     def _show_item_details(self, event):
         selected_items = self.items_tree.selection()
         if not selected_items: return
@@ -300,6 +709,18 @@ class LibraryApp(tk.Tk):
         if hasattr(item, 'director_or_narrator'): self.detail_vars["Director/Narrator"].set(item.director_or_narrator)
         if hasattr(item, 'duration_minutes'): self.detail_vars["Duration (mins)"].set(item.duration_minutes)
 
+    def _check_overdue(self):
+        """Ticks the overdue scheduler now and then once a minute; newly overdue loans show up as events."""
+        if self.scheduler.tick():
+            self.refresh_changed()
+        self.after(self.OVERDUE_CHECK_MS, self._check_overdue)
+
+    def _on_library_event(self, event):
+        self.status_var.set(event.message())
+
+    def _on_fine_applied(self, event):
+        messagebox.showwarning("Late Return", event.message())
+
     # --- THIS IS THE CORRECTED METHOD ---
     def add_item_window(self):
         dialog = ItemDialog(self, title="Add New Library Item")
@@ -307,7 +728,7 @@ class LibraryApp(tk.Tk):
             # The dialog.result is already a fully formed object.
             # We just need to pass it to the manager.
             self.manager.add_item(dialog.result)
-            self.refresh_all_lists()
+            self.refresh_changed()
             messagebox.showinfo("Success", "Item added successfully!")
 
     def update_item_window(self):
@@ -316,13 +737,16 @@ class LibraryApp(tk.Tk):
         item_id = int(self.items_tree.item(selected, 'values')[0]);
         item_to_update = self.manager.find_item(item_id)
         dialog = ItemDialog(self, title="Update Item", item_to_update=item_to_update)
-        if dialog.result: self.manager.update_item(item_id,
-                                                   **dialog.result); self.refresh_all_lists(); messagebox.showinfo(
-            "Success", "Item updated successfully!")
+        if dialog.result:
+            try:
+                self.manager.update_item(item_id, **dialog.result)
+            except ValueError as e:
+                return messagebox.showerror("Error", str(e))
+            self.refresh_changed(); messagebox.showinfo("Success", "Item updated successfully!")
 
     def add_user_window(self):
         dialog = UserDialog(self, title="Register New User")
-        if dialog.result: self.manager.add_user(dialog.result); self.refresh_all_lists(); messagebox.showinfo("Success",
+        if dialog.result: self.manager.add_user(dialog.result); self.refresh_changed(); messagebox.showinfo("Success",
                                                                                                               f"User '{dialog.result.name}' registered!")
 
     def update_user_window(self):
@@ -331,9 +755,12 @@ class LibraryApp(tk.Tk):
         user_id = int(self.users_tree.item(selected, 'values')[0]);
         user_to_update = self.manager.find_user(user_id)
         dialog = UserDialog(self, title="Update User", user_to_update=user_to_update)
-        if dialog.result: self.manager.update_user(user_id,
-                                                   **dialog.result); self.refresh_all_lists(); messagebox.showinfo(
-            "Success", "User updated successfully!")
+        if dialog.result:
+            try:
+                self.manager.update_user(user_id, **dialog.result)
+            except ValueError as e:
+                return messagebox.showerror("Error", str(e))
+            self.refresh_changed(); messagebox.showinfo("Success", "User updated successfully!")
 
     def delete_item(self):
         selected = self.items_tree.focus()
@@ -341,7 +768,7 @@ class LibraryApp(tk.Tk):
         item_id = int(self.items_tree.item(selected, 'values')[0])
         if messagebox.askyesno("Confirm", f"Are you sure you want to delete item ID {item_id}?"):
             try:
-                self.manager.delete_item(item_id); self.refresh_all_lists()
+                self.manager.delete_item(item_id); self.refresh_changed()
             except ValueError as e:
                 messagebox.showerror("Error", str(e))
 
@@ -351,17 +778,36 @@ class LibraryApp(tk.Tk):
         user_id = int(self.users_tree.item(selected, 'values')[0])
         if messagebox.askyesno("Confirm", f"Are you sure you want to delete user ID {user_id}?"):
             try:
-                self.manager.delete_user(user_id); self.refresh_all_lists()
+                self.manager.delete_user(user_id); self.refresh_changed()
             except ValueError as e:
                 messagebox.showerror("Error", str(e))
 
+    @staticmethod
+    def _parse_item_ids(text):
+        """Item IDs from an entry: one ID, or several separated by commas or spaces for a whole stack."""
+        item_ids = [int(item_id) for item_id in text.replace(",", " ").split()]
+        if not item_ids:
+            raise ValueError("❌ Error: Enter at least one Item ID.")
+        return item_ids
+
+    def _show_batch_result(self, result, verb):
+        if result:
+            return messagebox.showinfo("Success", f"{len(result)} items {result.action} successfully!")
+        lines = [f"Item {outcome.item_id}: {outcome.error}" for outcome in result.failures]
+        messagebox.showerror("Error", f"Could not {verb} the items; nothing was changed.\n\n" + "\n".join(lines))
+
     def borrow_item(self):
         try:
             user_id = int(self.borrow_user_id.get());
-            item_id = int(self.borrow_item_id.get())
-            self.manager.borrow_item(user_id, item_id);
-            self.refresh_all_lists();
-            messagebox.showinfo("Success", "Item borrowed successfully!")
+            item_ids = self._parse_item_ids(self.borrow_item_id.get())
+            if len(item_ids) == 1:
+                self.manager.borrow_item(user_id, item_ids[0]);
+                messagebox.showinfo("Success", "Item borrowed successfully!")
+            else:
+                result = self.manager.borrow_items(user_id, item_ids)
+                self._show_batch_result(result, "borrow")
+                if not result: return
+            self.refresh_changed();
             self.borrow_user_id.delete(0, 'end');
             self.borrow_item_id.delete(0, 'end')
         except ValueError as e:
@@ -370,27 +816,63 @@ class LibraryApp(tk.Tk):
     def return_item(self):
         try:
             user_id = int(self.return_user_id.get());
-            item_id = int(self.return_item_id.get())
-            self.manager.return_item(user_id, item_id);
-            self.refresh_all_lists();
-            messagebox.showinfo("Success", "Item returned successfully!")
+            item_ids = self._parse_item_ids(self.return_item_id.get())
+            if len(item_ids) == 1:
+                self.manager.return_item(user_id, item_ids[0]);
+                messagebox.showinfo("Success", "Item returned successfully!")
+            else:
+                result = self.manager.return_items(user_id, item_ids)
+                self._show_batch_result(result, "return")
+                if not result: return
+            self.refresh_changed();
             self.return_user_id.delete(0, 'end');
             self.return_item_id.delete(0, 'end')
         except ValueError as e:
             messagebox.showerror("Error", f"Could not return item: {e}")
 
 
-def main():
-    manager = LibraryManager()
+def seed_demo_data(manager):
     manager.add_item(Book(title="The Hitchhiker's Guide", author_or_creator="Douglas Adams", publication_year=1979,
                           publisher="Pan Books", genre="Sci-Fi", page_count=224, edition="1st", isbn="0-345-39180-2"))
     manager.add_item(
         Magazine(title="National Geographic", author_or_creator="NGS", publication_year=2023, publisher="NGS",
                  genre="Science", issue_number=145, publication_date="July 2023"))
     manager.add_user(User(name="Alice Wonder", contact_info="alice@example.com"))
-    app = LibraryApp(manager)
+
+
+def open_library(db_path=None, journal_dir=None, outbox_dir=None, snapshot_path=None):
+    """Opens the storage, replays the journal and scans the open loans: returns (manager, scheduler)."""
+    if snapshot_path:
+        storage = SnapshotStorage(snapshot_path)
+    else:
+        storage = SQLiteStorage(db_path) if db_path else None
+    # Searches read the manager from a worker thread, so it has to be thread-safe.
+    manager = LibraryManager(storage=storage, thread_safe=True)
+    if journal_dir:
+        Journal(journal_dir).attach(manager)
+    if not manager.items and not manager.users:
+        seed_demo_data(manager)
+    return manager, OverdueScheduler(manager, OutboxNotifier(outbox_dir) if outbox_dir else None)
+
+
+def main(db_path=None, journal_dir=None, outbox_dir=None, snapshot_path=None, progressive=False):
+    started = time.perf_counter()
+    app = LibraryApp(progressive=progressive, started=started,
+                     open_library=lambda: open_library(db_path, journal_dir, outbox_dir, snapshot_path))
     app.mainloop()
+    app.search_worker.close()
+    if app.manager is not None:
+        app.manager.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Library Management System (GUI)")
+    parser.add_argument("--db", help="SQLite database file to keep the library in (default: in memory)")
+    parser.add_argument("--snapshot", metavar="FILE",
+                        help="Binary snapshot to open the library from (created if missing, saved on exit)")
+    parser.add_argument("--journal", help="Directory for an operation journal that restores the library on restart")
+    parser.add_argument("--outbox", metavar="DIR", help="Directory to write overdue notices to")
+    parser.add_argument("--progressive", action="store_true",
+                        help="Show the window at once and load the lists in the background")
+    args = parser.parse_args()
+    main(args.db, args.journal, args.outbox, args.snapshot, args.progressive)
\ No newline at end of file
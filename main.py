@@ -1,16 +1,22 @@
 # main.py
+import argparse
+
+from core.bulk_io import export_items, export_users, import_items, import_users
+from core.catalog import ItemQuery
+from core.events import print_event
+from core.journal import Journal
 from core.library_manager import LibraryManager
+from core.overdue import OutboxNotifier, OverdueScheduler
+from core.snapshot import SnapshotStorage, in_id_order, write_snapshot
+from core.storage import SQLiteStorage
 from models.book import Book
 from models.magazine import Magazine
 from models.multimedia_item import MultimediaItem
 from models.user import User
 
 
-def main_menu():
-    """Displays the main menu and handles user input."""
-    manager = LibraryManager()
-
-    # --- Pre-populate with some data for demonstration ---
+def seed_demo_data(manager):
+    """Pre-populates an empty library with some data for demonstration."""
     book1 = Book("The Hitchhiker's Guide to the Galaxy", "Douglas Adams", 1979, "Pan Books", "Sci-Fi", 224, "1st",
                  "0-345-39180-2")
     mag1 = Magazine("National Geographic", "National Geographic Society", 2023, "NGS", "Science", 145, "July 2023")
@@ -24,10 +30,146 @@ def main_menu():
     user2 = User("Bob Builder", "bob@example.com")
     manager.add_user(user1)
     manager.add_user(user2)
+
+
+def run_bulk_transfers(manager, args):
+    """Runs the --import-*/--export-* options given on the command line."""
+    for path, import_records in ((args.import_items, import_items), (args.import_users, import_users)):
+        if path:
+            report = import_records(manager, path)
+            print(report)
+            for record_number, message in report.errors[:10]:
+                print(f"  Record {record_number}: {message}")
+    for path, export_records in ((args.export_items, export_items), (args.export_users, export_users)):
+        if path:
+            print(f"✅ Exported {export_records(manager, path)} records to '{path}'.")
+    if args.export_snapshot:
+        size = write_snapshot(args.export_snapshot, in_id_order(manager.items), in_id_order(manager.users),
+                              in_id_order(manager.loans))
+        print(f"✅ Wrote a {size / 2 ** 20:,.1f} MiB snapshot to '{args.export_snapshot}'.")
+
+
+def read_item_ids(prompt):
+    item_ids = [int(item_id) for item_id in input(prompt).replace(",", " ").split()]
+    if not item_ids:
+        raise ValueError("❌ Error: Enter at least one Item ID.")
+    return item_ids
+
+
+def print_batch_result(result):
+    """Prints a batch checkout/return outcome; a refused batch lists why each failing item blocked it."""
+    if result:
+        return  # The LoansOpened/LoansClosed event has already been printed.
+    print(result.message())
+    for outcome in result.failures:
+        print(f"  Item {outcome.item_id}: {outcome.error}")
+
+
+def show_stats_menu(manager):
+    """Prints the per-operation latency report and lets the user toggle, reset or profile the stats."""
+    stats = manager.stats
+    print(f"\n--- Performance Stats ({'enabled' if stats.enabled else 'disabled'}) ---")
+    print(stats.format_report())
+    print("\n  e. Enable stats   d. Disable stats   r. Reset")
+    print(f"  p. {'Stop profiling and show the results' if stats.profiling else 'Start profiling'}")
+    action = input("Choice (Enter to go back): ").lower()
+    if action == 'e':
+        manager.enable_stats()
+        print("✅ Stats enabled.")
+    elif action == 'd':
+        manager.disable_stats()
+        print("✅ Stats disabled.")
+    elif action == 'r':
+        stats.reset()
+        print("✅ Stats reset.")
+    elif action == 'p':
+        if stats.profiling:
+            print(stats.stop_profile())
+        else:
+            stats.start_profile()
+            print("✅ Profiling started; choose 9 and p again to stop it.")
+
+
+def print_pages(fetch_page, render, empty_message, page_size=20):
+    """Streams a listing a page at a time: fetch_page(cursor, limit) returns (records, next_cursor)."""
+    cursor, shown = None, 0
+    while True:
+        records, cursor = fetch_page(cursor, page_size)
+        for record in records:
+            print("-" * 20)
+            print(render(record))
+        shown += len(records)
+        if not shown:
+            print(empty_message)
+        if cursor is None or input(f"-- {shown} shown. Enter for more, q to stop: ").lower() == 'q':
+            break
+
+
+def show_loan_history(manager, page_size=10):
+    """Pages through a user's or an item's loans, newest first, with repeat-borrow counts."""
+    kind = input("History for a [u]ser or an [i]tem? ").lower()
+    if kind not in ('u', 'i'):
+        return print("❌ Invalid choice.")
+    record_id = int(input("Enter the User ID: " if kind == 'u' else "Enter the Item ID: "))
+    if kind == 'u':
+        if manager.find_user(record_id) is None:
+            raise ValueError("❌ Error: User not found.")
+        repeat = manager.repeat_borrows(user_id=record_id)
+        titles = [item.title if item else f"Item {item_id}" for item_id, item in zip(repeat, manager.get_many(
+            "items", list(repeat)))]
+        summary = ", ".join(f"'{title}' x{count}" for title, count in zip(titles, repeat.values()))
+        print(f"\n--- Loan History for User ID {record_id} ---")
+        print(f"Borrowed more than once: {summary or 'nothing'}")
+    else:
+        if manager.find_item(record_id) is None:
+            raise ValueError("❌ Error: Item not found.")
+        last = manager.last_loan(record_id)
+        print(f"\n--- Loan History for Item ID {record_id} ---")
+        print(f"Last borrower: {f'{last.user_name} on {last.loan.borrow_date}' if last else 'nobody yet'}")
+    cursor = None
+    while True:
+        if kind == 'u':
+            entries, cursor = manager.user_history(record_id, cursor, page_size)
+        else:
+            entries, cursor = manager.item_history(record_id, cursor, page_size)
+        for entry in entries:
+            loan = entry.loan
+            who = entry.item_title if kind == 'u' else entry.user_name
+            print(f"  Loan {loan.loan_id}: {who} | borrowed {loan.borrow_date} | "
+                  f"returned {loan.return_date or 'not yet'}")
+        if not entries:
+            print("  No loans.")
+        if cursor is None or input("Enter for more, q to stop: ").lower() == 'q':
+            break
+
+
+def open_storage(db_path=None, snapshot_path=None):
+    """The storage backend chosen on the command line; None keeps the library in memory."""
+    if snapshot_path:
+        return SnapshotStorage(snapshot_path)
+    return SQLiteStorage(db_path) if db_path else None
+
+
+def main_menu(db_path=None, journal_dir=None, args=None):
+    """Displays the main menu and handles user input."""
+    snapshot_path = args.snapshot if args is not None else None
+    render_cache_size = args.render_cache if args is not None else 10_000
+    manager = LibraryManager(storage=open_storage(db_path, snapshot_path), render_cache_size=render_cache_size)
+    manager.events.subscribe(print_event)
+    if journal_dir:
+        Journal(journal_dir).attach(manager)
+    if args is not None:
+        run_bulk_transfers(manager, args)
+    if not manager.items and not manager.users:
+        seed_demo_data(manager)
+    outbox_dir = args.outbox if args is not None else None
+    scheduler = OverdueScheduler(manager, OutboxNotifier(outbox_dir) if outbox_dir else None)
+    if args is not None and args.stats:
+        manager.enable_stats()
     print("\n--- Welcome to the Library Management System! ---")
-    # --------------------------------------------------------
 
     while True:
+        scheduler.tick()
         print("\n==================== MENU ====================")
         print("1.  List All Items")
         print("2.  List All Users")
@@ -37,6 +179,10 @@ def main_menu():
         print("6.  Filter Items by Status")
         print("7.  Add New Item")
         print("8.  Register New User")
+        print("9.  Performance Stats")
+        print("10. Advanced Item Search")
+        print("11. Fuzzy Search (Title/Creator, Typo-Tolerant)")
+        print("12. Loan History (User or Item)")
         print("0.  Exit")
         print("============================================")
 
@@ -45,49 +191,41 @@ def main_menu():
         try:
             if choice == '1':
                 print("\n--- All Library Items ---")
-                if not manager.items:
-                    print("No items in the library.")
-                for item in manager.items.values():
-                    print("-" * 20)
-                    print(item.display_info())
+                print_pages(manager.item_page, manager.render_item, "No items in the library.")
 
             elif choice == '2':
                 print("\n--- All Registered Users ---")
-                if not manager.users:
-                    print("No users registered.")
-                for user in manager.users.values():
-                    print("-" * 20)
-                    print(user.display_info())
+                print_pages(manager.user_page, manager.render_user, "No users registered.")
 
             elif choice == '3':
                 user_id = int(input("Enter your User ID: "))
-                item_id = int(input("Enter the Item ID to borrow: "))
-                manager.borrow_item(user_id, item_id)
+                item_ids = read_item_ids("Enter the Item ID(s) to borrow (comma-separated for a stack): ")
+                if len(item_ids) == 1:
+                    manager.borrow_item(user_id, item_ids[0])
+                else:
+                    print_batch_result(manager.borrow_items(user_id, item_ids))
 
             elif choice == '4':
                 user_id = int(input("Enter your User ID: "))
-                item_id = int(input("Enter the Item ID to return: "))
-                manager.return_item(user_id, item_id)
+                item_ids = read_item_ids("Enter the Item ID(s) to return (comma-separated for a stack): ")
+                if len(item_ids) == 1:
+                    manager.return_item(user_id, item_ids[0])
+                else:
+                    print_batch_result(manager.return_items(user_id, item_ids))
 
             elif choice == '5':
-                query = input("Enter title to search for: ")
-                results = manager.search_items_by_title(query)
-                print(f"\n--- Search Results for '{query}' ---")
-                if not results:
-                    print("No items found.")
-                for item in results:
-                    print("-" * 20)
-                    print(item.display_info())
+                title = input("Enter title to search for: ")
+                query = ItemQuery(title=title)
+                print(f"\n--- Search Results for '{title}' ---")
+                print_pages(lambda cursor, limit: manager.item_page(cursor, limit, query), manager.render_item,
+                            "No items found.")
 
             elif choice == '6':
                 status = input("Enter status to filter by (Available/Borrowed): ")
-                results = manager.filter_items_by_status(status)
+                query = ItemQuery(status=status)
                 print(f"\n--- Items with Status '{status}' ---")
-                if not results:
-                    print("No items found with that status.")
-                for item in results:
-                    print("-" * 20)
-                    print(item.display_info())
+                print_pages(lambda cursor, limit: manager.item_page(cursor, limit, query), manager.render_item,
+                            "No items found with that status.")
 
             elif choice == '7':
                 # Simplified add new item for CLI
@@ -119,7 +257,39 @@ def main_menu():
                 new_user = User(name, contact)
                 manager.add_user(new_user)
 
+            elif choice == '9':
+                show_stats_menu(manager)
+
+            elif choice == '10':
+                print("Leave a field empty to skip it.")
+                query = ItemQuery(title=input("Title contains: ").strip(), genre=input("Genre: ").strip(),
+                                  year_from=input("Published from year: ").strip(),
+                                  year_to=input("Published up to year: ").strip(),
+                                  author_prefix=input("Author/Creator starts with: ").strip(),
+                                  item_type=input("Type (Book/Magazine/MultimediaItem): ").strip(),
+                                  status=input("Status (Available/Borrowed/Lost): ").strip())
+                results = manager.query_items(query)
+                print(f"\n--- {len(results)} Matching Item(s) ---")
+                for item in results:
+                    print("-" * 20)
+                    print(manager.render_item(item))
+
+            elif choice == '11':
+                text = input("Enter title or creator words (typos are fine): ")
+                results = manager.fuzzy_search(text, limit=10)
+                print(f"\n--- Closest Matches for '{text}' ---")
+                if not results:
+                    print("No close matches found.")
+                for item, score in results:
+                    print("-" * 20)
+                    print(f"Match: {score:.0%}")
+                    print(manager.render_item(item))
+
+            elif choice == '12':
+                show_loan_history(manager)
+
             elif choice == '0':
+                manager.close()
                 print("👋 Exiting the system. Goodbye!")
                 break
             else:
@@ -132,4 +302,18 @@ def main_menu():
 
 
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Library Management System (CLI)")
+    parser.add_argument("--db", help="SQLite database file to keep the library in (default: in memory)")
+    parser.add_argument("--snapshot", metavar="FILE",
+                        help="Binary snapshot to open the library from (created if missing, saved on exit)")
+    parser.add_argument("--journal", help="Directory for an operation journal that restores the library on restart")
+    for kind in ("items", "users"):
+        parser.add_argument(f"--import-{kind}", metavar="FILE", help=f"Load {kind} from a CSV or JSONL file")
+        parser.add_argument(f"--export-{kind}", metavar="FILE", help=f"Write all {kind} to a CSV or JSONL file")
+    parser.add_argument("--export-snapshot", metavar="FILE", help="Write the whole library to a binary snapshot")
+    parser.add_argument("--outbox", metavar="DIR", help="Directory to write overdue notices to")
+    parser.add_argument("--stats", action="store_true", help="Collect per-operation latency stats from the start")
+    parser.add_argument("--render-cache", type=int, default=10_000, metavar="N",
+                        help="Item and user listings to keep rendered between menu choices (0 to disable)")
+    args = parser.parse_args()
+    main_menu(args.db, args.journal, args)
\ No newline at end of file
@@ -1,12 +1,15 @@
 # models/book.py
-from models.library_item import LibraryItem
+from models.library_item import LibraryItem, intern_field
 
 class Book(LibraryItem):
     """Represents a book, inheriting from LibraryItem."""
+    __slots__ = ("page_count", "edition", "isbn")
+    INTERNED_FIELDS = LibraryItem.INTERNED_FIELDS + ("edition",)
+
     def __init__(self, title, author_or_creator, publication_year, publisher, genre, page_count, edition, isbn):
         super().__init__(title, author_or_creator, publication_year, publisher, genre)
         self.page_count = page_count
-        self.edition = edition
+        self.edition = intern_field(edition)
         self.isbn = isbn
 
     def display_info(self):
@@ -1,19 +1,33 @@
 # models/library_item.py
 import itertools
+import sys
+
+
+def intern_field(value):
+    """Interns a low-cardinality string so every record holding that value shares one object."""
+    return sys.intern(value) if type(value) is str else value
+
 
 class LibraryItem:
     """Base class for all library items."""
+    __slots__ = ("item_id", "title", "author_or_creator", "publication_year", "publisher", "genre", "status")
     _id_counter = itertools.count(1)
+    INTERNED_FIELDS = ("publisher", "genre", "status")
 
     def __init__(self, title, author_or_creator, publication_year, publisher, genre):
         self.item_id = next(self._id_counter)
         self.title = title
         self.author_or_creator = author_or_creator
         self.publication_year = publication_year
-        self.publisher = publisher
-        self.genre = genre
+        self.publisher = intern_field(publisher)
+        self.genre = intern_field(genre)
         self.status = "Available"  # "Available", "Borrowed", "Lost"
 
+    def intern_fields(self):
+        """Re-interns the categorical fields, e.g. after they were set from user input or a file."""
+        for field in self.INTERNED_FIELDS:
+            setattr(self, field, intern_field(getattr(self, field)))
+
     def display_info(self):
         """Returns a string with the item's details."""
         return (f"ID: {self.item_id}\n"
@@ -4,6 +4,7 @@ from datetime import date, timedelta
 
 class Loan:
     """Represents a loan transaction."""
+    __slots__ = ("loan_id", "item_id", "user_id", "borrow_date", "due_date", "return_date", "fine_amount")
     _id_counter = itertools.count(1)
 
     def __init__(self, item_id, user_id):
@@ -15,9 +16,11 @@ class Loan:
         self.return_date = None
         self.fine_amount = 0.0
 
-    def calculate_fine(self, fine_per_day=1.0):
-        """Calculates fine if the item is returned late."""
+    def calculate_fine(self, fine_per_day=1.0, max_fine=None):
+        """Calculates fine if the item is returned late, capped at max_fine if one is given."""
         if self.return_date and self.return_date > self.due_date:
             days_overdue = (self.return_date - self.due_date).days
             self.fine_amount = days_overdue * fine_per_day
+            if max_fine is not None:
+                self.fine_amount = min(self.fine_amount, max_fine)
         return self.fine_amount
\ No newline at end of file
@@ -3,6 +3,8 @@ from models.library_item import LibraryItem
 
 class Magazine(LibraryItem):
     """Represents a magazine."""
+    __slots__ = ("issue_number", "publication_date")
+
     def __init__(self, title, author_or_creator, publication_year, publisher, genre, issue_number, publication_date):
         super().__init__(title, author_or_creator, publication_year, publisher, genre)
         self.issue_number = issue_number
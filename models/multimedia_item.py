@@ -1,11 +1,14 @@
 # models/multimedia_item.py
-from models.library_item import LibraryItem
+from models.library_item import LibraryItem, intern_field
 
 class MultimediaItem(LibraryItem):
     """Represents a multimedia item like a DVD or CD."""
+    __slots__ = ("media_type", "director_or_narrator", "duration_minutes")
+    INTERNED_FIELDS = LibraryItem.INTERNED_FIELDS + ("media_type",)
+
     def __init__(self, title, author_or_creator, publication_year, publisher, genre, media_type, director_or_narrator, duration_minutes):
         super().__init__(title, author_or_creator, publication_year, publisher, genre)
-        self.media_type = media_type
+        self.media_type = intern_field(media_type)
         self.director_or_narrator = director_or_narrator
         self.duration_minutes = duration_minutes
 
@@ -1,15 +1,61 @@
 # models/user.py
 import itertools
 
+
+class BorrowedItems:
+    """Compact set of borrowed item IDs: a tuple while small (the usual case), a set once it grows."""
+    __slots__ = ("_ids",)
+    SET_THRESHOLD = 8
+
+    def __init__(self, item_ids=()):
+        item_ids = tuple(dict.fromkeys(item_ids))
+        self._ids = set(item_ids) if len(item_ids) > self.SET_THRESHOLD else item_ids
+
+    def add(self, item_id):
+        if item_id in self._ids:
+            return
+        if type(self._ids) is set:
+            self._ids.add(item_id)
+        elif len(self._ids) >= self.SET_THRESHOLD:
+            self._ids = {*self._ids, item_id}
+        else:
+            self._ids += (item_id,)
+
+    def remove(self, item_id):
+        if item_id not in self._ids:
+            raise KeyError(item_id)
+        if type(self._ids) is set:
+            self._ids.remove(item_id)
+        else:
+            self._ids = tuple(i for i in self._ids if i != item_id)
+
+    def discard(self, item_id):
+        if item_id in self._ids:
+            self.remove(item_id)
+
+    def __contains__(self, item_id):
+        return item_id in self._ids
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __repr__(self):
+        return f"BorrowedItems({list(self._ids)})"
+
+
 class User:
     """Represents a library user."""
+    __slots__ = ("user_id", "name", "contact_info", "borrowed_items", "max_borrow_limit")
     _id_counter = itertools.count(1)
 
     def __init__(self, name, contact_info, max_borrow_limit=3):
         self.user_id = next(self._id_counter)
         self.name = name
         self.contact_info = contact_info
-        self.borrowed_items = []  # List of item_ids
+        self.borrowed_items = BorrowedItems()  # Set of item_ids
         self.max_borrow_limit = max_borrow_limit
 
     def display_info(self):
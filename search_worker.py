@@ -0,0 +1,97 @@
+# search_worker.py
+import queue
+import threading
+import tkinter as tk
+
+
+class SearchWorker:
+    """Runs GUI search queries on a background thread so typing never waits for a catalog scan.
+
+    Queries are grouped by key (e.g. "items", "users"): each new submission for a key restarts its debounce
+    delay and makes every older query for that key stale. Stale queries are skipped if they have not started
+    yet, and their results are dropped if they have.
+
+    The worker thread never calls into Tk: like StartupLoader, it puts its results on a queue that the Tk
+    thread polls with after(). Create the worker on the Tk thread.
+    """
+    POLL_MS = 20
+
+    def __init__(self, widget, delay_ms=250):
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self._generations = {}  # {key: number of the newest query}
+        self._timers = {}  # {key: after() id of a query still waiting out its delay}
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()  # (callback, args) for the Tk thread
+        self._poll_timer = self.widget.after(self.POLL_MS, self._poll)
+        self._thread = threading.Thread(target=self._run, name="search-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, query, on_result, delay_ms=None):
+        """Schedules query() to run once typing pauses, then calls on_result(result) on the Tk thread."""
+        generation = self.cancel(key)
+        delay_ms = self.delay_ms if delay_ms is None else delay_ms
+        self._timers[key] = self.widget.after(delay_ms, self._start, key, generation, query, on_result)
+
+    def cancel(self, key):
+        """Makes every submitted query for key stale. Returns the number the next query will carry."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            self.widget.after_cancel(timer)
+        self._generations[key] = self._generations.get(key, 0) + 1
+        return self._generations[key]
+
+    def close(self):
+        """Stops the worker thread and the polling; call from the Tk thread."""
+        self._jobs.put(None)
+        if self._poll_timer is not None:
+            try:
+                self.widget.after_cancel(self._poll_timer)
+            except tk.TclError:
+                pass  # The window is already gone.
+            self._poll_timer = None
+
+    def _is_current(self, key, generation):
+        return self._generations.get(key) == generation
+
+    def _start(self, key, generation, query, on_result):
+        self._timers.pop(key, None)
+        self._jobs.put((key, generation, query, on_result))
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            key, generation, query, on_result = job
+            if not self._is_current(key, generation):
+                continue  # Newer input arrived while this query was queued.
+            try:
+                result, error = query(), None
+            except Exception as e:
+                result, error = None, e
+            if self._is_current(key, generation):
+                self._post(self._deliver, key, generation, on_result, result, error)
+
+    def _post(self, callback, *args):
+        self._results.put((callback, args))
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    callback, args = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                callback(*args)
+        finally:
+            # Reschedule even if a callback raised, so one failed search does not stop the later ones.
+            if self._poll_timer is not None:
+                self._poll_timer = self.widget.after(self.POLL_MS, self._poll)
+
+    def _deliver(self, key, generation, on_result, result, error):
+        if not self._is_current(key, generation):
+            return
+        if error is not None:
+            raise error  # Reported by Tk like an exception in any other callback.
+        on_result(result)
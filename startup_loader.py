@@ -0,0 +1,100 @@
+# startup_loader.py
+import queue
+import threading
+import time
+
+
+class StartupLoader:
+    """Reads the library on a background thread after the window is up, handing it to the GUI in chunks.
+
+    Each stage has a key (e.g. "items") and a produce() generator run on the loader thread; every chunk it
+    yields is passed to on_chunk(chunk) on the Tk thread, so the lists fill in while the window stays
+    responsive. Stages run one after another. Cancelling a stage (because the user replaced that list
+    meanwhile) stops it and drops the chunks already on their way.
+
+    The loader thread never calls into Tk: it puts its results on a queue that the Tk thread polls with
+    after(), so nothing is lost if the thread gets ahead of mainloop.
+    """
+    POLL_MS = 20
+    POLL_BUDGET_S = 0.05  # Time spent handing over chunks per poll, so input events are not held up
+
+    def __init__(self, widget, on_done=None):
+        self.widget = widget
+        self.on_done = on_done
+        self._stages = []  # [(key, produce, on_chunk, on_finish)]
+        self._loading = set()  # Keys of the stages not yet finished or cancelled; changed on the Tk thread only
+        self._cancelled = set()
+        self._results = queue.Queue()  # (callback, args) for the Tk thread
+        self._running = False
+        self._thread = None
+
+    def add(self, key, produce, on_chunk, on_finish=None):
+        self._stages.append((key, produce, on_chunk, on_finish))
+        self._loading.add(key)
+
+    def start(self):
+        """Starts the loader thread and polling for its results; call from the Tk thread."""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="startup-loader", daemon=True)
+        self._thread.start()
+        self.widget.after(self.POLL_MS, self._poll)
+
+    def is_loading(self, key=None):
+        return key in self._loading if key is not None else bool(self._loading)
+
+    def cancel(self, key):
+        """Stops loading key; call from the Tk thread."""
+        if key in self._loading:
+            self._cancelled.add(key)
+            self._loading.discard(key)
+
+    def _run(self):
+        for key, produce, on_chunk, on_finish in self._stages:
+            if key in self._cancelled:
+                continue
+            try:
+                for chunk in produce():
+                    if key in self._cancelled:
+                        break
+                    self._post(self._deliver, key, on_chunk, chunk)
+            except Exception as e:
+                self._post(self._fail, key, e)
+                continue
+            self._post(self._finish, key, on_finish)
+        self._post(self._done)
+
+    def _post(self, callback, *args):
+        self._results.put((callback, args))
+
+    def _poll(self):
+        deadline = time.perf_counter() + self.POLL_BUDGET_S
+        try:
+            while self._running and time.perf_counter() < deadline:
+                try:
+                    callback, args = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                callback(*args)
+        finally:
+            # Reschedule even if a callback raised, so one failed stage does not strand the others.
+            if self._running:
+                self.widget.after(0 if not self._results.empty() else self.POLL_MS, self._poll)
+
+    def _deliver(self, key, on_chunk, chunk):
+        if key in self._loading:
+            on_chunk(chunk)
+
+    def _finish(self, key, on_finish):
+        if key in self._loading:
+            self._loading.discard(key)
+            if on_finish is not None:
+                on_finish()
+
+    def _fail(self, key, error):
+        self._loading.discard(key)
+        raise error  # Reported by Tk like an exception in any other callback.
+
+    def _done(self):
+        self._running = False
+        if self.on_done is not None:
+            self.on_done()
@@ -0,0 +1,66 @@
+# tests/test_active_loans.py
+import random
+
+import pytest
+
+from core.library_manager import LibraryManager
+from models.book import Book
+from models.user import User
+
+
+def assert_index_matches_loans(manager):
+    """The active-loan index agrees with a scan of the loan records for every item and user."""
+    open_loans = [loan for loan in manager.loans.values() if loan.return_date is None]
+    by_item = {loan.item_id: loan.loan_id for loan in open_loans}
+    for item_id in set(manager.items) | set(by_item):
+        loan = manager.find_active_loan(item_id)
+        assert (loan.loan_id if loan else None) == by_item.get(item_id)
+    for user_id in manager.users:
+        expected = sorted(loan.loan_id for loan in open_loans if loan.user_id == user_id)
+        assert sorted(loan.loan_id for loan in manager.active_loans_for_user(user_id)) == expected
+
+
+@pytest.mark.parametrize("thread_safe", [False, True], ids=["lazy", "thread_safe"])
+def test_index_follows_borrows_returns_and_deletes(thread_safe):
+    rng = random.Random(3)
+    manager = LibraryManager(thread_safe=thread_safe)
+    manager.add_items_bulk([Book(f"Book {i}", "Author", 2000, "Press", "Fiction", 100, "1st", f"isbn-{i}")
+                            for i in range(30)])
+    manager.add_users_bulk([User(f"User {i}", f"user{i}@example.com", 10) for i in range(4)])
+    user_ids = sorted(manager.users)
+    manager.borrow_item(user_ids[0], min(manager.items))  # Opened before the lazy index exists
+    for step in range(300):
+        user_id, item_id = rng.choice(user_ids), rng.choice(sorted(manager.items))
+        action = rng.random()
+        try:
+            if action < 0.4:
+                manager.borrow_item(user_id, item_id)
+            elif action < 0.7:
+                manager.return_item(user_id, item_id)
+            elif action < 0.8:
+                manager.borrow_items(user_id, rng.sample(sorted(manager.items), 3))
+            elif action < 0.9:
+                borrowed = sorted(manager.find_user(user_id).borrowed_items)
+                manager.return_items(user_id, borrowed[:2] + [item_id])
+            elif len(manager.items) > 10:
+                manager.delete_item(item_id)
+        except ValueError:
+            pass  # Refused operations must leave the index untouched as well.
+        if step % 25 == 0:
+            assert_index_matches_loans(manager)
+    assert_index_matches_loans(manager)
+
+
+def test_rebuilt_index_sees_loans_written_into_storage():
+    manager = LibraryManager(thread_safe=True)
+    book, user = Book("Dune", "Frank Herbert", 1965, "Chilton", "Sci-Fi", 412, "1st", "isbn"), User("Ada", "a@x")
+    manager.add_item(book)
+    manager.add_user(user)
+    manager.borrow_item(user.user_id, book.item_id)
+    loan = manager.find_active_loan(book.item_id)
+    del manager.loans[loan.loan_id]
+    manager.rebuild_indexes()
+    assert manager.find_active_loan(book.item_id) is None
+    manager.loans[loan.loan_id] = loan
+    manager.rebuild_indexes()
+    assert manager.find_active_loan(book.item_id) is loan
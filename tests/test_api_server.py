@@ -0,0 +1,115 @@
+# tests/test_api_server.py
+import asyncio
+import json
+import threading
+
+import pytest
+
+from api_server import LibraryApiServer
+from core.library_manager import LibraryManager
+from models.book import Book
+from models.user import User
+
+
+async def request(server, method, path, body=None):
+    """Sends one request on a new connection and returns (status, payload)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+                 + data)
+    await writer.drain()
+    response = await asyncio.wait_for(reader.read(), 10)
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def serve(manager, scenario):
+    async def run():
+        server = await LibraryApiServer(manager, port=0).start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def manager():
+    manager = LibraryManager()
+    manager.add_item(Book("Dune", "Frank Herbert", 1965, "Chilton", "Sci-Fi", 412, "1st", "isbn"))
+    manager.add_user(User("Ada", "ada@example.com"))
+    return manager
+
+
+def test_update_item_accepts_only_editable_typed_fields(manager):
+    item_id = min(manager.items)
+
+    async def scenario(server):
+        statuses = []
+        for body in ({"display_info": 1}, {"title": 123}, {"status": "Lost"}, {"item_id": item_id + 1},
+                     {"publication_year": "soon"}):
+            statuses.append((await request(server, "PUT", f"/items/{item_id}", body))[0])
+        ok = await request(server, "PUT", f"/items/{item_id}", {"item_id": item_id, "title": "Dune (Deluxe)"})
+        search = await request(server, "GET", "/items?title=deluxe")
+        return statuses, ok, search
+
+    statuses, ok, search = serve(manager, scenario)
+    assert statuses == [400] * 5
+    assert ok[0] == 200 and ok[1]["title"] == "Dune (Deluxe)"
+    assert search[0] == 200 and [item["item_id"] for item in search[1]["items"]] == [item_id]
+
+
+def test_update_user_accepts_only_editable_typed_fields(manager):
+    user_id = min(manager.users)
+
+    async def scenario(server):
+        statuses = []
+        for body in ({"name": 5}, {"borrowed_items": [1]}, {"max_borrow_limit": "many"}, {"unknown": "x"}):
+            statuses.append((await request(server, "PUT", f"/users/{user_id}", body))[0])
+        ok = await request(server, "PUT", f"/users/{user_id}", {"name": "Ada L.", "max_borrow_limit": 5})
+        return statuses, ok
+
+    statuses, ok = serve(manager, scenario)
+    assert statuses == [400] * 4
+    assert ok[0] == 200 and (ok[1]["name"], ok[1]["max_borrow_limit"]) == ("Ada L.", 5)
+
+
+def test_listings_are_paged_by_default_with_a_capped_limit():
+    manager = LibraryManager()
+    for number in range(250):
+        manager.add_item(Book(f"Title {number}", "Author", 2000, "Pub", "Genre", 100, "1st", f"isbn-{number}"))
+
+    async def scenario(server):
+        first = await request(server, "GET", "/items")
+        capped = await request(server, "GET", "/items?limit=5000")
+        rest = await request(server, "GET", f"/items?cursor={first[1]['next_cursor']}")
+        users = await request(server, "GET", "/users")
+        return first[1], capped[1], rest[1], users[1]
+
+    first, capped, rest, users = serve(manager, scenario)
+    assert len(first["items"]) == 100 and first["next_cursor"] == first["items"][-1]["item_id"]
+    assert len(capped["items"]) == 250 and capped["next_cursor"] is None
+    assert [item["item_id"] for item in first["items"] + rest["items"]] == sorted(manager.items)[:200]
+    assert users == {"users": [], "next_cursor": None}
+
+
+def test_slow_handler_does_not_block_other_connections():
+    manager = LibraryManager(thread_safe=True)
+    release = threading.Event()
+    user_page = manager.user_page
+
+    def slow_user_page(*args):
+        release.wait(10)
+        return user_page(*args)
+
+    manager.user_page = slow_user_page
+
+    async def scenario(server):
+        slow = asyncio.ensure_future(request(server, "GET", "/users"))
+        health = await asyncio.wait_for(request(server, "GET", "/health"), 5)
+        release.set()
+        return health, await slow
+
+    health, slow = serve(manager, scenario)
+    assert health[0] == 200 and slow[0] == 200
@@ -0,0 +1,80 @@
+# tests/test_batch.py
+import pytest
+
+from core.library_manager import LibraryManager
+from core.storage import SQLiteStorage
+from models.book import Book
+from models.user import User
+
+
+@pytest.fixture
+def library(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "library.db"), batch_size=3)
+    manager = LibraryManager(storage=storage)
+    books = [Book(f"Book {i}", "Author", 2000, "Press", "Fiction", 100, "1st", f"isbn-{i}") for i in range(4)]
+    for book in books:
+        manager.add_item(book)
+    user = User("Ada", "ada@example.com", 10)
+    manager.add_user(user)
+    yield manager, storage, [book.item_id for book in books], user.user_id
+    manager.close()
+
+
+def fail_on_write(monkeypatch, storage, nth):
+    """Makes the nth storage write from now on raise, as a full disk would."""
+    write, calls = storage.write, [0]
+
+    def failing_write(query, params):
+        calls[0] += 1
+        if calls[0] == nth:
+            raise OSError("disk full")
+        return write(query, params)
+
+    monkeypatch.setattr(storage, "write", failing_write)
+
+
+def test_borrow_batch_rolls_back(library, monkeypatch):
+    manager, storage, item_ids, user_id = library
+    loans_before = len(manager.loans)
+    fail_on_write(monkeypatch, storage, 4)
+    with pytest.raises(OSError):
+        manager.borrow_items(user_id, item_ids)
+    monkeypatch.undo()
+
+    assert [manager.find_item(item_id).status for item_id in item_ids] == ["Available"] * 4
+    assert list(manager.find_user(user_id).borrowed_items) == []
+    assert len(manager.loans) == loans_before
+    assert manager.active_loans_for_user(user_id) == []
+    assert manager.borrow_items(user_id, item_ids[:2])
+
+
+def test_return_batch_rolls_back(library, monkeypatch):
+    manager, storage, item_ids, user_id = library
+    assert manager.borrow_items(user_id, item_ids)
+    fail_on_write(monkeypatch, storage, 5)
+    with pytest.raises(OSError):
+        manager.return_items(user_id, item_ids)
+    monkeypatch.undo()
+
+    assert [manager.find_item(item_id).status for item_id in item_ids] == ["Borrowed"] * 4
+    assert sorted(manager.find_user(user_id).borrowed_items) == item_ids
+    assert all(manager.find_active_loan(item_id).return_date is None for item_id in item_ids)
+    assert manager.return_items(user_id, item_ids)
+
+
+def test_rollback_keeps_earlier_uncommitted_writes(tmp_path, monkeypatch):
+    path = str(tmp_path / "library.db")
+    manager = LibraryManager(storage=SQLiteStorage(path, batch_size=100))
+    book, user = Book("Kept", "Author", 2000, "Press", "Fiction", 1, "1st", "isbn"), User("Ada", "", 3)
+    manager.add_item(book)
+    manager.add_user(user)
+    fail_on_write(monkeypatch, manager.storage, 2)
+    with pytest.raises(OSError):
+        manager.borrow_items(user.user_id, [book.item_id])
+    monkeypatch.undo()
+    manager.close()
+
+    storage = SQLiteStorage(path)
+    assert storage.items[book.item_id].status == "Available"
+    assert user.user_id in storage.users
+    storage.close()
@@ -0,0 +1,24 @@
+# tests/test_bulk_io.py
+import json
+
+from core.bulk_io import import_items
+from core.library_manager import LibraryManager
+
+
+def book(title):
+    return {"type": "book", "title": title, "author_or_creator": "Author", "publication_year": 2001,
+            "publisher": "Press", "genre": "Fiction", "page_count": 100, "edition": "1st", "isbn": "isbn"}
+
+
+def test_malformed_jsonl_lines_are_reported_and_skipped(tmp_path):
+    path = tmp_path / "items.jsonl"
+    lines = [json.dumps(book("First")), '{"type": "book", "title": ', "", "[1, 2]", json.dumps(book("Last"))]
+    path.write_bytes("\n".join(lines).encode() + b"\n\xff\xfe\n")
+    manager = LibraryManager()
+
+    report = import_items(manager, str(path), chunk_size=2)
+
+    assert report.added == 2
+    assert sorted(item.title for item in manager.items.values()) == ["First", "Last"]
+    assert [message.split(" is ")[0] for _, message in report.errors] == [
+        "❌ Error: Line 2", "❌ Error: Line 4", "❌ Error: Line 6"]
@@ -0,0 +1,77 @@
+# tests/test_catalog.py
+import random
+
+import pytest
+
+from benchmarks.synthetic import FIRST_NAMES, GENRES, WORDS, make_item
+from core.catalog import ItemQuery
+from core.library_manager import LibraryManager
+from models.user import User
+
+
+def brute_force(manager, title=None, genre=None, year_from=None, year_to=None, author=None, item_type=None,
+                status=None):
+    """Item IDs matching the criteria, worked out field by field over every item."""
+    def keep(item):
+        return ((title is None or title.lower() in item.title.lower())
+                and (genre is None or item.genre.lower() == genre.lower())
+                and (year_from is None or item.publication_year >= year_from)
+                and (year_to is None or item.publication_year <= year_to)
+                and (author is None or item.author_or_creator.lower().startswith(author.lower()))
+                and (item_type is None or type(item).__name__ == item_type)
+                and (status is None or item.status.lower() == status.lower()))
+    return sorted(item_id for item_id, item in manager.items.items() if keep(item))
+
+
+def random_criteria(rng):
+    choices = {"title": lambda: rng.choice(WORDS)[:rng.randint(2, 5)], "genre": lambda: rng.choice(GENRES).upper(),
+               "year_from": lambda: rng.randint(1900, 2024), "year_to": lambda: rng.randint(1950, 2030),
+               "author": lambda: rng.choice(FIRST_NAMES)[:rng.randint(1, 4)].lower(),
+               "item_type": lambda: rng.choice(("Book", "Magazine", "MultimediaItem")),
+               "status": lambda: rng.choice(("available", "Borrowed"))}
+    criteria = {name: make() for name, make in rng.sample(sorted(choices.items()), rng.randint(1, 4))}
+    if criteria.get("year_from", 0) > criteria.get("year_to", 9999):
+        criteria["year_from"], criteria["year_to"] = criteria["year_to"], criteria["year_from"]
+    return criteria
+
+
+def query_for(criteria):
+    criteria = dict(criteria)
+    criteria["author_prefix"] = criteria.pop("author", None)
+    return ItemQuery(**criteria)
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_planned_queries_match_a_brute_force_filter(seed):
+    rng = random.Random(seed)
+    manager = LibraryManager()
+    manager.add_items_bulk([make_item(rng) for _ in range(600)])
+    user = User("Ada", "ada@example.com", 100)
+    manager.add_user(user)
+    manager.borrow_items(user.user_id, rng.sample(sorted(manager.items), 60))
+
+    for step in range(300):
+        criteria = random_criteria(rng)
+        assert manager.query_item_ids(query_for(criteria)) == brute_force(manager, **criteria), criteria
+        if step % 20 == 0:  # The indexes must follow changes made after they were built.
+            item_id = rng.choice(sorted(manager.items))
+            item = manager.find_item(item_id)
+            if item.status == "Borrowed":
+                manager.return_item(user.user_id, item_id)
+            else:
+                manager.update_item(item_id, genre=rng.choice(GENRES), publication_year=rng.randint(1900, 2024),
+                                    author_or_creator=f"{rng.choice(FIRST_NAMES)} Zed")
+                if step % 40 == 0:
+                    manager.delete_item(item_id)
+            manager.add_item(make_item(rng))
+
+
+def test_empty_and_invalid_queries():
+    manager = LibraryManager()
+    rng = random.Random(3)
+    manager.add_items_bulk([make_item(rng) for _ in range(20)])
+    assert manager.query_item_ids(ItemQuery()) == sorted(manager.items)
+    assert manager.query_items(genre="no such genre") == []
+    for bad in ({"item_type": "Scroll"}, {"year_from": "soon"}, {"year_from": 2010, "year_to": 2000}):
+        with pytest.raises(ValueError):
+            ItemQuery(**bad)
@@ -0,0 +1,82 @@
+# tests/test_events.py
+import threading
+
+from core.events import (Event, EventBus, ItemAdded, ItemDeleted, ItemUpdated, LoanClosed, LoanOpened, LoansOpened,
+                         UserAdded)
+from core.library_manager import LibraryManager
+from models.book import Book
+from models.user import User
+
+
+def make_book(title="Dune"):
+    return Book(title, "Frank Herbert", 1965, "Chilton", "Sci-Fi", 412, "1st", "isbn")
+
+
+def test_operations_publish_their_events_in_order(capsys):
+    manager = LibraryManager()
+    events = []
+    manager.events.subscribe(events.append)
+    book, other, user = make_book(), make_book("Emma"), User("Ada", "ada@example.com")
+    manager.add_item(book)
+    manager.add_item(other)
+    manager.add_user(user)
+    manager.update_item(book.item_id, title="Dune Messiah")
+    manager.borrow_item(user.user_id, book.item_id)
+    manager.return_item(user.user_id, book.item_id)
+    manager.borrow_items(user.user_id, [other.item_id])
+    manager.delete_item(book.item_id)
+
+    assert [type(event) for event in events] == [ItemAdded, ItemAdded, UserAdded, ItemUpdated, LoanOpened,
+                                                 LoanClosed, LoansOpened, ItemDeleted]
+    assert events[4].loan.item_id == book.item_id and events[4].user is user
+    assert all(event.message() for event in events)
+    assert capsys.readouterr().out == ""  # The manager itself prints nothing.
+
+
+def test_subscribers_get_only_their_types_until_unsubscribed():
+    bus = EventBus()
+    loans, everything = [], []
+    bus.subscribe(loans.append, LoanOpened, LoanClosed)
+    bus.publish(ItemAdded, make_book())
+    bus.subscribe(everything.append)  # Subscribing after a publish of the same type still takes effect.
+    bus.publish(ItemAdded, make_book())
+    bus.publish(LoanOpened, None, None, None)
+    bus.unsubscribe(loans.append)
+    bus.publish(LoanClosed, None, None, None)
+
+    assert [type(event) for event in loans] == [LoanOpened]
+    assert [type(event) for event in everything] == [ItemAdded, LoanOpened, LoanClosed]
+
+
+def test_no_event_is_built_without_subscribers():
+    built = []
+
+    class Probe(Event):
+        def __init__(self):
+            built.append(self)
+
+    bus = EventBus()
+    bus.publish(Probe)
+    assert built == []
+    bus.subscribe(lambda event: None, Probe)
+    bus.publish(Probe)
+    assert len(built) == 1
+
+
+def test_events_are_published_after_the_locks_are_released():
+    manager = LibraryManager(thread_safe=True)
+    book, user = make_book(), User("Ada", "ada@example.com")
+    manager.add_item(book)
+    manager.add_user(user)
+    seen = []
+
+    def return_from_another_thread(event):
+        # Another thread needs the same user and item stripes, so it only gets through if they are free.
+        other = threading.Thread(target=manager.return_item, args=(event.user.user_id, event.item.item_id))
+        other.start()
+        other.join(5)
+        seen.append(not other.is_alive())
+
+    manager.events.subscribe(return_from_another_thread, LoanOpened)
+    manager.borrow_item(user.user_id, book.item_id)
+    assert seen == [True] and manager.find_item(book.item_id).status == "Available"
@@ -0,0 +1,84 @@
+# tests/test_fines.py
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from core import fines
+from core.fines import FineEngine
+from core.library_manager import LibraryManager
+from models.book import Book
+from models.loan import Loan
+from models.user import User
+
+TODAY = date(2026, 3, 1)
+
+
+def build_library(seed=7):
+    """A library with open and returned loans due on either side of TODAY."""
+    rng = random.Random(seed)
+    manager = LibraryManager()
+    users = [User(f"User {i}", f"user{i}@example.com", 50) for i in range(5)]
+    manager.add_users_bulk(users)
+    for i in range(60):
+        loan = Loan(i + 1, rng.choice(users).user_id)
+        loan.due_date = TODAY + timedelta(days=rng.randint(-30, 10))
+        if rng.random() < 0.4:
+            loan.return_date = loan.due_date + timedelta(days=rng.randint(-5, 15))
+            loan.calculate_fine(0.5, 5.0)
+        manager.loans[loan.loan_id] = loan
+    return manager, users
+
+
+def expected(manager, fine_per_day=0.5, max_fine_per_loan=5.0, max_fine_per_user=12.0):
+    """Fines worked out loan by loan, as the engine's rules describe them."""
+    fines_by_loan, overdue, totals = {}, [], {}
+    for loan in manager.loans.values():
+        if loan.return_date:
+            fine = loan.fine_amount
+        else:
+            days = max((TODAY - loan.due_date).days, 0)
+            fine = min(days * fine_per_day, max_fine_per_loan)
+            if days:
+                overdue.append(loan.loan_id)
+        fines_by_loan[loan.loan_id] = fine
+        if fine > 0:
+            totals[loan.user_id] = totals.get(loan.user_id, 0.0) + fine
+    totals = {user_id: min(total, max_fine_per_user) for user_id, total in totals.items()}
+    return fines_by_loan, sorted(overdue), totals
+
+
+def results(manager, engine):
+    fines_by_loan = {loan_id: engine.fine_for(loan_id, TODAY) for loan_id in manager.loans}
+    return fines_by_loan, sorted(engine.overdue_loan_ids(TODAY)), engine.totals_by_user(TODAY)
+
+
+def run_engine(with_numpy, monkeypatch):
+    """Results for the whole table, then again after two loans are opened and one of them returned."""
+    if not with_numpy:
+        monkeypatch.setattr(fines, "np", None)
+    manager, users = build_library()
+    engine = FineEngine(manager, 0.5, 5.0, 12.0)
+    before = results(manager, engine)
+    books = [Book(f"Book {i}", "Author", 2000, "Press", "Fiction", 100, "1st", "isbn") for i in range(2)]
+    for book in books:
+        manager.add_item(book)
+        manager.borrow_item(users[0].user_id, book.item_id)
+    manager.return_item(users[0].user_id, books[0].item_id)
+    after = results(manager, engine)
+    monkeypatch.undo()
+    return manager, before, after
+
+
+@pytest.mark.parametrize("with_numpy", [False, True], ids=["array", "numpy"])
+def test_engine_matches_loan_by_loan_fines(with_numpy, monkeypatch):
+    if with_numpy:
+        pytest.importorskip("numpy")
+    manager, before, after = run_engine(with_numpy, monkeypatch)
+    assert after == expected(manager)
+    assert len(after[0]) == len(before[0]) + 2 and after[1] and after[2]
+
+
+def test_numpy_and_array_paths_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    assert run_engine(True, monkeypatch)[1:] == run_engine(False, monkeypatch)[1:]
@@ -0,0 +1,71 @@
+# tests/test_fuzzy.py
+import random
+
+from benchmarks.synthetic import make_item
+from core.fuzzy import FuzzyIndex, allowed_edits, bounded_edit_distance
+from core.library_manager import LibraryManager
+from models.book import Book
+
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, start=1):
+        current = [i]
+        for j, other in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        previous = current
+    return previous[-1]
+
+
+def typo(rng, word):
+    """word with one random insertion, deletion or substitution."""
+    position = rng.randrange(len(word))
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return rng.choice((word[:position] + letter + word[position:], word[:position] + word[position + 1:],
+                       word[:position] + letter + word[position + 1:]))
+
+
+def test_bounded_distance_agrees_with_levenshtein_within_the_limit():
+    rng = random.Random(1)
+    for _ in range(2000):
+        a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 9)))
+        b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 9)))
+        limit = rng.randint(0, 3)
+        distance = levenshtein(a, b)
+        assert bounded_edit_distance(a, b, limit) == (distance if distance <= limit else None), (a, b, limit)
+
+
+def test_similar_words_are_exactly_the_words_within_the_allowed_edits():
+    rng = random.Random(2)
+    manager = LibraryManager()
+    manager.add_items_bulk([make_item(rng) for _ in range(300)])
+    index = FuzzyIndex()
+    for item in manager.items.values():
+        index.add(item)
+    vocabulary = {word for item in manager.items.values() for word in index._item_words(item)}
+    queries = [typo(rng, word) for word in rng.sample(sorted(vocabulary), 40)] + ["sea", "seas", "histroy", "x"]
+    for query in queries:
+        limit = allowed_edits(query)
+        expected = {word: levenshtein(query, word) for word in vocabulary if levenshtein(query, word) <= limit}
+        assert index.similar_words(query) == expected, query
+    assert [allowed_edits(word) for word in ("cat", "star", "kingdom", "mountains")] == [0, 1, 1, 2]
+
+
+def test_search_ranks_and_bounds_its_scores():
+    manager = LibraryManager()
+    titles = ["Silent Ocean", "Silent Garden", "Golden Ocean", "Ocean", "Broken Glass"]
+    books = [Book(title, "Alice Wonder", 2000, "Press", "Fiction", 100, "1st", "isbn") for title in titles]
+    manager.add_items_bulk(books)
+
+    results = manager.fuzzy_search("silant ocaan", limit=3)
+    assert [item.title for item, _ in results] == ["Silent Ocean", "Silent Garden", "Golden Ocean"]
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True) and all(0 < score < 1 for score in scores)
+    assert manager.fuzzy_search("silent ocean")[0] == (books[0], 1.0)
+    assert manager.fuzzy_search("wonder", limit=2) == [(books[0], 1.0), (books[1], 1.0)]  # Ties: lower ID first
+    assert manager.fuzzy_search("zzzz") == [] and manager.fuzzy_search("  ") == []
+
+    manager.update_item(books[0].item_id, title="Quiet Sea")
+    manager.delete_item(books[2].item_id)
+    assert [item.title for item, _ in manager.fuzzy_search("ocean")] == ["Ocean"]
+    assert manager.fuzzy_search("quiet")[0][0] is books[0]
@@ -0,0 +1,85 @@
+# tests/test_ledger.py
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from core.library_manager import LibraryManager
+from models.book import Book
+from models.user import User
+
+
+def circulate(manager, steps, seed=11):
+    """Random borrows and returns, single and batched, among a few users and items."""
+    rng = random.Random(seed)
+    user_ids, item_ids = sorted(manager.users), sorted(manager.items)
+    for _ in range(steps):
+        user_id = rng.choice(user_ids)
+        try:
+            if rng.random() < 0.5:
+                manager.borrow_items(user_id, rng.sample(item_ids, rng.randint(1, 2)))
+            else:
+                borrowed = sorted(manager.find_user(user_id).borrowed_items)
+                if borrowed:
+                    manager.return_item(user_id, rng.choice(borrowed))
+        except ValueError:
+            pass
+
+
+def build_library(build_ledger_first):
+    manager = LibraryManager()
+    manager.add_items_bulk([Book(f"Book {i}", "Author", 2000, "Press", "Fiction", 100, "1st", f"isbn-{i}")
+                            for i in range(8)])
+    manager.add_users_bulk([User(f"User {i}", f"user{i}@example.com", 5) for i in range(3)])
+    if build_ledger_first:
+        manager.loan_ids()  # The ledger then follows every loan below as it happens.
+    circulate(manager, 200)
+    # Loans past due (the loan objects are shared with the ledger, as in any in-memory library).
+    for loan in list(manager.loans.values())[::3]:
+        loan.due_date = date.today() - timedelta(days=1)
+    return manager
+
+
+def expected_ids(manager, status=None, user_id=None, item_id=None):
+    today = date.today()
+    return sorted(loan.loan_id for loan in manager.loans.values()
+                  if (user_id is None or loan.user_id == user_id) and (item_id is None or loan.item_id == item_id)
+                  and (status is None or loan.return_date is None)
+                  and (status != "overdue" or loan.due_date < today))
+
+
+@pytest.mark.parametrize("build_ledger_first", [False, True], ids=["built_after", "followed"])
+def test_loan_ids_and_pages_match_a_sorted_scan(build_ledger_first):
+    manager = build_library(build_ledger_first)
+    filters = [{}] + [{"user_id": user_id} for user_id in manager.users] + [
+        {"item_id": item_id} for item_id in list(manager.items)[:3]] + [
+        {"user_id": min(manager.users), "item_id": min(manager.items)}]
+    for status in (None, "open", "overdue"):
+        for criteria in filters:
+            expected = expected_ids(manager, status, **criteria)
+            assert manager.loan_ids(status, **criteria) == expected
+            paged, cursor = [], None
+            while True:
+                entries, cursor = manager.loan_page(cursor, 7, status, **criteria)
+                paged.extend(entry.loan.loan_id for entry in entries)
+                if cursor is None:
+                    break
+            assert paged == expected[::-1]
+    assert expected_ids(manager, "overdue") and expected_ids(manager, "open") != expected_ids(manager)
+
+
+def test_entries_follow_renames_and_deletes():
+    manager = build_library(build_ledger_first=True)
+    user_id, item_id = sorted(manager.users)[0], sorted(manager.items)[0]
+    for borrowed_id in list(manager.find_user(user_id).borrowed_items):
+        manager.return_item(user_id, borrowed_id)
+    manager.update_item(item_id, title="Renamed")
+    manager.delete_user(user_id)
+    entries, _ = manager.loan_page(limit=len(manager.loans))
+    for entry in entries:
+        assert entry.item_title == manager.find_item(entry.loan.item_id).title
+        assert entry.user_name == (f"Deleted User (ID: {user_id})" if entry.loan.user_id == user_id
+                                   else manager.find_user(entry.loan.user_id).name)
+    assert "Renamed" in {entry.item_title for entry in entries}
+    with pytest.raises(ValueError):
+        manager.loan_ids("late")
@@ -0,0 +1,81 @@
+# tests/test_loan_history.py
+import random
+
+import pytest
+
+from core.library_manager import LibraryManager
+from models.book import Book
+from models.user import User
+
+
+def build_library(seed=5):
+    """A few users borrowing and returning a few items many times over, so most pairs repeat."""
+    rng = random.Random(seed)
+    manager = LibraryManager()
+    manager.add_items_bulk([Book(f"Book {i}", "Author", 2000, "Press", "Fiction", 100, "1st", f"isbn-{i}")
+                            for i in range(6)])
+    manager.add_users_bulk([User(f"User {i}", f"user{i}@example.com", 3) for i in range(3)])
+    user_ids, item_ids = sorted(manager.users), sorted(manager.items)
+    for step in range(150):
+        if step == 75:
+            manager.user_history(user_ids[0])  # The history indexes then follow the rest as it happens.
+        user_id, item_id = rng.choice(user_ids), rng.choice(item_ids)
+        try:
+            if item_id in manager.find_user(user_id).borrowed_items:
+                manager.return_item(user_id, item_id)
+            else:
+                manager.borrow_item(user_id, item_id)
+        except ValueError:
+            pass
+    return manager
+
+
+def all_pages(fetch, record_id):
+    loan_ids, cursor = [], None
+    while True:
+        entries, cursor = fetch(record_id, cursor, 4)
+        loan_ids.extend(entry.loan.loan_id for entry in entries)
+        if cursor is None:
+            return loan_ids
+
+
+def counts(loans, key):
+    result = {}
+    for loan in loans:
+        result[key(loan)] = result.get(key(loan), 0) + 1
+    return result
+
+
+def test_histories_match_a_scan_of_the_loans():
+    manager = build_library()
+    loans = sorted(manager.loans.values(), key=lambda loan: loan.loan_id, reverse=True)
+    for user_id in manager.users:
+        mine = [loan for loan in loans if loan.user_id == user_id]
+        assert all_pages(manager.user_history, user_id) == [loan.loan_id for loan in mine]
+        by_item = counts(mine, lambda loan: loan.item_id)
+        assert manager.repeat_borrows(user_id=user_id) == {item: n for item, n in by_item.items() if n >= 2}
+        assert manager.repeat_borrows(user_id=user_id, min_count=1) == by_item
+        for item_id in manager.items:
+            assert manager.borrow_count(user_id, item_id) == by_item.get(item_id, 0)
+    for item_id in manager.items:
+        theirs = [loan for loan in loans if loan.item_id == item_id]
+        assert all_pages(manager.item_history, item_id) == [loan.loan_id for loan in theirs]
+        by_user = counts(theirs, lambda loan: loan.user_id)
+        assert manager.repeat_borrows(item_id=item_id, min_count=3) == {user: n for user, n in by_user.items()
+                                                                         if n >= 3}
+        assert manager.last_loan(item_id).loan is theirs[0]
+        assert manager.last_borrower(item_id) is manager.find_user(theirs[0].user_id)
+    assert any(manager.repeat_borrows(user_id=user_id) for user_id in manager.users)
+
+
+def test_items_never_borrowed_and_bad_queries():
+    manager = build_library()
+    book = Book("Unread", "Author", 2000, "Press", "Fiction", 100, "1st", "isbn")
+    manager.add_item(book)
+    assert manager.last_loan(book.item_id) is None and manager.last_borrower(book.item_id) is None
+    assert manager.item_history(book.item_id) == ([], None)
+    assert manager.repeat_borrows(item_id=book.item_id) == {}
+    with pytest.raises(ValueError):
+        manager.repeat_borrows()
+    with pytest.raises(ValueError):
+        manager.repeat_borrows(user_id=1, item_id=1)
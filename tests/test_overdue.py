@@ -0,0 +1,77 @@
+# tests/test_overdue.py
+import json
+import random
+from datetime import date, timedelta
+
+from core.events import LoansOverdue
+from core.library_manager import LibraryManager
+from core.overdue import OutboxNotifier, OverdueScheduler
+from models.book import Book
+from models.user import User
+
+START = date.today()
+
+
+def build_library(n_loans=40, seed=9):
+    """Open loans due over the coming three weeks; a few are returned before they fall due."""
+    rng = random.Random(seed)
+    manager = LibraryManager()
+    manager.add_items_bulk([Book(f"Book {i}", "Author", 2000, "Press", "Fiction", 100, "1st", f"isbn-{i}")
+                            for i in range(n_loans)])
+    user = User("Ada", "ada@example.com", n_loans)
+    manager.add_user(user)
+    manager.borrow_items(user.user_id, sorted(manager.items))
+    for loan in manager.loans.values():
+        loan.due_date = START + timedelta(days=rng.randint(0, 20))
+    return manager, user
+
+
+def notified_ids(outbox):
+    return [json.loads(line)["loan_id"] for path in sorted(outbox.glob("notices-*.jsonl"))
+            for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_ticks_report_each_loan_once_in_due_date_order():
+    manager, user = build_library()
+    scheduler = OverdueScheduler(manager)
+    published = []
+    manager.events.subscribe(published.append, LoansOverdue)
+    returned = sorted(manager.items)[:5]
+    manager.return_items(user.user_id, returned)
+    extra = Book("Late", "Author", 2000, "Press", "Fiction", 100, "1st", "isbn")
+    manager.add_item(extra)
+    manager.borrow_item(user.user_id, extra.item_id)  # Opened after the scheduler: due in 14 days
+
+    reported = []
+    for offset in range(0, 25, 3):
+        today = START + timedelta(days=offset)
+        loans = scheduler.tick(today)
+        assert [(loan.due_date, loan.loan_id) for loan in loans] == sorted(
+            (loan.due_date, loan.loan_id) for loan in loans)
+        assert all(loan.due_date < today and loan.return_date is None for loan in loans)
+        reported.extend(loan.loan_id for loan in loans)
+
+    expected = sorted(loan.loan_id for loan in manager.loans.values() if loan.return_date is None)
+    assert sorted(reported) == expected and len(reported) == len(set(reported))
+    assert [loan.loan_id for event in published for loan in event.loans] == reported
+    assert len(scheduler) == 0
+
+
+def test_outbox_never_sends_a_notice_twice_across_restarts(tmp_path):
+    outbox = tmp_path / "outbox"
+    manager, _ = build_library()
+    day = START + timedelta(days=8)
+    scheduler = OverdueScheduler(manager, OutboxNotifier(str(outbox), batch_size=4))
+    first = scheduler.tick(day)
+    assert len(list(outbox.glob("notices-*.jsonl"))) == -(-len(first) // 4)
+    assert scheduler.tick(day) == []
+
+    # A restart the same day and the day after reports only the loans that have fallen due since.
+    for restart_day in (day, day + timedelta(days=5)):
+        scheduler.close()
+        scheduler = OverdueScheduler(manager, OutboxNotifier(str(outbox)))
+        scheduler.tick(restart_day)
+
+    overdue = sorted(loan.loan_id for loan in manager.loans.values() if loan.due_date < day + timedelta(days=5))
+    assert first and sorted(notified_ids(outbox)) == overdue
+    assert not list(outbox.glob("*.tmp"))
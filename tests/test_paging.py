@@ -0,0 +1,74 @@
+# tests/test_paging.py
+import random
+
+import pytest
+
+from benchmarks.synthetic import make_item, make_user
+from core.catalog import ItemQuery
+from core.library_manager import LibraryManager
+from core.snapshot import SnapshotStorage
+from core.storage import SQLiteStorage
+
+STORAGES = {
+    "memory": lambda tmp_path: None,
+    "sqlite": lambda tmp_path: SQLiteStorage(str(tmp_path / "library.db")),
+    "snapshot": lambda tmp_path: SnapshotStorage(str(tmp_path / "library.snap")),
+}
+
+
+def walk(manager, page, rng, query=None):
+    """Pages through with a small limit, adding and deleting items between pages.
+
+    Returns (the IDs listed, the IDs present for the whole walk, the IDs that were there at some point).
+    """
+    listed, cursor = [], None
+    start = set(manager.items)
+    deleted, added = set(), set()
+    while True:
+        records, cursor = page(cursor, 7, query)
+        listed.extend(record.item_id for record in records)
+        for item_id in rng.sample(sorted(manager.items), 3):
+            manager.delete_item(item_id)
+            deleted.add(item_id)
+        for _ in range(2):
+            item = make_item(rng)
+            manager.add_item(item)
+            added.add(item.item_id)
+        if cursor is None:
+            return listed, start - deleted, start | added
+
+
+@pytest.mark.parametrize("storage", sorted(STORAGES))
+@pytest.mark.parametrize("indexed", [False, True], ids=["scan", "indexed"])
+def test_item_pages_have_no_gaps_or_duplicates(storage, indexed, tmp_path):
+    rng = random.Random(4)
+    manager = LibraryManager(storage=STORAGES[storage](tmp_path))
+    manager.add_items_bulk([make_item(rng) for _ in range(150)])
+    for query in (None, ItemQuery(item_type="Book"), ItemQuery(title="an", year_from=1950)):
+        if indexed and query is not None:
+            manager.query_item_ids(query)  # Builds the catalog and title indexes, which pages then start from.
+        listed, kept, seen = walk(manager, manager.item_page, rng, query)
+        assert listed == sorted(set(listed))
+        assert set(listed) <= seen
+        matching = {item_id for item_id in kept if query is None or query.matches(manager.find_item(item_id))}
+        assert matching <= set(listed)
+        assert all(query is None or query.matches(manager.find_item(item_id))
+                   for item_id in listed if item_id in manager.items)
+    manager.close()
+
+
+def test_user_pages_and_iterators_cover_every_user():
+    rng = random.Random(6)
+    manager = LibraryManager()
+    manager.add_users_bulk([make_user(rng) for _ in range(120)])
+    listed, cursor = [], None
+    while True:
+        users, cursor = manager.user_page(cursor, 11)
+        listed.extend(user.user_id for user in users)
+        if cursor is None:
+            break
+    assert listed == sorted(manager.users)
+    assert [user.user_id for user in manager.iter_users(page_size=13)] == sorted(manager.users)
+    name = manager.find_user(listed[5]).name.split()[0]
+    assert [user.user_id for user in manager.iter_users(name, page_size=4)] == manager.user_ids(name)
+    assert manager.user_page(max(manager.users)) == ([], None)
@@ -0,0 +1,56 @@
+# tests/test_render_cache.py
+from core.library_manager import LibraryManager
+from models.book import Book
+from models.user import User
+
+
+def build_library():
+    manager = LibraryManager()
+    books = [Book(f"Book {i}", "Author", 2000, "Press", "Fiction", 100, "1st", f"isbn-{i}") for i in range(4)]
+    manager.add_items_bulk(books)
+    user = User("Ada", "ada@example.com", 5)
+    manager.add_user(user)
+    return manager, books, user
+
+
+def assert_renders_current(manager):
+    for item in manager.items.values():
+        assert manager.render_item(item) == item.display_info()
+    for user in manager.users.values():
+        assert manager.render_user(user) == user.display_info()
+
+
+def test_renders_follow_updates_and_status_changes():
+    manager, books, user = build_library()
+    manager.enable_stats()
+    assert_renders_current(manager)
+    assert_renders_current(manager)  # Served from the cache
+    assert manager.stats.counters["render_cache.hit"] == 5
+
+    manager.update_item(books[0].item_id, title="Renamed")
+    manager.update_user(user.user_id, name="Ada L.")
+    assert_renders_current(manager)
+    manager.borrow_item(user.user_id, books[1].item_id)
+    assert "Borrowed" in manager.render_item(books[1])
+    assert_renders_current(manager)
+    manager.borrow_items(user.user_id, [books[2].item_id, books[3].item_id])
+    assert_renders_current(manager)
+    manager.return_items(user.user_id, [books[2].item_id, books[3].item_id])
+    manager.return_item(user.user_id, books[1].item_id)
+    assert_renders_current(manager)
+
+
+def test_cache_size_bounds_and_disables_caching():
+    manager, books, _ = build_library()
+    manager.enable_stats()
+    manager.set_render_cache_size(2)
+    for book in books + books[2:] + books[:1]:
+        manager.render_item(book)
+    assert manager.stats.counters["render_cache.hit"] == 2  # Only the two most recent stayed cached.
+    assert manager.stats.counters["render_cache.miss"] == 5
+
+    manager.set_render_cache_size(0)
+    manager.stats.reset()
+    for book in books + books:
+        assert manager.render_item(book) == book.display_info()
+    assert manager.stats.counters == {"render_cache.miss": 8}
@@ -0,0 +1,46 @@
+# tests/test_search_worker.py
+import threading
+import time
+
+from search_worker import SearchWorker
+
+
+class Widget:
+    """Stands in for a Tk widget: after() callbacks run only when pump() is called, and only this thread may call it."""
+
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.timers = {}
+        self.foreign_calls = 0
+
+    def after(self, delay_ms, callback, *args):
+        if threading.get_ident() != self.thread:
+            self.foreign_calls += 1
+        timer = object()
+        self.timers[timer] = (callback, args)
+        return timer
+
+    def after_cancel(self, timer):
+        self.timers.pop(timer, None)
+
+    def pump(self, until, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not until() and time.monotonic() < deadline:
+            timers, self.timers = self.timers, {}
+            for callback, args in timers.values():
+                callback(*args)
+            time.sleep(0.005)
+
+
+def test_results_come_back_on_the_tk_thread():
+    widget = Widget()
+    worker = SearchWorker(widget, delay_ms=0)
+    results = []
+    worker.submit("items", lambda: "first", lambda result: results.append((result, threading.get_ident())))
+    worker.submit("users", lambda: "stale", results.append)
+    worker.submit("users", lambda: "newest", results.append)
+    widget.pump(lambda: len(results) == 2)
+    worker.close()
+    assert sorted(map(str, results)) == sorted(map(str, [("first", widget.thread), "newest"]))
+    assert widget.foreign_calls == 0
+    assert widget.timers == {}
@@ -0,0 +1,124 @@
+# tests/test_snapshot.py
+import os
+
+import pytest
+
+from core.library_manager import LibraryManager
+from core.records import item_to_record, loan_to_record, user_to_record
+from core import snapshot
+from core.snapshot import SnapshotStorage, in_id_order, write_snapshot
+from models.book import Book
+from models.magazine import Magazine
+from models.user import User
+
+
+def build_library():
+    manager = LibraryManager()
+    manager.add_items_bulk([Book(f"Book {i}", "Author", 2000 + i, "Press", "Fiction", 100 + i, "1st", f"isbn-{i}")
+                            for i in range(20)])
+    manager.add_items_bulk([Magazine(f"Issue {i}", "Editor", 2020, "Press", "News", i, "2020-01-01")
+                            for i in range(5)])
+    users = [User(f"User {i}", f"user{i}@example.com", 5) for i in range(4)]
+    manager.add_users_bulk(users)
+    item_ids = sorted(manager.items)
+    for user, item_id in zip(users, item_ids):
+        manager.borrow_item(user.user_id, item_id)
+    manager.return_item(users[0].user_id, item_ids[0])
+    return manager
+
+
+def dump(manager):
+    return ([item_to_record(item) for item in in_id_order(manager.items)],
+            [user_to_record(user) for user in in_id_order(manager.users)],
+            [loan_to_record(loan) for loan in in_id_order(manager.loans)])
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "library.snap")
+    manager = build_library()
+    write_snapshot(path, in_id_order(manager.items), in_id_order(manager.users), in_id_order(manager.loans))
+
+    storage = SnapshotStorage(path)
+    assert dump(LibraryManager(storage=storage)) == dump(manager)
+    assert {loan.loan_id for loan in storage.open_loans()} == {
+        loan.loan_id for loan in manager.loans.values() if loan.return_date is None}
+    storage.close()
+
+
+def test_changes_survive_close(tmp_path):
+    path = str(tmp_path / "library.snap")
+    expected = build_library()
+    write_snapshot(path, in_id_order(expected.items), in_id_order(expected.users), in_id_order(expected.loans))
+    manager = LibraryManager(storage=SnapshotStorage(path))
+    item_ids = sorted(manager.items)
+
+    for library in (manager, expected):
+        library.delete_item(item_ids[10])
+        library.update_item(item_ids[11], title="Renamed")
+        library.add_item(Book("Added", "Someone", 2024, "Press", "Fiction", 50, "1st", "isbn-new"))
+        user = library.find_user(sorted(library.users)[1])
+        library.return_item(user.user_id, next(iter(user.borrowed_items)))
+    # The snapshot side and the dict side made their own Book above, under different IDs.
+    added = max(manager.items)
+    expected.items[added] = expected.items.pop(max(expected.items))
+    expected.items[added].item_id = added
+    assert list(manager.items) == sorted(manager.items)
+    manager.close()
+
+    reopened = LibraryManager(storage=SnapshotStorage(path))
+    assert dump(reopened) == dump(expected)
+    assert item_ids[10] not in reopened.items
+    assert reopened.find_item(item_ids[11]).title == "Renamed"
+    reopened.close()
+
+
+def test_records_must_be_in_id_order(tmp_path):
+    manager = build_library()
+    path = str(tmp_path / "library.snap")
+    with pytest.raises(ValueError):
+        write_snapshot(path, reversed(list(in_id_order(manager.items))), (), ())
+    assert not (tmp_path / "library.snap.tmp").exists()
+
+
+def test_number_fields_keep_their_type(tmp_path):
+    path = str(tmp_path / "library.snap")
+    manager = LibraryManager(storage=SnapshotStorage(path))
+    items = [Magazine("Quarterly", "Editor", "1999", "Press", "News", "Spring", "2020-03-01"),
+             Magazine("Weekly", "Editor", 2020, "Press", "News", 145, "2020-03-02"),
+             Book("Manual", "Author", None, "Press", "Tech", "145", "1st", "isbn")]
+    for item in items:
+        manager.add_item(item)
+    spring, numbered, text = (item.item_id for item in items)
+    manager.close()
+
+    reopened = LibraryManager(storage=SnapshotStorage(path))
+    values = [(reopened.find_item(item_id).publication_year, reopened.find_item(item_id).issue_number)
+              for item_id in (spring, numbered)]
+    assert values == [("1999", "Spring"), (2020, 145)]
+    assert reopened.find_item(text).publication_year is None and reopened.find_item(text).page_count == "145"
+    reopened.close()
+
+
+def test_failed_save_keeps_old_file_and_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / "library.snap")
+    expected = build_library()
+    write_snapshot(path, in_id_order(expected.items), in_id_order(expected.users), in_id_order(expected.loans))
+    before = open(path, "rb").read()
+    manager = LibraryManager(storage=SnapshotStorage(path))
+    item_id = min(manager.items)
+    manager.update_item(item_id, title="Renamed")
+
+    def fail(source, target):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(snapshot.os, "replace", fail)
+    with pytest.raises(OSError):
+        manager.flush()
+    assert open(path, "rb").read() == before and not os.path.exists(path + ".tmp")
+    assert manager.find_item(item_id).title == "Renamed"
+
+    monkeypatch.undo()
+    manager.close()
+    reopened = LibraryManager(storage=SnapshotStorage(path))
+    assert reopened.find_item(item_id).title == "Renamed"
+    reopened.close()
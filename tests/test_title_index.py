@@ -0,0 +1,65 @@
+# tests/test_title_index.py
+import random
+
+import pytest
+
+from core.library_manager import LibraryManager
+from models.book import Book
+
+TITLES = ["Dune", "Dune Messiah", "The Hobbit", "A Tale of Two Cities", "Go", "It", "Ubik", "Solaris",
+          "The Left Hand of Darkness", "Children of Dune", "Neuromancer", "Hyperion", "Éire and Ériu"]
+QUERIES = ["d", "du", "dune", "une", "o", "of", "the", " ", "go", "it", "ik", "solaris", "ness", "xyz", "é", "éri",
+           "children of dune", ""]
+
+
+def scan(manager, query):
+    """The search the title index replaced: a substring test of every title."""
+    return sorted(item.item_id for item in manager.items.values() if query.lower() in item.title.lower())
+
+
+def indexed(manager, query):
+    return sorted(item.item_id for item in manager.search_items_by_title(query))
+
+
+@pytest.fixture
+def manager():
+    manager = LibraryManager()
+    rng = random.Random(7)
+    manager.add_items_bulk(Book(rng.choice(TITLES) + rng.choice(["", " II", " (Reprint)"]), "Author", 2000,
+                                "Press", "Fiction", 100, "1st", "isbn") for _ in range(300))
+    return manager
+
+
+def test_matches_substring_scan(manager):
+    for query in QUERIES + [query.upper() for query in QUERIES]:
+        assert indexed(manager, query) == scan(manager, query), query
+
+
+def test_matches_after_update_and_delete(manager):
+    item_ids = sorted(manager.items)
+    manager.search_items_by_title("dune")  # Build the index first, so the changes below must keep it current.
+    manager.update_item(item_ids[0], title="Brand New Title")
+    manager.update_item(item_ids[1], title="Go")
+    manager.delete_item(item_ids[2])
+    for query in QUERIES + ["brand", "new", "br", "ti"]:
+        assert indexed(manager, query) == scan(manager, query), query
+
+
+def test_rejected_update_keeps_the_item_indexed(manager):
+    item_id = min(manager.items)
+    title = manager.find_item(item_id).title
+    manager.search_items_by_title(title)
+    manager.fuzzy_search(title)
+    for bad in ({"display_info": "x"}, {"title": 123}, {"publication_year": "next year"}, {"status": "Borrowed"}):
+        with pytest.raises(ValueError):
+            manager.update_item(item_id, **bad)
+    assert manager.find_item(item_id).title == title
+    assert item_id in indexed(manager, title)
+    assert item_id in [item.item_id for item, _ in manager.fuzzy_search(title, limit=len(manager.items))]
+
+
+def test_update_converts_form_numbers(manager):
+    item_id = min(manager.items)
+    manager.update_item(item_id, publication_year="1999", page_count=" 42 ")
+    item = manager.find_item(item_id)
+    assert (item.publication_year, item.page_count) == (1999, 42)
@@ -0,0 +1,166 @@
+# virtual_tree.py
+import bisect
+
+ROW_HEIGHT = 25  # Matches the Treeview rowheight set in LibraryApp.setup_styles.
+HEADING_HEIGHT = 30
+
+
+class VirtualTree:
+    """Shows a very long list in a ttk.Treeview by materializing only the rows in view.
+
+    The list is held as a sorted list of record IDs, or in the order given for ranked results. Row values are
+    fetched a page at a time (the window plus `buffer` rows on each side) through `fetch_rows(ids)`, which
+    returns one values tuple per ID, or None for a record that no longer exists. Rows use the record ID as
+    their iid, like a fully populated tree.
+    """
+
+    def __init__(self, tree, scrollbar, fetch_rows, newest_first=False, buffer=20):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch_rows = fetch_rows
+        self.newest_first = newest_first
+        self.buffer = buffer
+        self.ids = []
+        self.ranked = False
+        self.top = 0
+        self.visible = 20
+        self.selected_id = None
+        self._rows = {}  # {record_id: values} for the window and the buffer around it
+        scrollbar.configure(command=self._on_scrollbar)
+        tree.bind('<Configure>', self._on_resize)
+        tree.bind('<MouseWheel>', lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        tree.bind('<Button-5>', lambda e: self.scroll(3))
+        tree.bind('<Up>', lambda e: self._on_arrow(-1))
+        tree.bind('<Down>', lambda e: self._on_arrow(1))
+        tree.bind('<Prior>', lambda e: self.scroll(-self.visible))
+        tree.bind('<Next>', lambda e: self.scroll(self.visible))
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _id_at(self, position):
+        return self.ids[-1 - position] if self.newest_first else self.ids[position]
+
+    # --- Contents ---
+    def set_ids(self, ids, ranked=False):
+        """Replaces the listed records and redraws from the top.
+
+        IDs are in ascending order, unless ranked, when they are shown in the order given (e.g. best match first).
+        """
+        self.ids = ids
+        self.ranked = ranked
+        self.top = 0
+        self._rows.clear()
+        self.render()
+
+    def extend_ids(self, ids):
+        """Appends records to the end of the list, keeping the scroll position (e.g. while a list loads)."""
+        self.ids.extend(ids)
+        self.render()
+
+    def apply_changes(self, changes):
+        """Takes {record_id: listed}: refreshes or adds the records that should be listed, drops the rest.
+
+        A ranked list has no place for new records, so it only refreshes and drops the ones it already shows.
+        """
+        if self.ranked:
+            for record_id in changes:
+                self._rows.pop(record_id, None)
+            dropped = {record_id for record_id, listed in changes.items() if not listed}
+            if dropped:
+                self.ids = [record_id for record_id in self.ids if record_id not in dropped]
+            return self.render()
+        for record_id, listed in changes.items():
+            self._rows.pop(record_id, None)
+            index = bisect.bisect_left(self.ids, record_id)
+            present = index < len(self.ids) and self.ids[index] == record_id
+            if listed and not present:
+                self.ids.insert(index, record_id)
+            elif present and not listed:
+                del self.ids[index]
+        self.render()
+
+    # --- Scrolling ---
+    def scroll(self, rows):
+        self.top += rows
+        self.render()
+        return "break"
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.ids))
+        elif args[0] == "scroll":
+            self.top += int(args[1]) * (self.visible if args[2] == "pages" else 1)
+        self.render()
+
+    def _on_resize(self, event):
+        visible = max(1, (event.height - HEADING_HEIGHT) // ROW_HEIGHT)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def _on_arrow(self, step):
+        """Moves the selection past the edge of the window by scrolling; inside it the Treeview handles keys."""
+        children = self.tree.get_children()
+        if not children or self.tree.focus() != children[0 if step < 0 else -1]:
+            return None
+        top = self.top
+        self.scroll(step)
+        if self.top != top:
+            iid = self.tree.get_children()[0 if step < 0 else -1]
+            self.tree.selection_set(iid)
+            self.tree.focus(iid)
+        return "break"
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self.selected_id = int(selection[0])
+
+    # --- Drawing ---
+    def _fetch_page(self):
+        """Loads the rows of the window plus the buffer around it, forgetting rows further away."""
+        start = max(0, self.top - self.buffer)
+        end = min(len(self.ids), self.top + self.visible + self.buffer)
+        page = [self._id_at(position) for position in range(start, end)]
+        self._rows = {record_id: self._rows[record_id] for record_id in page if record_id in self._rows}
+        missing = [record_id for record_id in page if record_id not in self._rows]
+        vanished = []
+        for record_id, row in zip(missing, self.fetch_rows(missing)):
+            if row is None:
+                vanished.append(record_id)
+            else:
+                self._rows[record_id] = row
+        return vanished
+
+    def render(self):
+        """Materializes the rows in view: at most `visible` Treeview rows exist at any time."""
+        self.top = max(0, min(self.top, len(self.ids) - self.visible))
+        window = [self._id_at(position) for position in range(self.top, min(len(self.ids), self.top + self.visible))]
+        if any(record_id not in self._rows for record_id in window):
+            vanished = self._fetch_page()
+            if vanished:
+                # Records deleted since the ID list was taken; drop them and draw again.
+                return self.apply_changes(dict.fromkeys(vanished, False))
+        tree = self.tree
+        wanted = {str(record_id) for record_id in window}
+        stale = [iid for iid in tree.get_children() if iid not in wanted]
+        if stale:
+            tree.delete(*stale)
+        for index, record_id in enumerate(window):
+            iid = str(record_id)
+            tag = 'evenrow' if (self.top + index) % 2 == 0 else 'oddrow'
+            if tree.exists(iid):
+                tree.move(iid, "", index)
+                tree.item(iid, values=self._rows[record_id], tags=(tag,))
+            else:
+                tree.insert("", index, iid=iid, values=self._rows[record_id], tags=(tag,))
+        if self.selected_id in window and tree.selection() != (str(self.selected_id),):
+            tree.selection_set(str(self.selected_id))
+            tree.focus(str(self.selected_id))
+        if self.ids:
+            self.scrollbar.set(self.top / len(self.ids), (self.top + len(window)) / len(self.ids))
+        else:
+            self.scrollbar.set(0.0, 1.0)